@@ -0,0 +1,122 @@
+"""
+Resolução "anytime" do TSP com prazo de tempo.
+
+Em vez de uma única chamada a Optimize.check() que pode não retornar, usa um
+Solver incremental: a cada solução encontrada, o custo dela vira a restrição
+objective < custo e o mesmo solver é verificado de novo, com o tempo que
+resta até o prazo. Cada melhoria é entregue assim que aparece. Quando o solver
+responde unsat, o último caminho é ótimo; quando o prazo acaba, o melhor
+caminho encontrado é retornado sem prova de otimalidade. Com um limite
+inferior (limites.py), a busca também termina, com otimalidade provada, assim
+que um caminho o alcança. O laço (buscar_melhorias) é o mesmo usado pelo modo
+esparso e pela sessão de reotimização.
+"""
+
+import time
+
+from z3 import *
+
+from avaliacao import custo_caminho
+from carregamento import como_lista
+from codificacoes import construir_modelo, extrair_caminho, limitar_objetivo_inferior, sugerir_caminho
+from eventos import estatisticas_z3, sem_marcacao
+
+
+def buscar_melhorias(solver, objective, extrair, distance_matrix, melhor, inicio, limite_prazo=None,
+                     limite_inferior=None, marcar=sem_marcacao):
+    """Laço comum às resoluções anytime: gera cada caminho mais barato que melhor['caminho'].
+
+    Antes de cada verificação, objective < custo do melhor caminho é
+    adicionado ao solver (no escopo atual de quem chama) e o tempo que resta até
+    limite_prazo (instante de time.perf_counter) vira o timeout. extrair(model)
+    retorna o caminho de um modelo do Z3; melhor (dicionário com caminho e
+    custo) é atualizado a cada caminho, gerado como {'caminho', 'custo',
+    'tempo'}, com o tempo contado desde inicio. O retorno (StopIteration.value)
+    é (fim, verificacoes): fim é 'unsat' (nenhum caminho mais barato que o
+    melhor), 'limite' (o melhor alcançou limite_inferior) ou 'unknown' (prazo
+    esgotado ou solver sem resposta).
+    """
+    verificacoes = 0
+    teto = melhor['custo']
+    while True:
+        if limite_inferior is not None and melhor['custo'] is not None and melhor['custo'] <= limite_inferior:
+            return 'limite', verificacoes
+        if teto is not None:
+            solver.add(objective < teto)
+        if limite_prazo is not None:
+            restante = limite_prazo - time.perf_counter()
+            if restante <= 0:
+                return 'unknown', verificacoes
+            solver.set('timeout', max(1, int(restante * 1000)))
+        verificacoes += 1
+        status = solver.check()
+        marcar('check')
+        if status != sat:
+            # unsat: nenhum caminho mais barato que o incumbente; unknown: prazo esgotado
+            return ('unsat' if status == unsat else 'unknown'), verificacoes
+        model = solver.model()
+        caminho = extrair(model)
+        custo = custo_caminho(distance_matrix, caminho)
+        # O próximo limite é o valor exato do objetivo no modelo: com distâncias fracionárias, a soma em
+        # ponto flutuante pode ficar acima dele, e objective < custo aceitaria o mesmo caminho outra vez
+        teto = model.evaluate(objective, model_completion=True)
+        marcar('extracao_caminho')
+        if melhor['custo'] is not None and custo >= melhor['custo']:
+            continue
+        melhor.update(caminho=caminho, custo=custo)
+        yield {'caminho': caminho, 'custo': melhor['custo'], 'tempo': time.perf_counter() - inicio}
+        marcar(None)  # o tempo gasto por quem consome o gerador não entra em nenhuma fase
+
+
+def consumir_melhorias(gerador, ao_melhorar=None):
+    """Consome um gerador de melhorias chamando ao_melhorar(melhoria) e retorna o valor final dele."""
+    while True:
+        try:
+            melhoria = next(gerador)
+        except StopIteration as fim:
+            return fim.value
+        if ao_melhorar is not None:
+            ao_melhorar(melhoria)
+
+
+def melhorias_anytime(distance_matrix, prazo, codificacao='bitvector', caminho_inicial=None, marcar=sem_marcacao,
+                      limite_inferior=None):
+    """Gera um dicionário (caminho, custo, tempo) a cada caminho melhor encontrado.
+
+    O retorno do gerador (StopIteration.value) é o resultado final, com a chave
+    'otimo' indicando se a otimalidade foi provada antes do prazo. Com prazo
+    None, a busca continua até provar a otimalidade. O resultado final traz
+    também as estatísticas do Z3; marcar (ver eventos.cronometro) recebe o fim
+    de cada fase, e check e extracao_caminho são acumuladas entre as melhorias.
+    limite_inferior, se informado, é imposto ao objetivo e encerra a busca
+    quando um caminho custa exatamente ele.
+    """
+    inicio = time.perf_counter()
+    limite = None if prazo is None else inicio + prazo
+    distance_matrix = como_lista(distance_matrix)
+    modelo = construir_modelo(distance_matrix, codificacao, solver=Solver(), marcar=marcar)
+    solver = modelo['solver']
+    if limite_inferior is not None:
+        limitar_objetivo_inferior(modelo, limite_inferior)
+    melhor = {'caminho': None, 'custo': None, 'tempo': 0.0, 'otimo': False}
+
+    if caminho_inicial is not None:
+        sugerir_caminho(modelo, caminho_inicial)
+        marcar('aquecimento')
+        melhor.update(caminho=caminho_inicial, custo=custo_caminho(distance_matrix, caminho_inicial))
+        yield {'caminho': caminho_inicial, 'custo': melhor['custo'], 'tempo': time.perf_counter() - inicio}
+        marcar(None)
+
+    fim, _ = yield from buscar_melhorias(solver, modelo['objective'], lambda model: extrair_caminho(modelo, model),
+                                         distance_matrix, melhor, inicio, limite, limite_inferior, marcar)
+    melhor['otimo'] = fim == 'limite' or (fim == 'unsat' and melhor['caminho'] is not None)
+    melhor['tempo'] = time.perf_counter() - inicio
+    melhor['estatisticas_z3'] = estatisticas_z3(solver)
+    return melhor
+
+
+def resolver_anytime(distance_matrix, prazo, codificacao='bitvector', caminho_inicial=None, ao_melhorar=None,
+                     marcar=sem_marcacao, limite_inferior=None):
+    """Consome melhorias_anytime chamando ao_melhorar(melhoria) e retorna o resultado final."""
+    return consumir_melhorias(melhorias_anytime(distance_matrix, prazo, codificacao, caminho_inicial, marcar,
+                                                limite_inferior), ao_melhorar)
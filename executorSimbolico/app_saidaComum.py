@@ -7,218 +7,224 @@ King, James C. "Symbolic execution and program testing." Communications of the A
 
 from z3 import *
 import time
-import threading
 
-# Função para exibir uma animação de progresso
-def mostrar_progresso(flag):
-    progress = ['|', '/', '-', '\\']  # Animação simples de progresso
-    i = 0
-    while flag['running']:
-        print(f'\rProcessando... {progress[i % len(progress)]}', end='', flush=True)
-        time.sleep(0.1)
-        i += 1
-
-def tsp_solver(distance_matrix):
+from codificacoes import (construir_modelo, distancias_inteiras, escolher_codificacao, estatisticas_modelo, extrair_caminho,
+                          limitar_objetivo, limitar_objetivo_inferior, sugerir_caminho, validar_codificacao)
+from anytime import resolver_anytime
+from avaliacao import custo_caminho
+from cache import abrir_cache, buscar_resultado, guardar_resultado
+from carregamento import carregar_instancia
+from cortes import resolver_com_cortes
+from decomposicao import PRAZO_CLUSTER, TAMANHO_CLUSTER, resolver_por_decomposicao
+from esparso import K_VIZINHOS, resolver_esparso
+from esqueleto import resolver_com_esqueleto
+from eventos import cronometro, destinos_padrao, emitir, estatisticas_z3
+from heuristicas import heuristica
+from limites import gap as medir_gap, limite_inferior as calcular_limite_inferior
+from portfolio import resolver_portfolio
+
+MODOS = ('mtz', 'cortes', 'decomposicao', 'portfolio', 'esparso')
+# Modos que montam o modelo na codificação escolhida (cortes e portfolio usam as próprias)
+MODOS_COM_CODIFICACAO = ('mtz', 'decomposicao', 'esparso')
+
+
+# Parâmetros incompatíveis são recusados antes do cache, da heurística e do limite inferior
+def _validar_parametros(modo, codificacao, prazo, reutilizar):
+    if modo not in MODOS:
+        raise ValueError(f"Modo desconhecido: {modo!r}. Opções: {', '.join(MODOS)}")
+    if modo in MODOS_COM_CODIFICACAO:
+        validar_codificacao(codificacao)
+    if prazo is not None and modo not in ('mtz', 'decomposicao', 'portfolio', 'esparso'):
+        raise ValueError("O prazo só está disponível nos modos 'mtz', 'decomposicao', 'portfolio' e 'esparso'")
+    if reutilizar and modo != 'mtz':
+        raise ValueError("A reutilização do esqueleto só está disponível no modo 'mtz'")
+    if prazo is not None and reutilizar:
+        raise ValueError("Use prazo ou reutilizar, não ambos")
+
+
+def tsp_solver(distance_matrix, codificacao='bitvector', modo='mtz', aquecimento=True, ao_provisorio=None, prazo=None, reutilizar=False,
+               destinos=None, simetria=True, cache=None, tamanho_cluster=TAMANHO_CLUSTER, processos=None,
+               configuracoes=None, vizinhos=K_VIZINHOS, limites=True):
+    _validar_parametros(modo, codificacao, prazo, reutilizar)
+    # destinos: funções que recebem cada evento (eventos.py); o padrão mostra as mensagens e a animação no terminal
+    destinos = destinos_padrao() if destinos is None else destinos
+    marcar = cronometro(destinos)  # tempo de cada fase: montagem do modelo, check, extração do caminho...
+
+    # Cada caminho melhor encontrado pelo portfólio, pelo modo esparso ou pela busca anytime vira um evento
+    def mostrar_melhoria(melhoria):
+        emitir(destinos, 'melhoria', **melhoria)
+
+    # Matrizes NumPy, mapeadas em memória (.npy) ou de coordenadas (TSPLIB) seguem como estão para o cache, a
+    # heurística, o limite inferior e a decomposição; só os modelos do Z3 as convertem em listas (como_lista)
     n = len(distance_matrix) #número de cidades 
-    print(f"Número de cidades: {n} \n")
-
-    x = [] # inicializa uma lista x que armazenará as variáveis inteiras que representarão se um caminho entre duas cidades é escolhido ou não.
-
-    # O objetivo desta parte do código é criar uma matriz de variáveis de decisão. Essas variáveis representam se há ou não um caminho entre duas cidades
-
-    for i in range(n): #Esse loop externo percorre cada cidade, onde i representa a cidade de origem.
-
-        row = [] #Essa lista armazena as variáveis que representam os possíveis caminhos saindo da cidade i, para cada linha.
-
-        for j in range(n): # percorre todas as cidades de destino, representadas por j. Assim, para cada cidade de origem i, estamos considerando todos os possíveis destinos j.
-
-            var = Int(f'x[{i}][{j}]')  #Cria as variáveis inteira simbolicas usando o Z3 com o nome x_i_j, onde i e j representam as cidades de origem e destino. Essa variável representa a existência de um caminho da cidade i para a cidade j.
-           
-            row.append(var)#Após preencher a lista row com todas as variáveis de decisão para os caminhos saindo da cidade i, essa lista é adicionada à matriz x. Essa matriz x acaba sendo uma lista de listas (ou matriz) onde cada sublista row contém as variáveis para uma cidade específica.
-
-        x.append(row) #No final do processo, x será uma matriz n x n onde cada elemento x[i][j] é uma variável que indica se o caminho da cidade i para a cidade j é parte da solução. O que temos nessa matriz são variáveis simbólicas, Essas variáveis não têm um valor
-
-    #DESCOMENTAR PARA OBSERVAR A MATRIZ X
-    # print("Matrix X de variáves simbólicas formada: ")
-    # for matrizX in x:
-    #     print(matrizX)
-
-    solver = Optimize() #instancia de optimize,  que é utilizado para resolver problemas de otimização. Ao contrário de um solver simples que busca apenas encontrar uma solução que satisfaça as restrições, o Optimize permite também minimizar ou maximizar uma função objetivo. 
-
-    # Adição das restrições: x[i][j] deve ser 0 ou 1, ou seja, para cada par de cidade i e j, a variavel x[i][j] deve ser 0 ou 1    
-
-    for i in range(n):
-        for j in range(n):
-            if i != j: #verificamos se i e j são cidades diferentes. Isso porque não faz sentido viajar de uma cidade para ela mesma.
-
-                solver.add(Or(x[i][j] == 0, x[i][j] == 1)) # Se i for diferente de j, adicionamos uma restrição ao solver. Essa restrição diz que a variável x[i][j] só pode ser 0 ou 1, ou seja, ou viajamos (1) ou não viajamos (0) de i para j.
-
-            else: # Se i == j(ou seja, se estamos falando da mesma cidade)
-                
-                solver.add(x[i][j] == 0) #, adicionamos uma restrição dizendo que x[i][i] deve ser 0, porque não faz sentido viajar de uma cidade para ela mesma.
-
-    # Restrição que garante uma única entrada e saída (uma entrada e uma saída por cidade)
-    for i in range(n):
-
-        # Criamos duas variáveis para contar quantas rotas saem de i e quantas chegam em i        
-        sum_saida = 0
-        sum_entrada = 0
-
-        #loop sobre todas as cidades j.
-        for j in range(n):
-
-            sum_saida += x[i][j] # essa linha vai somar todas as rotas que saem da cidade i para todas as outras cidades j.
-            sum_entrada += x[j][i] # Essa linha faz a soma de todas as rotas que entram na cidade i vindas de qualquer outra cidade j.
-        solver.add(sum_saida == 1)  # Essa linha adiciona a restrição de que só pode haver uma rota saindo da cidade i. Ou seja, sum_saida deve ser exatamente igual a 1, o que impede que duas rotas saiam da mesma cidade.
-        solver.add(sum_entrada == 1)  # De forma similar, essa linha garante que só uma rota entra na cidade i, ou seja, o vendedor só chega na cidade uma vez.
-
-        """
-            Se, por alguma razão, o solver tentasse permitir duas rotas saindo da mesma cidade, como:
-
-            x[0][1] = 1 (A → B)
-            x[0][2] = 1 (A → C)i
-
-            Então, a soma sum_saida para a Cidade A seria:
-
-            sum_saida = x[0][1] + x[0][2] = 1 + 1 = 2
-
-            E isso violaria a restrição solver.add(sum_saida == 1), porque o solver está sendo forçado a garantir que sum_saida seja igual a 1.
-        """
-
-    # Variáveis auxiliares para evitar subciclos
-    u = [Int(f'u[{i}]') for i in range(n)] # Aqui, estamos criando uma lista chamada u de variáveis inteiras (Int), com o mesmo tamanho do número de cidades n.
-    # Cada cidade vai receber uma variável u[i], que será usada para ajudar a evitar subciclos. Subciclos são pequenos ciclos dentro do grande ciclo do Caixeiro Viajante que fariam o vendedor repetir cidades, o que não pode acontecer.
-
-    """
-        Por que estamos criando a lista u[]?
-        Esse é um truque que ajuda a resolver o problema de forma correta. O problema do Caixeiro Viajante tem que garantir que o vendedor faça apenas um grande ciclo, ou seja, visite todas as cidades uma vez e retorne ao ponto de origem, sem formar ciclos menores no caminho (os subciclos).
-
-        As variáveis u[i] são usadas como rótulos numéricos para as cidades (exceto a primeira cidade) que nos ajudam a verificar se estamos evitando esses subciclos.
-    """
-    for i in range(1, n): # Esse loop começa da segunda cidade (i = 1) e vai até a última cidade (n - 1). Estamos ignorando a cidade 0 (a primeira), porque essa cidade é o ponto de partida e o ponto final, e não precisamos de um rótulo numérico para ela.
-
-        solver.add(u[i] >= 1) # Aqui, estamos adicionando uma restrição ao solver: para todas as cidades (exceto a cidade inicial i = 0), o valor de u[i] deve ser maior ou igual a 1.
-
-        solver.add(u[i] <= (n - 1)) # Essa linha adiciona outra restrição ao solver: para todas as cidades (exceto a cidade inicial i = 0), o valor de u[i] deve ser menor ou igual a n - 1. Isso limita os valores de u[i] para garantir que uma numeração válida, sem ultrapassar o número de cidades.
-
-        #Esse conjunto de restrições (usando u[i]) ajuda a garantir que o solver evite subciclos. Vamos entender por que:
-
-        '''
-            Como as variáveis u[i] evitam subciclos:
-
-            as variáveis u[i] são um truque para evitar esses subciclos
-
-            O vendedor sai da cidade A com um "rótulo" que não é numérico, porque ele sempre começa na cidade inicial.
-            Quando ele vai para a cidade B, a variável u[B] recebe o valor 1. Isso representa a "primeira parada".
-            Quando ele vai para a cidade C, a variável u[C] recebe o valor 2. Isso significa que ele está progredindo na viagem.
-            Se o vendedor tentasse voltar para a cidade A (fechando um ciclo parcial), isso implicaria que ele estaria diminuindo os rótulos (de 2 para 0), o que não é permitido.
-            As variáveis u[i] garantem que o vendedor só pode seguir em uma ordem crescente de rótulos, ou seja, ele sempre "progride" para a próxima cidade. Isso impede que ele feche pequenos ciclos sem visitar todas as cidades.
-        '''
-
-    # for i in range(1, n): e for j in range(1, n):
-    # Esses dois loops percorrem todas as cidades i e j, exceto a cidade inicial (cidade 0). Isso porque a cidade inicial não precisa das mesmas restrições de rótulo numérico que usamos nas outras cidades. 
-    for i in range(1, n):
-        for j in range(1, n):
-            if i != j: # esse if garante que não estamos tentando adicionar uma restrição para a mesma cidade. Por exemplo, não faz sentido forçar que a cidade i vá para ela mesma (x[i][i]), então pulamos essa situação.
-
-                solver.add(Implies(x[i][j] == 1, u[i] + 1 == u[j])) # Aqui, estamos adicionando uma restrição ao solver que diz:
-
-                # Se x[i][j] == 1, ou seja, se existe uma rota do ponto i para o ponto j,
-                # Então u[j] deve ser igual a u[i] + 1
-
-            """
-                O que isso significa:
-
-                As variáveis u[i] e u[j] são rótulos numéricos que representam a ordem em que o vendedor visita as cidades.
-
-                u[i] + 1 == u[j] garante que, se o vendedor vai de uma cidade i para a cidade j, então o número de rótulo da cidade j (ou seja, o rótulo de onde ele vai) será um a mais do que o da cidade i.
-
-                isso significa que, para cada cidade que o vendedor visita, o rótulo aumenta de maneira progressiva. Assim, se ele começa em uma cidade i, a próxima cidade j que ele visita terá o rótulo imediatamente maior, garantindo que ele está avançando no percurso sem voltar para cidades já visitadas.
-
-                Exemplo:
-                Suponha que temos 3 cidades: A, B e C. O vendedor segue o seguinte caminho:
-
-                Ele vai de A para B: x[0][1] == 1
-                Isso significa que u[1] = u[0] + 1. Se u[A] = 0, então u[B] = 1.
-                Depois ele vai de B para C: x[1][2] == 1
-                Isso significa que u[2] = u[1] + 1, ou seja, se u[B] = 1, então u[C] = 2.
-            """
-
-    #restrição para garantir que não haja subciclos
-
-    #esses dois loops percorrem todas as cidades i e j, exceto a cidade inicial
-    for i in range(1, n):
-        for j in range(1, n): 
-            if i != j: # Esse if garante que estamos verificando apenas pares de cidades diferentes, para evitar cidades que "saem" e "chegam" nelas mesmas.
-                solver.add(Implies(x[i][j] == 1, u[i] != u[j])) # adicionando outra restrição ao solver que diz:
-                # Se x[i][j] == 1, ou seja, se existe uma rota do ponto i para o ponto j,
-                # Então u[i] deve ser diferente de u[j].
-
-                """ 
-                    O que isso significa:
-                    Essa linha de código garante que as variáveis de rótulo u[i] e u[j] nunca podem ser iguais, o que significa que o vendedor não pode voltar para a mesma cidade com o mesmo rótulo.
-
-                    Se u[i] == u[j], isso indicaria que o vendedor está fazendo um ciclo interno (subciclo), porque ele está visitando i e j de tal forma que ele volta ao mesmo estado anterior. Ao forçar que os rótulos sejam diferentes, garantimos que o vendedor continue avançando no caminho e não forme subciclos.
-
-                    Exemplo
-
-                    Suponha que o vendedor siga o seguinte caminho:
-
-                    A → B → A
-
-                    Se não adicionássemos a restrição u[i] != u[j], o solver poderia permitir que o vendedor fosse de A para B e depois voltasse para A sem visitar mais nenhuma cidade, formando um ciclo menor e ignorando as outras cidades.
-
-                    Com essa restrição, o solver vai impedir esse comportamento porque, se x[0][1] == 1 e depois x[1][0] == 1, ele verificaria que u[0] == u[1], o que é inválido. Dessa forma, o solver evita subciclos.
-
-                """
-    # Função objetivo: A função objetivo define o que estamos tentando minimizar no problema. No caso do Caixeiro Viajante, o objetivo é minimizar a soma das distâncias percorridas ao visitar todas as cidades.
-    objective = Int('objective') #  cria uma variável chamada objective, que será usada para armazenar o valor total da função objetivo — ou seja, o total das distâncias percorridas no caminho.
-    objective_expr = 0 # Iniciamos a expressão da função objetivo com valor 0. Este valor vai aumentar à medida que somamos as distâncias entre as cidades.
-    for i in range(n): #Esses dois loops percorrem todas as cidades possíveis i e j (todas as combinações de ida de uma cidade para outra).
-        for j in range(n):
-            objective_expr += distance_matrix[i][j] * x[i][j] # Aqui, estamos somando as distâncias percorridas no caminho.
-
-            """
-                distance_matrix[i][j] contém a distância entre a cidade i e a cidade j.
-
-                x[i][j] é a variável de decisão que indica se o vendedor vai de i para j. Se x[i][j] == 1, significa que o vendedor realmente fez essa viagem.
-
-                Portanto, para cada par de cidades, multiplicamos a distância entre elas (distance_matrix[i][j]) pelo valor de x[i][j]. Isso só adiciona a distância à soma total se o vendedor de fato foi de i para j (ou seja, se x[i][j] == 1).
-            """
-    solver.add(objective == objective_expr) # Aqui, estamos informando ao solver que a variável objective é igual à soma total das distâncias percorridas, que foi acumulada em objective_expr.
-    solver.minimize(objective) # Essa linha instrui o solver a minimizar o valor da variável objective. Em outras palavras, estamos pedindo ao solver para encontrar o caminho que minimize a distância total percorrida.
-
-    # Monitorando o progresso do solver
-    flag = {'running': True}  # Flag para controlar a thread de animação
-    progresso_thread = threading.Thread(target=mostrar_progresso, args=(flag,))
-    progresso_thread.start()
-
-    # Medindo o tempo de execução
-    print("\nVerificando solução...")
+    # simetria: matrizes simétricas usam o modelo não direcionado, que não explora cada ciclo nos dois sentidos
+    if simetria and modo == 'mtz':
+        codificacao = escolher_codificacao(distance_matrix, codificacao)
+    emitir(destinos, 'inicio', n=n, codificacao=codificacao, modo=modo)
+
+    # Com nenhuma ou uma cidade o caminho é trivial e ótimo em qualquer modo: nenhum modelo é montado
+    if n <= 1:
+        caminho = [0, 0] if n else []
+        custo = custo_caminho(distance_matrix, caminho)
+        emitir(destinos, 'verificacao_fim', caminho=caminho, otimo=True, duracao=0.0, modo=modo)
+        emitir(destinos, 'resultado', caminho=caminho, custo=custo, otimo=True, tempo=0.0, fases={})
+        return {'caminho': caminho, 'custo': custo, 'tempo': 0.0, 'otimo': True, 'caminho_provisorio': None,
+                'custo_provisorio': None, 'fases': {}, 'estatisticas_z3': {}, 'variaveis': None, 'assercoes': None,
+                'cache': False, 'limite_inferior': custo, 'gap': 0.0}
+
+    # cache: resultados ótimos já calculados (cache.py), consultados antes de montar qualquer modelo
+    if cache is not None:
+        inicio_cache = time.perf_counter()
+        guardado = buscar_resultado(cache, distance_matrix)
+        marcar('cache')
+        if guardado is not None:
+            tempo_cache = time.perf_counter() - inicio_cache
+            emitir(destinos, 'cache', duracao=tempo_cache)
+            emitir(destinos, 'resultado', caminho=guardado['caminho'], custo=guardado['custo'], otimo=True,
+                   tempo=tempo_cache, fases=dict(marcar.fases))
+            return {'caminho': guardado['caminho'], 'custo': guardado['custo'], 'tempo': tempo_cache, 'otimo': True,
+                    'caminho_provisorio': None, 'custo_provisorio': None, 'fases': dict(marcar.fases),
+                    'estatisticas_z3': {}, 'variaveis': None, 'assercoes': None, 'cache': True,
+                    'limite_inferior': guardado['custo'], 'gap': 0.0}
+
+    # Aquecimento: vizinho mais próximo + 2-opt/Or-opt geram em milissegundos um caminho provisório,
+    # cujo custo vira limite superior do objetivo (heuristicas.py)
+    caminho_provisorio = custo_provisorio = None
+    if aquecimento and n > 0:
+        inicio_heuristica = time.time()
+        caminho_provisorio, custo_provisorio = heuristica(distance_matrix)
+        marcar('heuristica')
+        emitir(destinos, 'provisorio', caminho=caminho_provisorio, custo=custo_provisorio,
+               duracao=time.time() - inicio_heuristica)
+        if ao_provisorio is not None:
+            ao_provisorio(caminho_provisorio, custo_provisorio)  # o chamador já pode usar a rota enquanto o Z3 prova a otimalidade
+        marcar(None)
+
+    # limites: limite inferior rápido (1-árvore de Held-Karp ou atribuição, limites.py), imposto ao objetivo;
+    # um caminho que o alcança é ótimo, e a busca termina ali. Os modos esparso e decomposicao calculam o seu
+    limite_inferior = gap = None
+    if limites and n > 1 and modo not in ('esparso', 'decomposicao'):
+        limite_inferior = calcular_limite_inferior(distance_matrix, custo_provisorio)['custo']
+        marcar('limite')
+        emitir(destinos, 'limite', limite_inferior=limite_inferior, custo_provisorio=custo_provisorio,
+               gap=None if custo_provisorio is None else medir_gap(custo_provisorio, limite_inferior))
+    # O caminho provisório já alcança o limite: é ótimo e nenhum modelo precisa ser montado
+    pelo_limite = limite_inferior is not None and custo_provisorio is not None and custo_provisorio <= limite_inferior
+
+    # modo 'mtz': modelo completo na codificação escolhida (codificacoes.py; "inteira" é a formulação original)
+    # modo 'cortes': relaxação de atribuição com cortes de subciclo adicionados sob demanda (cortes.py)
+    # prazo (segundos): resolução anytime em um Solver incremental que entrega cada melhoria (anytime.py)
+    # reutilizar: variáveis e restrições estruturais vêm do esqueleto em cache para n cidades (esqueleto.py)
+    # modo 'decomposicao': grupos de até tamanho_cluster cidades resolvidos em paralelo e costurados (decomposicao.py);
+    # nele o prazo vale para cada grupo
+    # modo 'portfolio': as configurações (nomes de portfolio.CONFIGURACOES) correm em processos separados e a
+    # primeira resposta ótima vence; com prazo, vale o melhor caminho encontrado até ele (portfolio.py)
+    # modo 'esparso': variáveis só para as arestas dos vizinhos mais próximos de cada cidade, ampliadas
+    # enquanto os custos reduzidos indicarem que uma aresta de fora pode melhorar o caminho (esparso.py)
+    # Com distâncias fracionárias o objetivo é Real, e o Optimize do Z3 fica muito mais lento que a busca anytime,
+    # que sem prazo prova a mesma otimalidade
+    fracionaria = modo == 'mtz' and n > 0 and not distancias_inteiras(distance_matrix)
+    estatisticas = {}
+    if modo == 'mtz' and prazo is None and not reutilizar and not pelo_limite and not fracionaria:
+        modelo = construir_modelo(distance_matrix, codificacao, marcar=marcar)
+        solver = modelo['solver']
+        estatisticas = estatisticas_modelo(modelo)
+        emitir(destinos, 'modelo', **estatisticas)
+        if caminho_provisorio is not None:
+            limitar_objetivo(modelo, custo_provisorio)
+            sugerir_caminho(modelo, caminho_provisorio)
+            marcar('aquecimento')
+        if limite_inferior is not None:
+            limitar_objetivo_inferior(modelo, limite_inferior)
+
+    # Medindo o tempo de execução; o destino de progresso anima o terminal até 'verificacao_fim'
+    emitir(destinos, 'verificacao_inicio')
+    marcar(None)
     start_time = time.time()  # Início do temporizador
-    if solver.check() == sat:
-        execution_time = time.time() - start_time  # Calcula o tempo de execução
-        model = solver.model()
-        flag['running'] = False  # Para a thread de progresso
-        progresso_thread.join()  # Espera a thread terminar
-        print(f"\nSolução encontrada em {execution_time:.2f} segundos.")
-        caminho = []
-        cidade_atual = 0
-        caminho.append(cidade_atual)
-
-        for i in range(n - 1):
-            for j in range(n):
-                if model.evaluate(x[cidade_atual][j]) == 1:
-                    caminho.append(j)
-                    cidade_atual = j
-                    break
-        caminho.append(0)
-        print(f"Caminho completo: {caminho}")
+    otimo = True
+    if pelo_limite:
+        caminho = caminho_provisorio
+        z3_estatisticas = {}
+    elif modo == 'decomposicao':
+        resultado = resolver_por_decomposicao(distance_matrix, tamanho_cluster, PRAZO_CLUSTER if prazo is None else prazo,
+                                              codificacao, processos, caminho_provisorio, marcar)
+        caminho, otimo = resultado['caminho'], resultado['otimo']
+        limite_inferior = resultado['limite_inferior']
+        z3_estatisticas = {}  # cada grupo é resolvido em outro processo
+    elif modo == 'portfolio':
+        resultado = resolver_portfolio(distance_matrix, prazo, configuracoes, processos, caminho_provisorio,
+                                       mostrar_melhoria, limite_inferior)
+        caminho, otimo = resultado['caminho'], resultado['otimo']
+        z3_estatisticas = {}
+        marcar('portfolio')
+    elif modo == 'esparso':
+        resultado = resolver_esparso(distance_matrix, vizinhos, codificacao, caminho_provisorio, prazo, mostrar_melhoria,
+                                     marcar)
+        caminho, otimo = resultado['caminho'], resultado['otimo']
+        limite_inferior = resultado['limite_inferior']
+        estatisticas = {'codificacao': codificacao, 'variaveis': resultado['variaveis'],
+                        'assercoes': resultado['assercoes']}
+        z3_estatisticas = resultado['estatisticas_z3']
+    elif prazo is not None or (fracionaria and not reutilizar):
+        resultado = resolver_anytime(distance_matrix, prazo, codificacao, caminho_provisorio, mostrar_melhoria, marcar,
+                                     limite_inferior)
+        caminho, otimo = resultado['caminho'], resultado['otimo']
+        z3_estatisticas = resultado['estatisticas_z3']
+    elif reutilizar:
+        resultado = resolver_com_esqueleto(distance_matrix, codificacao, caminho_provisorio, marcar, limite_inferior)
+        caminho = resultado['caminho']
+        z3_estatisticas = resultado['estatisticas_z3']
+    elif modo == 'cortes':
+        resultado = resolver_com_cortes(distance_matrix, caminho_inicial=caminho_provisorio, marcar=marcar,
+                                        limite_inferior=limite_inferior)
+        caminho = resultado['caminho']
+        estatisticas = estatisticas_modelo(resultado['modelo'])
+        z3_estatisticas = estatisticas_z3(resultado['modelo']['solver'])
     else:
-        flag['running'] = False  # Para a thread de progresso
-        progresso_thread.join()  # Espera a thread terminar
-        execution_time = time.time() - start_time  # Calcula o tempo mesmo se falhar
-        print(f"\nNenhuma solução encontrada em {execution_time:.2f} segundos.")
+        status = solver.check()
+        marcar('check')
+        caminho = extrair_caminho(modelo, solver.model()) if status == sat else None
+        if caminho is not None:
+            marcar('extracao_caminho')
+        z3_estatisticas = estatisticas_z3(solver)
+    if caminho is None and caminho_provisorio is not None and prazo is None:
+        # unsat com o limite superior: nenhum caminho é mais barato que o provisório, que então é ótimo
+        caminho = caminho_provisorio
+    execution_time = time.time() - start_time  # Calcula o tempo mesmo se falhar
+    emitir(destinos, 'verificacao_fim', caminho=caminho, otimo=otimo and caminho is not None, duracao=execution_time,
+           modo=modo)
+    emitir(destinos, 'estatisticas_z3', estatisticas=z3_estatisticas)
+    custo = custo_caminho(distance_matrix, caminho) if caminho is not None else None
+    if otimo and caminho is not None:
+        limite_inferior = custo
+    if limite_inferior is not None and custo is not None:
+        gap = medir_gap(custo, limite_inferior)
+
+    if modo == 'cortes' and not pelo_limite:
+        emitir(destinos, 'cortes', cortes=resultado['cortes'], iteracoes=resultado['iteracoes'])
+    if modo == 'decomposicao':
+        emitir(destinos, 'decomposicao', grupos=resultado['grupos'], grupos_otimos=resultado['grupos_otimos'],
+               custo_costura=resultado['custo_costura'], custo=resultado['custo'], limite_inferior=limite_inferior,
+               gap=gap)
+    if modo == 'esparso':
+        emitir(destinos, 'esparso', arestas=resultado['arestas'], arestas_possiveis=resultado['arestas_possiveis'],
+               rodadas=resultado['rodadas'], limite_inferior=limite_inferior, gap=gap)
+    if modo == 'portfolio' and not pelo_limite:
+        emitir(destinos, 'portfolio', vencedor=resultado['vencedor'], configuracoes=resultado['configuracoes'])
+    if reutilizar and not pelo_limite:
+        emitir(destinos, 'esqueleto', n=n, reaproveitado=resultado['reaproveitado'],
+               tempo_estrutura=resultado['tempo_estrutura'], tempo_objetivo=resultado['tempo_objetivo'],
+               tempo_check=resultado['tempo_check'])
+    if cache is not None and otimo and caminho is not None:
+        guardar_resultado(cache, distance_matrix, caminho, custo)
+    emitir(destinos, 'resultado', caminho=caminho, custo=custo, otimo=otimo and caminho is not None,
+           tempo=execution_time, fases=dict(marcar.fases))
+    return {'caminho': caminho, 'custo': custo, 'tempo': execution_time, 'otimo': otimo and caminho is not None,
+            'caminho_provisorio': caminho_provisorio, 'custo_provisorio': custo_provisorio,
+            'fases': dict(marcar.fases), 'estatisticas_z3': z3_estatisticas,
+            'variaveis': estatisticas.get('variaveis'), 'assercoes': estatisticas.get('assercoes'), 'cache': False,
+            'limite_inferior': limite_inferior, 'gap': gap}
+
 # Teste com diferentes matrizes de distâncias
 
 # # Teste 1: Caso Simples (3 cidades)
@@ -339,6 +345,21 @@ distance_matrix_test_20 = [
     [19, 36, 22, 32, 46, 34, 23, 30, 11, 43, 25, 24, 30, 31, 19, 38, 50, 15, 12, 0]
 ]
 
-print("Teste 20:")
-tsp_solver(distance_matrix_test_20)
-
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Resolve uma instância do TSP com o Z3.")
+    parser.add_argument('instancia', nargs='?', default=None,
+                        help="arquivo .tsp/.atsp, .npy ou .json (padrão: a matriz de teste de 20 cidades)")
+    parser.add_argument('--cache', default=None, metavar='ARQUIVO',
+                        help="cache SQLite de resultados ótimos, consultado antes de resolver e atualizado depois")
+    args = parser.parse_args()
+    cache = abrir_cache(args.cache) if args.cache else None
+    if args.instancia is not None:
+        # python app_saidaComum.py instancia.tsp (ou .atsp, .npy, .json)
+        matriz = carregar_instancia(args.instancia)
+        # Instâncias grandes vão direto para a decomposição em grupos
+        modo = 'decomposicao' if len(matriz) > 2 * TAMANHO_CLUSTER else 'mtz'
+        tsp_solver(matriz, modo=modo, cache=cache)
+    else:
+        print("Teste 20:")
+        tsp_solver(distance_matrix_test_20, cache=cache)
@@ -1,136 +1,85 @@
-from z3 import *
-from itertools import permutations
-
-def tsp_solver(distance_matrix):
+from app_saidaComum import tsp_solver as resolver
+from avaliacao import custo_caminho, custos_caminhos, parcelas_caminho
+from carregamento import como_lista
+from limites import gap, limite_inferior
+from verificador import held_karp
+from enumerador import relatorio_melhores_caminhos
+
+# A resolução é a de app_saidaComum.tsp_solver (aquecimento pela heurística, limite inferior e parada quando o
+# caminho provisório já o alcança); aqui fica só o relatório detalhado do caminho encontrado
+def tsp_solver(distance_matrix, k_melhores=0, codificacao='bitvector', **opcoes):
+    distance_matrix = como_lista(distance_matrix)
     n = len(distance_matrix)
     print(f"Número de cidades: {n} \n")
 
-    x = []
-    for i in range(n):
-        row = []
-        for j in range(n):
-            var = Int(f'x[{i}][{j}]')
-            row.append(var)
-        x.append(row)
-
-    solver = Optimize()
-
-    # Variáveis de decisão x[i][j] binárias (0 ou 1)
-    for i in range(n):
-        for j in range(n):
-            if i != j:
-                solver.add(Or(x[i][j] == 0, x[i][j] == 1))
-            else:
-                solver.add(x[i][j] == 0)
-
-    # Restrições de entrada e saída (uma entrada e uma saída por cidade)
-    for i in range(n):
-        sum_saida = 0
-        sum_entrada = 0
-        for j in range(n):
-            sum_saida += x[i][j]
-            sum_entrada += x[j][i]
-        solver.add(sum_saida == 1)  # uma saída
-        solver.add(sum_entrada == 1)  # uma entrada
-
-    # Variáveis auxiliares para evitar subciclos
-    u = [Int(f'u[{i}]') for i in range(n)]
-    for i in range(1, n):
-        solver.add(u[i] >= 1)
-        solver.add(u[i] <= n - 1)
-
-    # Restrições de subtour elimination: se x[i][j] == 1, então u[i] + 1 == u[j]
-    for i in range(1, n):
-        for j in range(1, n):
-            if i != j:
-                solver.add(Implies(x[i][j] == 1, u[i] + 1 == u[j]))
-
-    # Adicionando restrição para garantir que não haja subciclos
-    for i in range(1, n):
-        for j in range(1, n):
-            if i != j:
-                solver.add(Implies(x[i][j] == 1, u[i] != u[j]))
-
-    # Função objetivo: minimizar a soma das distâncias percorridas
-    objective = Int('objective')
-    objective_expr = 0
-    for i in range(n):
-        for j in range(n):
-            objective_expr += distance_matrix[i][j] * x[i][j]
-    solver.add(objective == objective_expr)
-    solver.minimize(objective)
-
-    if solver.check() == sat:
-        model = solver.model()
-
+    resultado = resolver(distance_matrix, codificacao=codificacao, destinos=opcoes.pop('destinos', []), **opcoes)
+    if resultado['caminho'] is not None:
         print("Solução encontrada:")
-        caminho = []
-        cidade_atual = 0  # Começando da cidade 0
-        caminho.append(cidade_atual)
-
-        for i in range(n - 1):  # Precisamos de n-1 movimentos para completar o ciclo
-            for j in range(n):
-                if model.evaluate(x[cidade_atual][j]) == 1:
-                    caminho.append(j)
-                    cidade_atual = j
-                    break
-        caminho.append(0)  # Volta para a cidade inicial
+        caminho = resultado['caminho']
 
         # Exibir detalhes do caminho sugerido
-        exibir_resultado(distance_matrix, caminho)
+        exibir_resultado(distance_matrix, caminho, k_melhores)
 
     else:
         print('Nenhuma solução encontrada.')
+    return resultado
 
 def calcular_distancia_total(caminho, matriz_distancias):
-    distancia_total = 0
-    for i in range(len(caminho) - 1):
-        distancia_total += matriz_distancias[caminho[i]][caminho[i+1]]
-    return distancia_total
+    return custo_caminho(matriz_distancias, caminho)
 
+# As parcelas de cada aresta são lidas uma única vez e reaproveitadas nas linhas e na soma
 def exibir_detalhes_caminho(caminho, matriz_distancias):
-    detalhes = []
-    soma_total = 0
-    for i in range(len(caminho) - 1):
-        origem = caminho[i]
-        destino = caminho[i+1]
-        distancia = matriz_distancias[origem][destino]
-        detalhes.append(f"{origem} → {destino}: {distancia}")
-        soma_total += distancia
-    detalhes.append(f"Soma total: {soma_total}")
+    parcelas = parcelas_caminho(matriz_distancias, caminho)
+    soma_total = sum(parcelas)
+    detalhes = [f"{origem} → {destino}: {distancia}"
+                for origem, destino, distancia in zip(caminho, caminho[1:], parcelas)]
+    detalhes.append(f"Soma total: {' + '.join(map(str, parcelas))} = {soma_total}")
     return detalhes, soma_total
 
+# Verificação exata por Held-Karp: substitui a enumeração de todas as (n-1)! permutações
 def verificar_outros_caminhos(matriz_distancias, caminho_sugerido):
-    num_cidades = len(matriz_distancias)
-    todas_permutacoes = list(permutations(range(1, num_cidades)))
-    
-    detalhes = []
-    melhor_caminho = caminho_sugerido
-    menor_distancia = calcular_distancia_total(caminho_sugerido, matriz_distancias)
+    caminho_otimo, distancia_otima = held_karp(matriz_distancias)
+    # Os dois caminhos são avaliados juntos, em uma única passada vetorizada
+    custo_sugerido, custo_otimo = custos_caminhos(matriz_distancias, [caminho_sugerido, caminho_otimo]).tolist()
+    melhor_caminho, menor_distancia = caminho_sugerido, custo_sugerido
+    if custo_otimo < custo_sugerido:
+        melhor_caminho, menor_distancia = caminho_otimo, custo_otimo
+    detalhes_caminho_str = ' + '.join(map(str, parcelas_caminho(matriz_distancias, caminho_otimo)))
+    detalhes = [f"Ótimo (Held-Karp) {caminho_otimo}: {detalhes_caminho_str} = {distancia_otima}"]
 
-    for permutacao in todas_permutacoes:
-        caminho = [0] + list(permutacao) + [0]
-        distancia = calcular_distancia_total(caminho, matriz_distancias)
-        if distancia < menor_distancia:
-            menor_distancia = distancia
-            melhor_caminho = caminho
-        detalhes_caminho, soma = exibir_detalhes_caminho(caminho, matriz_distancias)
-        detalhes_caminho_str = ' + '.join([str(matriz_distancias[caminho[i]][caminho[i+1]]) for i in range(len(caminho)-1)])
-        detalhes.append(f"{caminho}: {detalhes_caminho_str} = {distancia}")
-    
     return melhor_caminho, menor_distancia, detalhes
 
-def exibir_resultado(matriz_distancias, caminho_sugerido):
+def exibir_resultado(matriz_distancias, caminho_sugerido, k_melhores=0, limite=None):
     print("Caminho sugerido:", caminho_sugerido)
     detalhes_caminho, soma_total = exibir_detalhes_caminho(caminho_sugerido, matriz_distancias)
     print("Cálculo da soma das distâncias:")
-    for detalhe in detalhes_caminho[:-1]:
+    for detalhe in detalhes_caminho:
         print(detalhe)
-    detalhes_soma_total = ' + '.join([str(matriz_distancias[caminho_sugerido[i]][caminho_sugerido[i+1]]) for i in range(len(caminho_sugerido)-1)])
-    print(f"Soma total: {detalhes_soma_total} = {soma_total}")
-    
-    print("Verificação de outros caminhos possíveis:")
-    melhor_caminho, menor_distancia, detalhes_outros = verificar_outros_caminhos(matriz_distancias, caminho_sugerido)
+
+    # Um caminho que alcança o limite inferior (1-árvore ou atribuição) é ótimo sem comparar com nenhum outro
+    limite = limite_inferior(matriz_distancias, soma_total) if limite is None else limite
+    print(f"Limite inferior ({limite['metodo']}): {limite['custo']}; gap do caminho sugerido: "
+          f"{gap(soma_total, limite['custo']):.2%}")
+    if soma_total <= limite['custo']:
+        print(f"O caminho sugerido de custo {soma_total} alcança o limite inferior e é de fato o menor. Solução correta.")
+    else:
+        print("Verificação exata contra todos os caminhos possíveis:")
+        try:
+            melhor_caminho, menor_distancia, detalhes_outros = verificar_outros_caminhos(matriz_distancias,
+                                                                                         caminho_sugerido)
+        except ValueError as erro:
+            # Held-Karp sem memória para esta instância: fica o gap até o limite
+            print(f"{erro} Sem verificação exata; o gap acima limita a distância até o ótimo.")
+        else:
+            exibir_verificacao(soma_total, melhor_caminho, menor_distancia, detalhes_outros)
+
+    # Relatório opcional dos K melhores caminhos, gerado por branch-and-bound em paralelo
+    if k_melhores:
+        print(f"Os {k_melhores} melhores caminhos:")
+        for linha in relatorio_melhores_caminhos(matriz_distancias, k_melhores):
+            print(linha)
+
+def exibir_verificacao(soma_total, melhor_caminho, menor_distancia, detalhes_outros):
     for detalhe in detalhes_outros:
         print(detalhe)
     
@@ -162,5 +111,6 @@ distance_matrix_test_20 = [
     [42, 17, 48, 44, 34, 24, 39, 22, 22, 28, 18, 21, 16, 50, 27, 44, 36, 19, 0, 12],
     [19, 36, 22, 32, 46, 34, 23, 30, 11, 43, 25, 24, 30, 31, 19, 38, 50, 15, 12, 0]
 ]
-print("Teste 20:")
-tsp_solver(distance_matrix_test_20)
+if __name__ == "__main__":
+    print("Teste 20:")
+    tsp_solver(distance_matrix_test_20)
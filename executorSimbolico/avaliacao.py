@@ -0,0 +1,68 @@
+"""
+Avaliação vetorizada de caminhos.
+
+Em vez de percorrer cada caminho em Python, custos_caminhos recebe um array
+2-D com muitos caminhos (um por linha, todos do mesmo tamanho) e obtém todas
+as distâncias das arestas com uma única indexação do NumPy. Um caminho é uma
+sequência de cidades; os ciclos do projeto já terminam na cidade de partida,
+então prefixos e ciclos completos são avaliados da mesma forma. As parcelas
+de cada aresta só são montadas por parcelas_caminho, para os caminhos que
+de fato são exibidos.
+"""
+
+import numpy as np
+
+# Arestas avaliadas por bloco: blocos pequenos mantêm os arrays intermediários no cache do processador
+ARESTAS_POR_BLOCO = 1 << 17
+
+
+# Matrizes de coordenadas (carregamento.MatrizCoordenadas) calculam só as arestas pedidas
+def _distancias(d, origens, destinos):
+    if hasattr(d, 'distancias'):
+        return d.distancias(origens, destinos)
+    return d[origens, destinos]
+
+
+# A matriz vazia vira (0, 0): np.asarray([]) tem uma única dimensão
+def _como_matriz(d):
+    if hasattr(d, 'distancias'):
+        return d
+    d = np.asarray(d)
+    return d.reshape(0, 0) if d.size == 0 else d
+
+
+def custos_caminhos(d, caminhos):
+    """Array com o custo de cada linha de caminhos (array ou lista de caminhos do mesmo tamanho)."""
+    d = _como_matriz(d)
+    t = np.asarray(caminhos, dtype=np.intp)
+    if t.ndim != 2:
+        raise ValueError("caminhos deve ser um array 2-D, com um caminho por linha e todos do mesmo tamanho")
+    linhas = max(1, ARESTAS_POR_BLOCO // max(1, t.shape[1]))
+    coordenadas = hasattr(d, 'distancias')
+    if not coordenadas:
+        plana, n = d.ravel(), d.shape[1]  # índice linear i * n + j: np.take é mais rápido que d[i, j]
+    inteira = coordenadas or d.dtype.kind in 'biu'
+    custos = np.empty(t.shape[0], dtype=np.int64 if inteira else np.float64)  # sem estouro em matrizes int32
+    for inicio in range(0, t.shape[0], linhas):
+        bloco = t[inicio:inicio + linhas]
+        if coordenadas:
+            custos[inicio:inicio + linhas] = d.distancias(bloco[:, :-1], bloco[:, 1:]).sum(axis=1)
+        else:
+            indices = bloco[:, :-1] * n
+            indices += bloco[:, 1:]
+            custos[inicio:inicio + linhas] = np.take(plana, indices).sum(axis=1)
+    return custos
+
+
+def custo_caminho(d, caminho):
+    """Custo de um único caminho, como número do Python."""
+    if len(caminho) < 2:
+        return 0
+    return custos_caminhos(d, [caminho])[0].item()
+
+
+def parcelas_caminho(d, caminho):
+    """Distância de cada aresta do caminho, como números do Python."""
+    t = np.asarray(caminho, dtype=np.intp)
+    return np.asarray(_distancias(_como_matriz(d), t[:-1], t[1:])).tolist()
+
@@ -0,0 +1,269 @@
+"""
+Benchmark reprodutível do solver do TSP.
+
+Gera instâncias com sementes fixas em várias famílias (simétrica, assimétrica,
+euclidiana, agrupada e as matrizes de teste em instancias/) e tamanhos, resolve
+cada uma com cada configuração do solver e registra: tempo de construção do
+modelo, tempo de check(), pico de memória residente (RSS), estatísticas do Z3,
+tamanho do modelo e status de otimalidade. Para instâncias pequenas o custo é
+conferido contra o ótimo de Held-Karp. Cada medição roda em um processo novo,
+para que o pico de RSS seja só daquela execução.
+
+Uso pela linha de comando:
+    python benchmark.py --familias simetrica euclidiana --tamanhos 5 10 15 \\
+        --configuracoes bitvector cortes --prazo 60 --json resultados.json --csv resultados.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import z3
+
+from avaliacao import custo_caminho
+from codificacoes import (construir_modelo, escolher_codificacao, estatisticas_modelo, extrair_caminho, limitar_objetivo,
+                          limitar_objetivo_inferior, sugerir_caminho)
+from cortes import resolver_com_cortes
+from esparso import resolver_esparso
+from eventos import estatisticas_z3
+from heuristicas import heuristica
+from limites import limite_inferior
+from verificador import held_karp
+
+FAMILIAS = ('simetrica', 'assimetrica', 'euclidiana', 'agrupada', 'testes')
+
+# Configurações do solver comparadas pelo benchmark
+CONFIGURACOES = {
+    'inteira': {'modo': 'mtz', 'codificacao': 'inteira', 'aquecimento': False},
+    'booleana': {'modo': 'mtz', 'codificacao': 'booleana', 'aquecimento': False},
+    'bitvector': {'modo': 'mtz', 'codificacao': 'bitvector', 'aquecimento': False},
+    'bitvector_aquecido': {'modo': 'mtz', 'codificacao': 'bitvector', 'aquecimento': True},
+    # Simétrica quando a matriz permite, bitvector nas demais (a codificação usada fica no registro)
+    'simetrica': {'modo': 'mtz', 'codificacao': 'simetrica', 'aquecimento': False},
+    'cortes': {'modo': 'cortes', 'aquecimento': False},
+    'cortes_aquecido': {'modo': 'cortes', 'aquecimento': True},
+    # O modo esparso sempre parte de um caminho da heurística, que garante um ciclo entre as candidatas
+    'esparso': {'modo': 'esparso', 'aquecimento': True},
+}
+
+# Até este tamanho o custo encontrado é conferido contra o ótimo de Held-Karp
+TAMANHO_MAXIMO_REFERENCIA = 16
+
+DIRETORIO_TESTES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instancias')
+
+
+def _distancias_euclidianas(pontos):
+    diferencas = pontos[:, None, :] - pontos[None, :, :]
+    return np.rint(np.sqrt((diferencas ** 2).sum(axis=2))).astype(int)
+
+
+def gerar_instancia(familia, n, semente):
+    """Matriz n x n (lista de listas de int) da família, sempre a mesma para a mesma semente."""
+    rng = np.random.default_rng((semente, n, FAMILIAS.index(familia)))
+    if familia == 'simetrica':
+        d = rng.integers(1, 100, (n, n))
+        d = np.triu(d, 1)
+        d = d + d.T
+    elif familia == 'assimetrica':
+        d = rng.integers(1, 100, (n, n))
+    elif familia == 'euclidiana':
+        d = _distancias_euclidianas(rng.uniform(0, 1000, (n, 2)))
+    elif familia == 'agrupada':
+        centros = rng.uniform(0, 1000, (max(1, n // 5), 2))
+        pontos = centros[rng.integers(0, len(centros), n)] + rng.normal(0, 30, (n, 2))
+        d = _distancias_euclidianas(pontos)
+    else:
+        raise ValueError(f"Família desconhecida: {familia!r}. Opções: {', '.join(FAMILIAS)}")
+    np.fill_diagonal(d, 0)
+    return d.tolist()
+
+
+# As matrizes de teste têm tamanho fixo, por isso não dependem de n nem da semente
+def instancias_de_teste(diretorio=DIRETORIO_TESTES):
+    for nome in sorted(os.listdir(diretorio)):
+        if nome.endswith('.json'):
+            with open(os.path.join(diretorio, nome)) as f:
+                yield os.path.splitext(nome)[0], json.load(f)
+
+
+def _pico_rss_kb():
+    import resource
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico // 1024 if sys.platform == 'darwin' else pico  # macOS informa em bytes
+
+
+# Executada em um processo novo para cada medição
+def _medir(matriz, configuracao, prazo):
+    parametros = CONFIGURACOES[configuracao]
+    registro = {'status': None, 'custo': None, 'tempo_heuristica': 0.0}
+    try:
+        caminho_inicial = custo_inicial = limite = None
+        if parametros['aquecimento']:
+            inicio = time.perf_counter()
+            caminho_inicial, custo_inicial = heuristica(matriz)
+            registro['tempo_heuristica'] = time.perf_counter() - inicio
+        # Limite inferior (limites.py), como em tsp_solver; o modo esparso calcula o seu
+        if parametros['modo'] != 'esparso' and len(matriz) > 1:
+            inicio = time.perf_counter()
+            limite = limite_inferior(matriz, custo_inicial)['custo']
+            registro.update(tempo_limite=time.perf_counter() - inicio, limite_inferior=limite)
+
+        if limite is not None and custo_inicial is not None and custo_inicial <= limite:
+            # O caminho da heurística já alcança o limite: é ótimo sem montar nenhum modelo
+            registro.update(tempo_construcao=0.0, tempo_check=0.0)
+            modelo, caminho, expirou = None, caminho_inicial, False
+        elif parametros['modo'] == 'cortes':
+            registro['tempo_construcao'] = 0.0  # o modelo é montado e ampliado dentro do laço de cortes
+            inicio = time.perf_counter()
+            resultado = resolver_com_cortes(matriz, caminho_inicial=caminho_inicial, prazo=prazo,
+                                            limite_inferior=limite)
+            registro['tempo_check'] = time.perf_counter() - inicio
+            modelo, caminho = resultado['modelo'], resultado['caminho']
+            registro['iteracoes'] = resultado['iteracoes']
+            registro['cortes'] = resultado['cortes']
+            expirou = resultado['prazo_esgotado']
+        elif parametros['modo'] == 'esparso':
+            registro['tempo_construcao'] = 0.0  # o modelo é ampliado dentro da resolução
+            inicio = time.perf_counter()
+            resultado = resolver_esparso(matriz, caminho_inicial=caminho_inicial, prazo=prazo)
+            registro['tempo_check'] = time.perf_counter() - inicio
+            modelo = None
+            caminho = resultado['caminho'] if resultado['otimo'] else None
+            expirou = not resultado['otimo']
+            registro['iteracoes'] = resultado['rodadas']
+            registro['limite_inferior'] = resultado['limite_inferior']
+            registro.update(codificacao=escolher_codificacao(matriz), variaveis=resultado['variaveis'],
+                            assercoes=resultado['assercoes'], estatisticas_z3=resultado['estatisticas_z3'])
+        else:
+            inicio = time.perf_counter()
+            codificacao = parametros['codificacao']
+            if codificacao == 'simetrica':
+                codificacao = escolher_codificacao(matriz)
+            modelo = construir_modelo(matriz, codificacao)
+            if caminho_inicial is not None:
+                limitar_objetivo(modelo, custo_caminho(matriz, caminho_inicial))
+                sugerir_caminho(modelo, caminho_inicial)
+            if limite is not None:
+                limitar_objetivo_inferior(modelo, limite)
+            registro['tempo_construcao'] = time.perf_counter() - inicio
+            solver = modelo['solver']
+            if prazo is not None:
+                solver.set('timeout', max(1, int(prazo * 1000)))
+            inicio = time.perf_counter()
+            status = solver.check()
+            registro['tempo_check'] = time.perf_counter() - inicio
+            caminho = extrair_caminho(modelo, solver.model()) if status == z3.sat else None
+            expirou = status == z3.unknown
+
+        if caminho is not None:
+            registro['status'] = 'otimo'
+            registro['custo'] = custo_caminho(matriz, caminho)
+        else:
+            registro['status'] = 'prazo_esgotado' if expirou else 'sem_solucao'
+        if modelo is not None:
+            registro.update(estatisticas_modelo(modelo))
+            registro['estatisticas_z3'] = estatisticas_z3(modelo['solver'])
+    except Exception:
+        registro['status'] = 'erro'
+        registro['erro'] = traceback.format_exc()
+    registro['rss_pico_kb'] = _pico_rss_kb()
+    return registro
+
+
+def _casos(familias, tamanhos, sementes):
+    for familia in familias:
+        if familia == 'testes':
+            for nome, matriz in instancias_de_teste():
+                yield {'familia': 'testes', 'instancia': nome, 'n': len(matriz), 'semente': None}, matriz
+            continue
+        for n in tamanhos:
+            for semente in sementes:
+                caso = {'familia': familia, 'instancia': f'{familia}_{n}_{semente}', 'n': n, 'semente': semente}
+                yield caso, gerar_instancia(familia, n, semente)
+
+
+def executar_benchmark(familias=FAMILIAS, tamanhos=(3, 5, 8, 10, 12, 15, 20, 25, 30), sementes=(0,),
+                       configuracoes=tuple(CONFIGURACOES), prazo=60, processos=1):
+    """Gera um registro (dicionário) por par instância x configuração, na ordem das medições.
+
+    processos > 1 mede várias execuções ao mesmo tempo, o que é mais rápido mas
+    deixa os tempos menos comparáveis entre si.
+    """
+    for configuracao in configuracoes:
+        if configuracao not in CONFIGURACOES:
+            raise ValueError(f"Configuração desconhecida: {configuracao!r}. Opções: {', '.join(CONFIGURACOES)}")
+    with ProcessPoolExecutor(max_workers=processos, max_tasks_per_child=1) as executor:
+        for caso, matriz in _casos(familias, tamanhos, sementes):
+            referencia = held_karp(matriz)[1] if 1 < len(matriz) <= TAMANHO_MAXIMO_REFERENCIA else None
+            futuros = [(configuracao, executor.submit(_medir, matriz, configuracao, prazo))
+                       for configuracao in configuracoes]
+            for configuracao, futuro in futuros:
+                registro = dict(caso, configuracao=configuracao, custo_referencia=referencia)
+                registro.update(futuro.result())
+                if referencia is not None and registro['custo'] is not None and registro['custo'] != referencia:
+                    registro['status'] = 'incorreto'
+                yield registro
+
+
+def metadados():
+    return {
+        'data': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'z3': z3.get_version_string(),
+        'numpy': np.__version__,
+        'plataforma': platform.platform(),
+        'processador': platform.processor() or platform.machine(),
+    }
+
+
+def salvar_json(registros, arquivo):
+    with open(arquivo, 'w') as f:
+        json.dump({'metadados': metadados(), 'resultados': registros}, f, indent=2, ensure_ascii=False)
+
+
+COLUNAS_CSV = ('familia', 'instancia', 'n', 'semente', 'configuracao', 'codificacao', 'status', 'custo',
+               'custo_referencia', 'limite_inferior', 'tempo_heuristica', 'tempo_limite', 'tempo_construcao', 'tempo_check', 'rss_pico_kb', 'variaveis',
+               'assercoes', 'iteracoes', 'cortes', 'estatisticas_z3')
+
+
+def salvar_csv(registros, arquivo):
+    with open(arquivo, 'w', newline='') as f:
+        escritor = csv.DictWriter(f, fieldnames=COLUNAS_CSV, extrasaction='ignore')
+        escritor.writeheader()
+        for registro in registros:
+            linha = dict(registro)
+            linha['estatisticas_z3'] = json.dumps(registro.get('estatisticas_z3', {}))
+            escritor.writerow(linha)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark reprodutível do solver do TSP.")
+    parser.add_argument('--familias', nargs='+', default=list(FAMILIAS), choices=FAMILIAS)
+    parser.add_argument('--tamanhos', nargs='+', type=int, default=[3, 5, 8, 10, 12, 15, 20, 25, 30])
+    parser.add_argument('--sementes', nargs='+', type=int, default=[0])
+    parser.add_argument('--configuracoes', nargs='+', default=list(CONFIGURACOES), choices=list(CONFIGURACOES))
+    parser.add_argument('--prazo', type=float, default=60, help="prazo por medição, em segundos")
+    parser.add_argument('--processos', type=int, default=1, help="medições simultâneas")
+    parser.add_argument('--json', default=None, help="arquivo JSON de saída")
+    parser.add_argument('--csv', default=None, help="arquivo CSV de saída")
+    args = parser.parse_args()
+
+    registros = []
+    for registro in executar_benchmark(args.familias, args.tamanhos, args.sementes, args.configuracoes,
+                                       args.prazo, args.processos):
+        registros.append(registro)
+        custo = registro['custo'] if registro['custo'] is not None else '-'
+        print(f"{registro['instancia']:<22} {registro['configuracao']:<20} {registro['status']:<15} "
+              f"custo {custo:<8} construção {registro.get('tempo_construcao', 0):.3f} s  "
+              f"check {registro.get('tempo_check', 0):.3f} s  RSS {registro['rss_pico_kb']} KiB", flush=True)
+    if args.json:
+        salvar_json(registros, args.json)
+    if args.csv:
+        salvar_csv(registros, args.csv)
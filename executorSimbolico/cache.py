@@ -0,0 +1,127 @@
+"""
+Cache persistente de instâncias resolvidas, endereçado pelo conteúdo da matriz.
+
+Cada resultado ótimo é guardado em um banco SQLite com a chave SHA-256 da
+matriz de distâncias. Com canonização, as cidades são antes reordenadas por
+um refinamento de cores (cada cidade é caracterizada pelas distâncias de saída
+e de entrada e pelas classes das cidades vizinhas), de modo que matrizes que só
+diferem pela numeração das cidades caem na mesma chave; o caminho é guardado
+nos rótulos canônicos e traduzido de volta na consulta. Quando o refinamento
+não separa todas as cidades, o desempate pelo índice original mantém o
+resultado correto, apenas com menos acertos entre permutações.
+
+O banco fica em modo WAL e cada processo abre sua própria conexão, então
+vários processos (por exemplo, os do lote.py) podem ler e gravar ao mesmo tempo.
+O número de entradas é limitado e as menos recentemente usadas são descartadas.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+ARQUIVO_PADRAO = os.path.join(os.path.expanduser('~'), '.cache', 'executor_simbolico', 'resultados.sqlite')
+TAMANHO_MAXIMO_PADRAO = 10000
+
+
+def abrir_cache(arquivo=ARQUIVO_PADRAO, tamanho_maximo=TAMANHO_MAXIMO_PADRAO, canonizar=True):
+    """Retorna o cache (um dicionário) usado por buscar_resultado e guardar_resultado."""
+    diretorio = os.path.dirname(os.path.abspath(arquivo))
+    os.makedirs(diretorio, exist_ok=True)
+    cache = {'arquivo': arquivo, 'tamanho_maximo': tamanho_maximo, 'canonizar': canonizar,
+             'conexao': None, 'pid': None}
+    _conexao(cache)
+    return cache
+
+
+# Conexões SQLite não podem atravessar um fork: cada processo abre a sua
+def _conexao(cache):
+    if cache['conexao'] is None or cache['pid'] != os.getpid():
+        conexao = sqlite3.connect(cache['arquivo'], timeout=30, isolation_level=None)
+        conexao.execute('PRAGMA journal_mode=WAL')
+        conexao.execute('PRAGMA synchronous=NORMAL')  # em WAL, não força o disco a cada consulta
+        conexao.execute('CREATE TABLE IF NOT EXISTS resultados ('
+                        'chave TEXT PRIMARY KEY, n INTEGER, caminho TEXT, custo TEXT, acesso REAL)')
+        conexao.execute('CREATE INDEX IF NOT EXISTS resultados_acesso ON resultados (acesso)')
+        cache['conexao'], cache['pid'] = conexao, os.getpid()
+    return cache['conexao']
+
+
+def rotulacao_canonica(matriz):
+    """Ordem das cidades (ordem[k] = cidade original na posição canônica k), independente da numeração."""
+    d = np.asarray(matriz, dtype=float)
+    n = len(d)
+    cores = np.zeros(n, dtype=np.int64)
+    quantidade = 1
+    for _ in range(n):
+        # Assinatura de cada cidade: sua cor e os pares (distância, cor do vizinho) de saída e de entrada, ordenados
+        vizinhos = np.broadcast_to(cores.astype(float), (n, n))
+        saida = np.lexsort((vizinhos, d))
+        entrada = np.lexsort((vizinhos, d.T))
+        assinaturas = np.hstack([cores[:, None].astype(float),
+                                 np.take_along_axis(d, saida, 1), np.take_along_axis(vizinhos, saida, 1),
+                                 np.take_along_axis(d.T, entrada, 1), np.take_along_axis(vizinhos, entrada, 1)])
+        # Qualquer ordem total que não dependa da numeração serve; a dos bytes é a mais barata
+        chaves = [linha.tobytes() for linha in assinaturas]
+        classes = {chave: cor for cor, chave in enumerate(sorted(set(chaves)))}
+        cores = np.array([classes[chave] for chave in chaves], dtype=np.int64)
+        if len(classes) == quantidade or len(classes) == n:
+            break
+        quantidade = len(classes)
+    return np.lexsort((np.arange(n), cores)).tolist()
+
+
+# Chave do cache e ordem canônica das cidades (identidade quando não há canonização).
+# A chave vem dos bytes da matriz em float64, então listas, ndarrays e matrizes
+# mapeadas em memória ou de coordenadas com as mesmas distâncias têm a mesma chave.
+def _chave_e_ordem(cache, matriz):
+    n = len(matriz)
+    d = np.asarray(matriz, dtype=float).reshape(n, n)
+    ordem = rotulacao_canonica(d) if cache['canonizar'] else list(range(n))
+    canonica = np.ascontiguousarray(d[np.ix_(ordem, ordem)])
+    return hashlib.sha256(canonica.tobytes()).hexdigest(), ordem
+
+
+def buscar_resultado(cache, matriz):
+    """Retorna {'caminho', 'custo'} com o caminho nos rótulos de matriz, ou None se não estiver no cache."""
+    chave, ordem = _chave_e_ordem(cache, matriz)
+    conexao = _conexao(cache)
+    linha = conexao.execute('SELECT caminho, custo FROM resultados WHERE chave = ?', (chave,)).fetchone()
+    if linha is None:
+        return None
+    conexao.execute('UPDATE resultados SET acesso = ? WHERE chave = ?', (time.time(), chave))
+    caminho = [ordem[cidade] for cidade in json.loads(linha[0])[:-1]]
+    inicio = caminho.index(0)
+    caminho = caminho[inicio:] + caminho[:inicio] + [0]
+    return {'caminho': caminho, 'custo': json.loads(linha[1])}
+
+
+def guardar_resultado(cache, matriz, caminho, custo):
+    """Guarda um caminho ótimo de matriz, descartando as entradas menos usadas além do limite."""
+    chave, ordem = _chave_e_ordem(cache, matriz)
+    posicao = {cidade: k for k, cidade in enumerate(ordem)}
+    caminho_canonico = [posicao[cidade] for cidade in caminho]
+    conexao = _conexao(cache)
+    conexao.execute('BEGIN IMMEDIATE')
+    try:
+        conexao.execute('INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?, ?)',
+                        (chave, len(ordem), json.dumps(caminho_canonico), json.dumps(custo), time.time()))
+        excesso = conexao.execute('SELECT COUNT(*) FROM resultados').fetchone()[0] - cache['tamanho_maximo']
+        if excesso > 0:
+            conexao.execute('DELETE FROM resultados WHERE chave IN '
+                            '(SELECT chave FROM resultados ORDER BY acesso LIMIT ?)', (excesso,))
+        conexao.execute('COMMIT')
+    except BaseException:
+        conexao.execute('ROLLBACK')
+        raise
+
+
+def limpar_cache(cache):
+    _conexao(cache).execute('DELETE FROM resultados')
+
+
+def tamanho_cache(cache):
+    return _conexao(cache).execute('SELECT COUNT(*) FROM resultados').fetchone()[0]
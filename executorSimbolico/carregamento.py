@@ -0,0 +1,216 @@
+"""
+Leitura de instâncias do TSP: TSPLIB, matrizes NumPy (.npy) e JSON.
+
+- TSPLIB (.tsp/.atsp): EDGE_WEIGHT_TYPE EXPLICIT nos formatos FULL_MATRIX,
+  UPPER_ROW, LOWER_ROW, UPPER_DIAG_ROW, LOWER_DIAG_ROW e seus equivalentes por
+  coluna, que viram um ndarray; EUC_2D e GEO, que viram uma MatrizCoordenadas.
+- .npy: carregado com np.load(mmap_mode='r'), sem ler o arquivo inteiro para a memória.
+- MatrizCoordenadas: guarda só as coordenadas e calcula cada distância quando
+  ela é pedida (matriz[i][j] ou matriz[i, j]); np.asarray(matriz) monta a
+  matriz completa de uma vez, de forma vetorizada.
+
+As funções que trabalham com NumPy (heuristicas.py, verificador.py) aceitam
+essas matrizes diretamente; as que montam expressões do Z3 passam antes por
+como_lista, já que o Z3 não aceita escalares do NumPy.
+"""
+
+import json
+import math
+import os
+
+import numpy as np
+
+RAIO_TERRA = 6378.388  # raio usado pela TSPLIB para distâncias GEO, em km
+PI_TSPLIB = 3.141592
+
+# Formatos por coluna de matrizes simétricas equivalem ao formato por linha do outro triângulo
+_FORMATOS_TRIANGULARES = {
+    'UPPER_ROW': ('superior', 1), 'LOWER_COL': ('superior', 1),
+    'LOWER_ROW': ('inferior', -1), 'UPPER_COL': ('inferior', -1),
+    'UPPER_DIAG_ROW': ('superior', 0), 'LOWER_DIAG_COL': ('superior', 0),
+    'LOWER_DIAG_ROW': ('inferior', 0), 'UPPER_DIAG_COL': ('inferior', 0),
+}
+
+_SECOES = ('NODE_COORD_SECTION', 'EDGE_WEIGHT_SECTION', 'DISPLAY_DATA_SECTION', 'DEPOT_SECTION',
+           'DEMAND_SECTION', 'FIXED_EDGES_SECTION', 'TOUR_SECTION', 'EOF')
+
+
+def _geo_radianos(coordenadas):
+    # Formato GEO da TSPLIB: graus.minutos (DDD.MM), com a parte inteira truncada
+    graus = np.trunc(coordenadas)
+    minutos = coordenadas - graus
+    return PI_TSPLIB * (graus + 5.0 * minutos / 3.0) / 180.0
+
+
+class MatrizCoordenadas:
+    """Matriz de distâncias calculada sob demanda a partir de coordenadas (EUC_2D ou GEO da TSPLIB)."""
+
+    def __init__(self, coordenadas, tipo='EUC_2D'):
+        if tipo not in ('EUC_2D', 'GEO'):
+            raise ValueError(f"Tipo de distância desconhecido: {tipo!r}. Opções: EUC_2D, GEO")
+        self.coordenadas = np.asarray(coordenadas, dtype=float)
+        self.tipo = tipo
+        self._pontos = _geo_radianos(self.coordenadas) if tipo == 'GEO' else self.coordenadas
+        self._lista = self._pontos.tolist()  # acesso escalar sem o custo dos escalares do NumPy
+
+    def __len__(self):
+        return len(self.coordenadas)
+
+    @property
+    def shape(self):
+        return (len(self), len(self))
+
+    def distancia(self, i, j):
+        a, b = self._lista[i], self._lista[j]
+        if self.tipo == 'EUC_2D':
+            return int(math.hypot(a[0] - b[0], a[1] - b[1]) + 0.5)
+        if i == j:
+            return 0
+        q1 = math.cos(a[1] - b[1])
+        q2 = math.cos(a[0] - b[0])
+        q3 = math.cos(a[0] + b[0])
+        return int(RAIO_TERRA * math.acos(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3)) + 1.0)
+
+    # Versão vetorizada de distancia para índices em arrays (com broadcasting)
+    def distancias(self, i, j):
+        a, b = self._pontos[i], self._pontos[j]
+        if self.tipo == 'EUC_2D':
+            return np.floor(np.hypot(a[..., 0] - b[..., 0], a[..., 1] - b[..., 1]) + 0.5).astype(np.int64)
+        q1 = np.cos(a[..., 1] - b[..., 1])
+        q2 = np.cos(a[..., 0] - b[..., 0])
+        q3 = np.cos(a[..., 0] + b[..., 0])
+        d = np.floor(RAIO_TERRA * np.arccos(np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0)) + 1.0)
+        return np.where(np.asarray(i) == np.asarray(j), 0, d).astype(np.int64)
+
+    def __getitem__(self, chave):
+        if isinstance(chave, tuple):
+            i, j = chave
+            if isinstance(i, (int, np.integer)) and isinstance(j, (int, np.integer)):
+                return self.distancia(int(i), int(j))
+            return self.distancias(np.asarray(i), np.asarray(j))
+        return _LinhaCoordenadas(self, int(chave))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield _LinhaCoordenadas(self, i)
+
+    def __array__(self, dtype=None, copy=None):
+        n = len(self)
+        d = self.distancias(np.arange(n)[:, None], np.arange(n)[None, :])
+        return d if dtype is None else d.astype(dtype)
+
+    def __repr__(self):
+        return f"MatrizCoordenadas({len(self)} cidades, {self.tipo})"
+
+
+class _LinhaCoordenadas:
+    def __init__(self, matriz, i):
+        self.matriz = matriz
+        self.i = i
+
+    def __len__(self):
+        return len(self.matriz)
+
+    def __getitem__(self, j):
+        if isinstance(j, (int, np.integer)):
+            return self.matriz.distancia(self.i, int(j))
+        return self.matriz.distancias(self.i, np.arange(len(self.matriz))[j])
+
+    def __iter__(self):
+        return iter(np.asarray(self).tolist())
+
+    def __array__(self, dtype=None, copy=None):
+        d = self.matriz.distancias(self.i, np.arange(len(self.matriz)))
+        return d if dtype is None else d.astype(dtype)
+
+
+def como_lista(matriz):
+    """Lista de listas com números do Python; listas de listas são devolvidas sem cópia."""
+    if isinstance(matriz, list) and all(isinstance(linha, list) for linha in matriz):
+        return matriz
+    return np.asarray(matriz).tolist()
+
+
+def _numeros(linhas):
+    return np.fromstring(' '.join(linhas), sep=' ')
+
+
+def _matriz_explicita(valores, n, formato):
+    if formato == 'FULL_MATRIX':
+        if len(valores) < n * n:
+            raise ValueError(f"EDGE_WEIGHT_SECTION tem {len(valores)} valores; FULL_MATRIX precisa de {n * n}")
+        d = valores[:n * n].reshape(n, n)
+    elif formato in _FORMATOS_TRIANGULARES:
+        triangulo, k = _FORMATOS_TRIANGULARES[formato]
+        indices = np.triu_indices(n, k) if triangulo == 'superior' else np.tril_indices(n, k)
+        if len(valores) < len(indices[0]):
+            raise ValueError(f"EDGE_WEIGHT_SECTION tem {len(valores)} valores; {formato} precisa de {len(indices[0])}")
+        d = np.zeros((n, n))
+        d[indices] = valores[:len(indices[0])]
+        d[indices[1], indices[0]] = valores[:len(indices[0])]
+    else:
+        raise ValueError(f"EDGE_WEIGHT_FORMAT não suportado: {formato!r}")
+    d = d.copy()
+    np.fill_diagonal(d, 0)  # arquivos ATSP costumam usar um valor enorme na diagonal
+    return d.astype(np.int64) if np.all(d == np.round(d)) else d
+
+
+def ler_tsplib(arquivo):
+    """Lê um arquivo TSPLIB e retorna (matriz, cabecalho).
+
+    matriz é um ndarray para EDGE_WEIGHT_TYPE EXPLICIT e uma MatrizCoordenadas
+    para EUC_2D e GEO; cabecalho traz os campos do arquivo (NAME, TYPE, DIMENSION...).
+    """
+    with open(arquivo) as f:
+        linhas = f.read().splitlines()
+
+    cabecalho = {}
+    secoes = {}
+    atual = None
+    for linha in linhas:
+        conteudo = linha.strip()
+        if not conteudo:
+            continue
+        palavra = conteudo.split(':')[0].split()[0].upper()
+        if palavra in _SECOES:
+            if palavra == 'EOF':
+                break
+            atual = secoes.setdefault(palavra, [])
+        elif atual is None or (':' in conteudo and not conteudo[0].isdigit() and not conteudo[0] in '-+.'):
+            chave, _, valor = conteudo.partition(':')
+            cabecalho[chave.strip().upper()] = valor.strip()
+            atual = None
+        else:
+            atual.append(conteudo)
+
+    n = int(cabecalho['DIMENSION'])
+    tipo = cabecalho.get('EDGE_WEIGHT_TYPE', 'EXPLICIT').upper()
+    if tipo == 'EXPLICIT':
+        formato = cabecalho.get('EDGE_WEIGHT_FORMAT', 'FULL_MATRIX').upper()
+        return _matriz_explicita(_numeros(secoes.get('EDGE_WEIGHT_SECTION', [])), n, formato), cabecalho
+    if tipo in ('EUC_2D', 'GEO'):
+        valores = _numeros(secoes.get('NODE_COORD_SECTION', []))
+        if len(valores) < 3 * n:
+            raise ValueError(f"NODE_COORD_SECTION tem {len(valores) // 3} cidades; DIMENSION é {n}")
+        nos = valores[:3 * n].reshape(n, 3)
+        nos = nos[np.argsort(nos[:, 0], kind='stable')]  # cidades em ordem de número
+        return MatrizCoordenadas(nos[:, 1:], tipo), cabecalho
+    raise ValueError(f"EDGE_WEIGHT_TYPE não suportado: {tipo!r}. Opções: EXPLICIT, EUC_2D, GEO")
+
+
+def ler_npy(arquivo):
+    """Matriz salva com np.save, mapeada em memória (somente leitura)."""
+    return np.load(arquivo, mmap_mode='r')
+
+
+def carregar_instancia(arquivo):
+    """Lê a matriz de um arquivo .tsp/.atsp (TSPLIB), .npy ou .json, conforme a extensão."""
+    extensao = os.path.splitext(arquivo)[1].lower()
+    if extensao in ('.tsp', '.atsp'):
+        return ler_tsplib(arquivo)[0]
+    if extensao == '.npy':
+        return ler_npy(arquivo)
+    if extensao == '.json':
+        with open(arquivo) as f:
+            return json.load(f)
+    raise ValueError(f"Formato de instância desconhecido: {arquivo!r}. Extensões: .tsp, .atsp, .npy, .json")
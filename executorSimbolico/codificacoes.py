@@ -0,0 +1,525 @@
+"""
+Codificações do Problema do Caixeiro Viajante para o Z3.
+
+A codificação "inteira" é a formulação original do projeto: cada aresta é uma
+variável Int restrita a 0 ou 1, os graus são somas inteiras e as restrições MTZ
+aparecem duas vezes (u[i] + 1 == u[j] e u[i] != u[j]). Isso leva o problema para
+aritmética linear inteira (LIA), em que o solver é lento.
+
+As codificações "booleana" e "bitvector" usam variáveis Bool para as arestas,
+restrições de cardinalidade pseudo-booleanas (PbEq/AtMost) para os graus e
+uma única restrição MTZ por aresta. Na "booleana" as variáveis de ordem u[i]
+são inteiras limitadas; na "bitvector" são vetores de bits, de modo que todas
+as restrições estruturais podem ser resolvidas por bit-blasting.
+
+A codificação "simetrica" serve a matrizes simétricas: cada par de cidades tem
+uma única aresta não direcionada, cada cidade tem grau 2, e a ordem de visita é
+dada por posições distintas em vetores de bits. O sentido do percurso é fixado
+por uma restrição de quebra de simetria, de modo que o solver não explora cada
+ciclo nas duas direções.
+"""
+
+import time
+
+import numpy as np
+from z3 import *
+
+from avaliacao import custo_caminho
+from carregamento import como_lista
+from eventos import sem_marcacao
+
+CODIFICACOES = ('inteira', 'booleana', 'bitvector')
+
+
+# Formulação original: arestas inteiras 0/1 e MTZ duplicado
+def _modelo_inteiro(n, solver, marcar=sem_marcacao):
+    x = [] # inicializa uma lista x que armazenará as variáveis inteiras que representarão se um caminho entre duas cidades é escolhido ou não.
+
+    # O objetivo desta parte do código é criar uma matriz de variáveis de decisão. Essas variáveis representam se há ou não um caminho entre duas cidades
+
+    for i in range(n): #Esse loop externo percorre cada cidade, onde i representa a cidade de origem.
+
+        row = [] #Essa lista armazena as variáveis que representam os possíveis caminhos saindo da cidade i, para cada linha.
+
+        for j in range(n): # percorre todas as cidades de destino, representadas por j. Assim, para cada cidade de origem i, estamos considerando todos os possíveis destinos j.
+
+            var = Int(f'x[{i}][{j}]')  #Cria as variáveis inteira simbolicas usando o Z3 com o nome x_i_j, onde i e j representam as cidades de origem e destino. Essa variável representa a existência de um caminho da cidade i para a cidade j.
+           
+            row.append(var)#Após preencher a lista row com todas as variáveis de decisão para os caminhos saindo da cidade i, essa lista é adicionada à matriz x. Essa matriz x acaba sendo uma lista de listas (ou matriz) onde cada sublista row contém as variáveis para uma cidade específica.
+
+        x.append(row) #No final do processo, x será uma matriz n x n onde cada elemento x[i][j] é uma variável que indica se o caminho da cidade i para a cidade j é parte da solução. O que temos nessa matriz são variáveis simbólicas, Essas variáveis não têm um valor
+
+    #DESCOMENTAR PARA OBSERVAR A MATRIZ X
+    # print("Matrix X de variáves simbólicas formada: ")
+    # for matrizX in x:
+    #     print(matrizX)
+
+    marcar('variaveis')
+
+    # Adição das restrições: x[i][j] deve ser 0 ou 1, ou seja, para cada par de cidade i e j, a variavel x[i][j] deve ser 0 ou 1    
+
+    for i in range(n):
+        for j in range(n):
+            if i != j: #verificamos se i e j são cidades diferentes. Isso porque não faz sentido viajar de uma cidade para ela mesma.
+
+                solver.add(Or(x[i][j] == 0, x[i][j] == 1)) # Se i for diferente de j, adicionamos uma restrição ao solver. Essa restrição diz que a variável x[i][j] só pode ser 0 ou 1, ou seja, ou viajamos (1) ou não viajamos (0) de i para j.
+
+            else: # Se i == j(ou seja, se estamos falando da mesma cidade)
+                
+                solver.add(x[i][j] == 0) #, adicionamos uma restrição dizendo que x[i][i] deve ser 0, porque não faz sentido viajar de uma cidade para ela mesma.
+
+    marcar('restricoes_binarias')
+
+    # Restrição que garante uma única entrada e saída (uma entrada e uma saída por cidade)
+    for i in range(n):
+
+        # Criamos duas variáveis para contar quantas rotas saem de i e quantas chegam em i        
+        sum_saida = 0
+        sum_entrada = 0
+
+        #loop sobre todas as cidades j.
+        for j in range(n):
+
+            sum_saida += x[i][j] # essa linha vai somar todas as rotas que saem da cidade i para todas as outras cidades j.
+            sum_entrada += x[j][i] # Essa linha faz a soma de todas as rotas que entram na cidade i vindas de qualquer outra cidade j.
+        solver.add(sum_saida == 1)  # Essa linha adiciona a restrição de que só pode haver uma rota saindo da cidade i. Ou seja, sum_saida deve ser exatamente igual a 1, o que impede que duas rotas saiam da mesma cidade.
+        solver.add(sum_entrada == 1)  # De forma similar, essa linha garante que só uma rota entra na cidade i, ou seja, o vendedor só chega na cidade uma vez.
+
+        """
+            Se, por alguma razão, o solver tentasse permitir duas rotas saindo da mesma cidade, como:
+
+            x[0][1] = 1 (A → B)
+            x[0][2] = 1 (A → C)i
+
+            Então, a soma sum_saida para a Cidade A seria:
+
+            sum_saida = x[0][1] + x[0][2] = 1 + 1 = 2
+
+            E isso violaria a restrição solver.add(sum_saida == 1), porque o solver está sendo forçado a garantir que sum_saida seja igual a 1.
+        """
+
+    marcar('restricoes_grau')
+
+    # Variáveis auxiliares para evitar subciclos
+    u = [Int(f'u[{i}]') for i in range(n)] # Aqui, estamos criando uma lista chamada u de variáveis inteiras (Int), com o mesmo tamanho do número de cidades n.
+    # Cada cidade vai receber uma variável u[i], que será usada para ajudar a evitar subciclos. Subciclos são pequenos ciclos dentro do grande ciclo do Caixeiro Viajante que fariam o vendedor repetir cidades, o que não pode acontecer.
+
+    """
+        Por que estamos criando a lista u[]?
+        Esse é um truque que ajuda a resolver o problema de forma correta. O problema do Caixeiro Viajante tem que garantir que o vendedor faça apenas um grande ciclo, ou seja, visite todas as cidades uma vez e retorne ao ponto de origem, sem formar ciclos menores no caminho (os subciclos).
+
+        As variáveis u[i] são usadas como rótulos numéricos para as cidades (exceto a primeira cidade) que nos ajudam a verificar se estamos evitando esses subciclos.
+    """
+    for i in range(1, n): # Esse loop começa da segunda cidade (i = 1) e vai até a última cidade (n - 1). Estamos ignorando a cidade 0 (a primeira), porque essa cidade é o ponto de partida e o ponto final, e não precisamos de um rótulo numérico para ela.
+
+        solver.add(u[i] >= 1) # Aqui, estamos adicionando uma restrição ao solver: para todas as cidades (exceto a cidade inicial i = 0), o valor de u[i] deve ser maior ou igual a 1.
+
+        solver.add(u[i] <= (n - 1)) # Essa linha adiciona outra restrição ao solver: para todas as cidades (exceto a cidade inicial i = 0), o valor de u[i] deve ser menor ou igual a n - 1. Isso limita os valores de u[i] para garantir que uma numeração válida, sem ultrapassar o número de cidades.
+
+        #Esse conjunto de restrições (usando u[i]) ajuda a garantir que o solver evite subciclos. Vamos entender por que:
+
+        '''
+            Como as variáveis u[i] evitam subciclos:
+
+            as variáveis u[i] são um truque para evitar esses subciclos
+
+            O vendedor sai da cidade A com um "rótulo" que não é numérico, porque ele sempre começa na cidade inicial.
+            Quando ele vai para a cidade B, a variável u[B] recebe o valor 1. Isso representa a "primeira parada".
+            Quando ele vai para a cidade C, a variável u[C] recebe o valor 2. Isso significa que ele está progredindo na viagem.
+            Se o vendedor tentasse voltar para a cidade A (fechando um ciclo parcial), isso implicaria que ele estaria diminuindo os rótulos (de 2 para 0), o que não é permitido.
+            As variáveis u[i] garantem que o vendedor só pode seguir em uma ordem crescente de rótulos, ou seja, ele sempre "progride" para a próxima cidade. Isso impede que ele feche pequenos ciclos sem visitar todas as cidades.
+        '''
+
+    # for i in range(1, n): e for j in range(1, n):
+    # Esses dois loops percorrem todas as cidades i e j, exceto a cidade inicial (cidade 0). Isso porque a cidade inicial não precisa das mesmas restrições de rótulo numérico que usamos nas outras cidades. 
+    for i in range(1, n):
+        for j in range(1, n):
+            if i != j: # esse if garante que não estamos tentando adicionar uma restrição para a mesma cidade. Por exemplo, não faz sentido forçar que a cidade i vá para ela mesma (x[i][i]), então pulamos essa situação.
+
+                solver.add(Implies(x[i][j] == 1, u[i] + 1 == u[j])) # Aqui, estamos adicionando uma restrição ao solver que diz:
+
+                # Se x[i][j] == 1, ou seja, se existe uma rota do ponto i para o ponto j,
+                # Então u[j] deve ser igual a u[i] + 1
+
+            """
+                O que isso significa:
+
+                As variáveis u[i] e u[j] são rótulos numéricos que representam a ordem em que o vendedor visita as cidades.
+
+                u[i] + 1 == u[j] garante que, se o vendedor vai de uma cidade i para a cidade j, então o número de rótulo da cidade j (ou seja, o rótulo de onde ele vai) será um a mais do que o da cidade i.
+
+                isso significa que, para cada cidade que o vendedor visita, o rótulo aumenta de maneira progressiva. Assim, se ele começa em uma cidade i, a próxima cidade j que ele visita terá o rótulo imediatamente maior, garantindo que ele está avançando no percurso sem voltar para cidades já visitadas.
+
+                Exemplo:
+                Suponha que temos 3 cidades: A, B e C. O vendedor segue o seguinte caminho:
+
+                Ele vai de A para B: x[0][1] == 1
+                Isso significa que u[1] = u[0] + 1. Se u[A] = 0, então u[B] = 1.
+                Depois ele vai de B para C: x[1][2] == 1
+                Isso significa que u[2] = u[1] + 1, ou seja, se u[B] = 1, então u[C] = 2.
+            """
+
+    #restrição para garantir que não haja subciclos
+
+    #esses dois loops percorrem todas as cidades i e j, exceto a cidade inicial
+    for i in range(1, n):
+        for j in range(1, n): 
+            if i != j: # Esse if garante que estamos verificando apenas pares de cidades diferentes, para evitar cidades que "saem" e "chegam" nelas mesmas.
+                solver.add(Implies(x[i][j] == 1, u[i] != u[j])) # adicionando outra restrição ao solver que diz:
+                # Se x[i][j] == 1, ou seja, se existe uma rota do ponto i para o ponto j,
+                # Então u[i] deve ser diferente de u[j].
+
+                """ 
+                    O que isso significa:
+                    Essa linha de código garante que as variáveis de rótulo u[i] e u[j] nunca podem ser iguais, o que significa que o vendedor não pode voltar para a mesma cidade com o mesmo rótulo.
+
+                    Se u[i] == u[j], isso indicaria que o vendedor está fazendo um ciclo interno (subciclo), porque ele está visitando i e j de tal forma que ele volta ao mesmo estado anterior. Ao forçar que os rótulos sejam diferentes, garantimos que o vendedor continue avançando no caminho e não forme subciclos.
+
+                    Exemplo
+
+                    Suponha que o vendedor siga o seguinte caminho:
+
+                    A → B → A
+
+                    Se não adicionássemos a restrição u[i] != u[j], o solver poderia permitir que o vendedor fosse de A para B e depois voltasse para A sem visitar mais nenhuma cidade, formando um ciclo menor e ignorando as outras cidades.
+
+                    Com essa restrição, o solver vai impedir esse comportamento porque, se x[0][1] == 1 e depois x[1][0] == 1, ele verificaria que u[0] == u[1], o que é inválido. Dessa forma, o solver evita subciclos.
+
+                """
+    marcar('mtz')
+    return x, n * n + n
+
+
+# Função objetivo da formulação original: soma de distância * x[i][j]
+def _objetivo_inteiro(distance_matrix, x):
+    n = len(x)
+    # Função objetivo: A função objetivo define o que estamos tentando minimizar no problema. No caso do Caixeiro Viajante, o objetivo é minimizar a soma das distâncias percorridas ao visitar todas as cidades.
+    objective_expr = 0 # Iniciamos a expressão da função objetivo com valor 0. Este valor vai aumentar à medida que somamos as distâncias entre as cidades.
+    for i in range(n): #Esses dois loops percorrem todas as cidades possíveis i e j (todas as combinações de ida de uma cidade para outra).
+        for j in range(n):
+            objective_expr += distance_matrix[i][j] * x[i][j] # Aqui, estamos somando as distâncias percorridas no caminho.
+
+            """
+                distance_matrix[i][j] contém a distância entre a cidade i e a cidade j.
+
+                x[i][j] é a variável de decisão que indica se o vendedor vai de i para j. Se x[i][j] == 1, significa que o vendedor realmente fez essa viagem.
+
+                Portanto, para cada par de cidades, multiplicamos a distância entre elas (distance_matrix[i][j]) pelo valor de x[i][j]. Isso só adiciona a distância à soma total se o vendedor de fato foi de i para j (ou seja, se x[i][j] == 1).
+            """
+    return objective_expr
+
+
+# Arestas booleanas; a diagonal é a constante False e não gera variável
+def _arestas_booleanas(n):
+    return [[Bool(f'x[{i}][{j}]') if i != j else BoolVal(False) for j in range(n)] for i in range(n)]
+
+
+# Graus exatamente 1 via PbEq e eliminação de ciclos de duas cidades via AtMost
+def _restricoes_de_grau(x, solver):
+    n = len(x)
+    if n == 1:
+        solver.add(BoolVal(False))  # como na formulação original, uma única cidade não tem saída possível
+        return
+    for i in range(n):
+        solver.add(PbEq([(x[i][j], 1) for j in range(n) if j != i], 1))
+        solver.add(PbEq([(x[j][i], 1) for j in range(n) if j != i], 1))
+    if n > 2:
+        for i in range(n):
+            for j in range(i + 1, n):
+                solver.add(AtMost(x[i][j], x[j][i], 1))
+
+
+def _objetivo_booleano(distance_matrix, x):
+    n = len(x)
+    return Sum([If(x[i][j], distance_matrix[i][j], 0) for i in range(n) for j in range(n) if i != j])
+
+
+def _modelo_booleano(n, solver, marcar=sem_marcacao):
+    x = _arestas_booleanas(n)
+    marcar('variaveis')
+    _restricoes_de_grau(x, solver)
+    marcar('restricoes_grau')
+
+    # Variáveis de ordem MTZ inteiras limitadas a [1, n-1], sem a restrição duplicada u[i] != u[j]
+    u = [None] + [Int(f'u[{i}]') for i in range(1, n)]
+    for i in range(1, n):
+        solver.add(u[i] >= 1, u[i] <= n - 1)
+    for i in range(1, n):
+        for j in range(1, n):
+            if i != j:
+                solver.add(Implies(x[i][j], u[j] == u[i] + 1))
+    marcar('mtz')
+
+    return x, n * (n - 1) + (n - 1)
+
+
+def _modelo_bitvector(n, solver, marcar=sem_marcacao):
+    x = _arestas_booleanas(n)
+    marcar('variaveis')
+    _restricoes_de_grau(x, solver)
+    marcar('restricoes_grau')
+
+    # Variáveis de ordem como vetores de bits sem sinal; u[i] + 1 nunca passa de n
+    largura = max(1, n.bit_length())
+    u = [None] + [BitVec(f'u[{i}]', largura) for i in range(1, n)]
+    for i in range(1, n):
+        solver.add(ULE(1, u[i]), ULE(u[i], n - 1))
+    for i in range(1, n):
+        for j in range(1, n):
+            if i != j:
+                solver.add(Implies(x[i][j], u[j] == u[i] + 1))
+    marcar('mtz')
+
+    return x, n * (n - 1) + (n - 1)
+
+
+# Relaxação de atribuição: só as restrições de grau, sem eliminação de subciclos.
+# Usada pelo modo de cortes preguiçosos (cortes.py), que acrescenta os cortes sob demanda.
+def _modelo_relaxacao(n, solver, marcar=sem_marcacao):
+    x = _arestas_booleanas(n)
+    marcar('variaveis')
+    _restricoes_de_grau(x, solver)
+    marcar('restricoes_grau')
+    return x, n * (n - 1)
+
+
+# Modelo não direcionado para matrizes simétricas: uma variável por par de cidades, compartilhada
+# por x[i][j] e x[j][i], de modo que cada ciclo aparece em um único sentido.
+def _modelo_simetrico(n, solver, marcar=sem_marcacao):
+    if n < 3:
+        raise ValueError("A codificação simétrica precisa de pelo menos 3 cidades")
+    x = [[BoolVal(False)] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1, n):
+            x[i][j] = x[j][i] = Bool(f'y[{i}][{j}]')
+    marcar('variaveis')
+    for i in range(n):
+        solver.add(PbEq([(x[i][j], 1) for j in range(n) if j != i], 2))  # duas arestas por cidade
+    marcar('restricoes_grau')
+
+    # Posições distintas no ciclo (a cidade 0 está na posição 0); uma aresta só liga posições
+    # vizinhas, e a cidade 0 liga as posições 1 e n-1, o que elimina os subciclos
+    largura = max(1, n.bit_length())
+    p = [None] + [BitVec(f'p[{i}]', largura) for i in range(1, n)]
+    for i in range(1, n):
+        solver.add(ULE(1, p[i]), ULE(p[i], n - 1))
+    solver.add(Distinct(p[1:]))
+    for j in range(1, n):
+        solver.add(Implies(x[0][j], Or(p[j] == 1, p[j] == n - 1)))
+    for i in range(1, n):
+        for j in range(i + 1, n):
+            solver.add(Implies(x[i][j], Or(p[j] == p[i] + 1, p[i] == p[j] + 1)))
+    marcar('mtz')
+
+    # Quebra de simetria: o sentido do percurso é fixado pondo na posição 1 o menor vizinho da cidade 0
+    for j in range(1, n):
+        for k in range(j + 1, n):
+            solver.add(Implies(And(x[0][j], x[0][k]), p[j] == 1))
+    marcar('simetria')
+
+    return x, n * (n - 1) // 2 + (n - 1)
+
+
+# Cada aresta não direcionada entra uma vez; exige distance_matrix simétrica
+def _objetivo_simetrico(distance_matrix, x):
+    if not matriz_simetrica(distance_matrix):
+        raise ValueError("A codificação simétrica exige uma matriz de distâncias simétrica")
+    n = len(x)
+    return Sum([If(x[i][j], distance_matrix[i][j], 0) for i in range(n) for j in range(i + 1, n)])
+
+
+def matriz_simetrica(distance_matrix):
+    d = np.asarray(distance_matrix)
+    return bool(np.array_equal(d, d.T))
+
+
+def distancias_inteiras(distance_matrix):
+    """True se todas as distâncias são inteiras, caso em que o custo de um ciclo também é."""
+    d = np.asarray(distance_matrix)
+    return np.issubdtype(d.dtype, np.integer) or bool(np.all(d == np.round(d)))
+
+
+# Variável do objetivo: Int com distâncias inteiras, Real quando alguma é fracionária
+# (objective == soma de frações seria insatisfatível com um Int)
+def variavel_objetivo(distance_matrix):
+    return Int('objective') if distancias_inteiras(distance_matrix) else Real('objective')
+
+
+# Para cada codificação: (construtor da estrutura, construtor da expressão objetivo)
+_CONSTRUTORES = {
+    'inteira': (_modelo_inteiro, _objetivo_inteiro),
+    'booleana': (_modelo_booleano, _objetivo_booleano),
+    'bitvector': (_modelo_bitvector, _objetivo_booleano),
+    'simetrica': (_modelo_simetrico, _objetivo_simetrico),
+    'relaxacao': (_modelo_relaxacao, _objetivo_booleano),
+}
+
+
+def escolher_codificacao(distance_matrix, codificacao='bitvector'):
+    """Troca 'booleana' ou 'bitvector' pela codificação simétrica quando a matriz é simétrica."""
+    if codificacao in ('booleana', 'bitvector') and len(distance_matrix) >= 3 and matriz_simetrica(distance_matrix):
+        return 'simetrica'
+    return codificacao
+
+
+def validar_codificacao(codificacao):
+    """Levanta ValueError se a codificação não é uma das conhecidas."""
+    if codificacao not in _CONSTRUTORES:
+        raise ValueError(f"Codificação desconhecida: {codificacao!r}. Opções: {', '.join(_CONSTRUTORES)}")
+
+
+def construir_estrutura(n, codificacao='bitvector', solver=None, marcar=sem_marcacao):
+    """Cria as variáveis e as restrições estruturais do TSP para n cidades.
+
+    Nada aqui depende das distâncias; o objetivo é definido depois com
+    definir_objetivo. Se solver não for informado, é criado um Optimize.
+    marcar (ver eventos.cronometro) recebe o fim de cada fase da montagem.
+    """
+    validar_codificacao(codificacao)
+    if solver is None:
+        solver = Optimize() #instancia de optimize,  que é utilizado para resolver problemas de otimização. Ao contrário de um solver simples que busca apenas encontrar uma solução que satisfaça as restrições, o Optimize permite também minimizar ou maximizar uma função objetivo. 
+
+    x, variaveis = _CONSTRUTORES[codificacao][0](n, solver, marcar)
+    return {
+        'codificacao': codificacao,
+        'n': n,
+        'solver': solver,
+        'x': x,
+        'objective': None,
+        'variaveis': variaveis,
+    }
+
+
+# Objetivo como MaxSAT ponderado: escolher a aresta (i, j) viola uma restrição leve de peso d[i][j]
+def _restricoes_leves(modelo, distance_matrix):
+    n, x = modelo['n'], modelo['x']
+    simetrica = modelo['codificacao'] == 'simetrica'  # a aresta não direcionada entra uma vez
+    for i in range(n):
+        for j in range(i + 1 if simetrica else 0, n):
+            peso = distance_matrix[i][j]
+            if i == j or peso == 0:
+                continue
+            if peso < 0:
+                raise ValueError("O objetivo MaxSAT exige distâncias não negativas")
+            livre = x[i][j] == 0 if modelo['codificacao'] == 'inteira' else Not(x[i][j])
+            modelo['solver'].add_soft(livre, peso)
+
+
+def definir_objetivo(modelo, distance_matrix, marcar=sem_marcacao, maxsat=False):
+    """Adiciona objective == soma das distâncias das arestas escolhidas (e o minimiza, se for um Optimize).
+
+    Com maxsat, o Optimize minimiza a soma dos pesos de restrições leves (uma
+    por aresta, ver _restricoes_leves) em vez de objective, de modo que os
+    motores de MaxSAT do Z3 (opção maxsat_engine) conduzem a busca.
+    """
+    solver = modelo['solver']
+    distance_matrix = como_lista(distance_matrix)  # o Z3 só aceita números do Python nas expressões
+    objective_expr = _CONSTRUTORES[modelo['codificacao']][1](distance_matrix, modelo['x'])
+
+    objective = variavel_objetivo(distance_matrix) #  cria uma variável chamada objective, que será usada para armazenar o valor total da função objetivo — ou seja, o total das distâncias percorridas no caminho.
+    solver.add(objective == objective_expr) # Aqui, estamos informando ao solver que a variável objective é igual à soma total das distâncias percorridas, que foi acumulada em objective_expr.
+    if isinstance(solver, Optimize) and maxsat:
+        _restricoes_leves(modelo, distance_matrix)
+    elif isinstance(solver, Optimize):
+        solver.minimize(objective) # Essa linha instrui o solver a minimizar o valor da variável objective. Em outras palavras, estamos pedindo ao solver para encontrar o caminho que minimize a distância total percorrida.
+
+    if modelo['objective'] is None:
+        modelo['variaveis'] += 1
+    modelo['objective'] = objective
+    marcar('objetivo')
+    return objective
+
+
+def construir_modelo(distance_matrix, codificacao='bitvector', solver=None, marcar=sem_marcacao, maxsat=False):
+    """Monta o modelo do TSP na codificação escolhida.
+
+    Retorna um dicionário com o solver, a matriz de arestas x, a variável
+    objective e a contagem de variáveis criadas. Se solver não for informado,
+    é criado um Optimize que minimiza objective (ou, com maxsat, as restrições leves).
+    """
+    modelo = construir_estrutura(len(distance_matrix), codificacao, solver, marcar)
+    definir_objetivo(modelo, distance_matrix, marcar, maxsat)
+    return modelo
+
+
+def aresta_ativa(modelo, model, i, j):
+    if modelo['codificacao'] == 'inteira':
+        return is_true(model.evaluate(modelo['x'][i][j] == 1))
+    return is_true(model.evaluate(modelo['x'][i][j], model_completion=True))
+
+
+# Segue as arestas ativas do modelo a partir da cidade 0
+def extrair_caminho(modelo, model):
+    n = modelo['n']
+    caminho = []
+    cidade_atual = 0
+    caminho.append(cidade_atual)
+
+    for i in range(n - 1):
+        for j in range(n):
+            # na codificação simétrica a aresta de volta também está ativa, por isso as cidades já visitadas são puladas
+            if j not in caminho and aresta_ativa(modelo, model, cidade_atual, j):
+                caminho.append(j)
+                cidade_atual = j
+                break
+    caminho.append(0)
+    return caminho
+
+
+# Limite superior vindo de um caminho conhecido: o otimizador só procura caminhos de custo <= limite
+def limitar_objetivo(modelo, limite):
+    modelo['solver'].add(modelo['objective'] <= limite)
+
+
+# Limite inferior conhecido (limites.py): o solver descarta de imediato ramos que custariam menos que ele
+def limitar_objetivo_inferior(modelo, limite):
+    modelo['solver'].add(modelo['objective'] >= limite)
+
+
+# Sugere ao solver os valores das arestas de um caminho conhecido como ponto de partida da busca
+def sugerir_caminho(modelo, caminho):
+    solver = modelo['solver']
+    if not hasattr(solver, 'set_initial_value'):  # disponível a partir do Z3 4.13
+        return
+    n = modelo['n']
+    arestas = set(zip(caminho, caminho[1:]))
+    if modelo['codificacao'] == 'simetrica':
+        arestas |= {(j, i) for i, j in arestas}
+    for i in range(n):
+        for j in range(n):
+            if i == j:
+                continue
+            ativa = (i, j) in arestas
+            if modelo['codificacao'] == 'inteira':
+                solver.set_initial_value(modelo['x'][i][j], int(ativa))
+            else:
+                solver.set_initial_value(modelo['x'][i][j], BoolVal(ativa))
+
+
+def estatisticas_modelo(modelo):
+    return {
+        'codificacao': modelo['codificacao'],
+        'variaveis': modelo['variaveis'],
+        'assercoes': len(modelo['solver'].assertions()),
+    }
+
+
+def comparar_codificacoes(distance_matrix, codificacoes=CODIFICACOES, resolver=True):
+    """Monta (e opcionalmente resolve) o modelo em cada codificação e retorna as medições."""
+    resultados = []
+    for codificacao in codificacoes:
+        inicio = time.perf_counter()
+        modelo = construir_modelo(distance_matrix, codificacao)
+        resultado = estatisticas_modelo(modelo)
+        resultado['tempo_construcao'] = time.perf_counter() - inicio
+        if resolver:
+            inicio = time.perf_counter()
+            status = modelo['solver'].check()
+            resultado['tempo_check'] = time.perf_counter() - inicio
+            resultado['status'] = str(status)
+            if status == sat:
+                caminho = extrair_caminho(modelo, modelo['solver'].model())
+                resultado['caminho'] = caminho
+                resultado['custo'] = custo_caminho(distance_matrix, caminho)
+        resultados.append(resultado)
+    return resultados
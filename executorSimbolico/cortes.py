@@ -0,0 +1,127 @@
+"""
+Eliminação preguiçosa de subciclos (planos de corte) para o TSP no Z3.
+
+Em vez de adicionar as O(n²) restrições MTZ antes do primeiro check(), o
+solver começa apenas com a relaxação de atribuição (restrições de grau). Os
+subciclos da solução encontrada são lidos do modelo e, para cada subciclo S,
+é adicionado o corte de Dantzig-Fulkerson-Johnson
+
+    soma das arestas dentro de S <= |S| - 1
+
+no mesmo objeto solver, que é verificado novamente de forma incremental até
+restar um único ciclo hamiltoniano. Na prática, a maior parte das restrições
+MTZ nunca fica ativa, e só os cortes violados chegam ao modelo.
+"""
+
+import time
+
+from z3 import *
+
+from avaliacao import custo_caminho
+from carregamento import como_lista
+from codificacoes import aresta_ativa, construir_modelo, limitar_objetivo, limitar_objetivo_inferior, sugerir_caminho
+from eventos import sem_marcacao
+
+
+# Sucessor de cada cidade na solução atual (cada cidade tem exatamente uma saída)
+def _sucessores(modelo, model):
+    n = modelo['n']
+    sucessor = []
+    for i in range(n):
+        for j in range(n):
+            if j != i and aresta_ativa(modelo, model, i, j):
+                sucessor.append(j)
+                break
+    return sucessor
+
+
+# Decompõe a permutação de sucessores em ciclos disjuntos
+def subciclos(sucessor):
+    n = len(sucessor)
+    visitado = [False] * n
+    ciclos = []
+    for inicio in range(n):
+        if visitado[inicio]:
+            continue
+        ciclo = []
+        cidade = inicio
+        while not visitado[cidade]:
+            visitado[cidade] = True
+            ciclo.append(cidade)
+            cidade = sucessor[cidade]
+        ciclos.append(ciclo)
+    return ciclos
+
+
+def adicionar_corte(modelo, ciclo):
+    x = modelo['x']
+    arestas = [x[i][j] for i in ciclo for j in ciclo if i != j]
+    modelo['solver'].add(AtMost(*arestas, len(ciclo) - 1))
+
+
+def resolver_com_cortes(distance_matrix, max_iteracoes=None, caminho_inicial=None, prazo=None, marcar=sem_marcacao,
+                        limite_inferior=None):
+    """Resolve o TSP adicionando cortes de subciclo apenas quando violados.
+
+    Retorna um dicionário com caminho, custo, número de iterações (chamadas a
+    check()) e número de cortes adicionados. caminho é None se o modelo for
+    insatisfatível ou se max_iteracoes for atingido antes de restar um único ciclo.
+    Se caminho_inicial for informado, seu custo limita o objetivo e suas arestas
+    são sugeridas ao solver. Com prazo (segundos), cada check() recebe o tempo
+    restante como timeout e a chave 'prazo_esgotado' indica se ele acabou.
+    marcar (ver eventos.cronometro) recebe o fim de cada fase; check,
+    extracao_caminho e cortes se repetem a cada iteração e são acumuladas.
+    limite_inferior (limites.py), se informado, é imposto ao objetivo desde a
+    primeira iteração. Com menos de 2 cidades, o caminho trivial é retornado
+    sem montar o modelo (modelo None).
+    """
+    limite = None if prazo is None else time.perf_counter() + prazo
+    distance_matrix = como_lista(distance_matrix)
+    n = len(distance_matrix)
+    if n < 2:
+        # Sem arestas entre cidades distintas a relaxação não tem subciclos a cortar, e o laço não terminaria
+        caminho = list(range(n)) + [0] if n else []
+        return {'caminho': caminho, 'custo': custo_caminho(distance_matrix, caminho), 'iteracoes': 0, 'cortes': 0,
+                'prazo_esgotado': False, 'modelo': None}
+    modelo = construir_modelo(distance_matrix, 'relaxacao', marcar=marcar)
+    solver = modelo['solver']
+    if caminho_inicial is not None:
+        limitar_objetivo(modelo, custo_caminho(distance_matrix, caminho_inicial))
+        sugerir_caminho(modelo, caminho_inicial)
+        marcar('aquecimento')
+    if limite_inferior is not None:
+        limitar_objetivo_inferior(modelo, limite_inferior)
+    resultado = {'caminho': None, 'custo': None, 'iteracoes': 0, 'cortes': 0, 'prazo_esgotado': False,
+                 'modelo': modelo}
+
+    while max_iteracoes is None or resultado['iteracoes'] < max_iteracoes:
+        if limite is not None:
+            restante = limite - time.perf_counter()
+            if restante <= 0:
+                resultado['prazo_esgotado'] = True
+                return resultado
+            solver.set('timeout', max(1, int(restante * 1000)))
+        resultado['iteracoes'] += 1
+        status = solver.check()
+        marcar('check', iteracao=resultado['iteracoes'])
+        if status != sat:
+            resultado['prazo_esgotado'] = status == unknown and limite is not None
+            return resultado
+        sucessor = _sucessores(modelo, solver.model())
+        ciclos = subciclos(sucessor)
+        marcar('extracao_caminho', iteracao=resultado['iteracoes'])
+        if len(ciclos) == 1:
+            caminho = [0]
+            for _ in range(n - 1):
+                caminho.append(sucessor[caminho[-1]])
+            caminho.append(0)
+            resultado['caminho'] = caminho
+            resultado['custo'] = custo_caminho(distance_matrix, caminho)
+            return resultado
+        # Os cortes só removem soluções, então o ótimo da relaxação é um limite inferior válido
+        solver.add(modelo['objective'] >= solver.model().evaluate(modelo['objective']))
+        for ciclo in ciclos:
+            adicionar_corte(modelo, ciclo)
+            resultado['cortes'] += 1
+        marcar('cortes', iteracao=resultado['iteracoes'], novos=len(ciclos))
+    return resultado
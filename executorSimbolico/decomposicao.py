@@ -0,0 +1,254 @@
+"""
+Decomposição de instâncias grandes (dezenas a centenas de cidades).
+
+O modelo completo do Z3 deixa de ser prático bem antes das 50 a 500 cidades
+de uma rota real. Aqui as cidades são divididas em grupos de no máximo
+tamanho_cluster cidades por um k-medoides com capacidade, usando apenas a
+matriz de distâncias. Os grupos são visitados em sequência (um TSP pequeno
+entre os medoides) e, para cada par de grupos consecutivos, a aresta de
+ligação mais curta define a cidade de saída de um e a de entrada do outro.
+
+Cada grupo é então resolvido pelo Z3 (resolução anytime, ver anytime.py) em
+um processo do pool, como um caminho que começa na entrada e termina na
+saída: a aresta saída -> entrada recebe um custo negativo maior que qualquer
+ciclo, de modo que o ciclo ótimo da submatriz a usa e, sem ela, sobra o
+caminho. Assim a formulação do Z3 não muda, e submatrizes simétricas
+continuam usando a codificação simétrica. Os caminhos são costurados em um
+ciclo global e as costuras são refinadas com 2-opt e Or-opt (heuristicas.py)
+e, depois, pela reotimização no Z3 de janelas de cidades consecutivas do
+ciclo, com as pontas fixas, o que nunca piora o caminho.
+
+O resultado traz o custo final e a distância (gap) até o limite inferior de
+limites.py: a 1-árvore de Held-Karp em matrizes simétricas, a atribuição nas
+assimétricas.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from anytime import resolver_anytime
+from avaliacao import custo_caminho
+from carregamento import carregar_instancia, como_lista
+from codificacoes import escolher_codificacao
+from eventos import sem_marcacao
+from heuristicas import busca_local, heuristica
+from limites import gap, limite_inferior
+from verificador import held_karp
+
+TAMANHO_CLUSTER = 10
+PRAZO_CLUSTER = 10  # segundos por grupo; o melhor caminho encontrado é usado se o prazo acabar
+ITERACOES_AGRUPAMENTO = 20
+# Até este número de grupos a ordem de visita é a ótima (Held-Karp); acima, a da heurística
+GRUPOS_HELD_KARP = 12
+
+
+# Cada cidade vai para o medoide livre mais próximo, na ordem crescente de distância
+def _atribuir(s, medoides, capacidade):
+    k = len(medoides)
+    rotulos = np.full(len(s), -1)
+    ocupacao = np.zeros(k, dtype=int)
+    for c, medoide in enumerate(medoides):
+        rotulos[medoide] = c
+        ocupacao[c] = 1
+    for indice in np.argsort(s[:, medoides], axis=None, kind='stable').tolist():
+        cidade, c = divmod(indice, k)
+        if rotulos[cidade] < 0 and ocupacao[c] < capacidade:
+            rotulos[cidade] = c
+            ocupacao[c] += 1
+    return rotulos
+
+
+def agrupar(distance_matrix, tamanho_cluster=TAMANHO_CLUSTER, iteracoes=ITERACOES_AGRUPAMENTO):
+    """Lista de grupos (listas de cidades) com no máximo tamanho_cluster cidades, e os medoides de cada um."""
+    d = np.asarray(distance_matrix, dtype=float)
+    s = (d + d.T) / 2  # em matrizes assimétricas, a proximidade considera os dois sentidos
+    n = len(s)
+    # Grupos com folga (3/4 da capacidade, em média): sem ela, as últimas cidades vão para grupos distantes
+    k = -(-4 * n // (3 * tamanho_cluster))
+    # Medoides iniciais espalhados: cada novo é a cidade mais distante dos já escolhidos
+    medoides = [0]
+    proximidade = s[0].copy()
+    while len(medoides) < k:
+        medoide = int(proximidade.argmax())
+        medoides.append(medoide)
+        proximidade = np.minimum(proximidade, s[medoide])
+    for _ in range(iteracoes):
+        rotulos = _atribuir(s, medoides, tamanho_cluster)
+        novos = []
+        for c in range(k):
+            membros = np.flatnonzero(rotulos == c)
+            novos.append(int(membros[s[np.ix_(membros, membros)].sum(axis=1).argmin()]))
+        if novos == medoides:
+            break
+        medoides = novos
+    rotulos = _atribuir(s, medoides, tamanho_cluster)
+    return [np.flatnonzero(rotulos == c).tolist() for c in range(k)], medoides
+
+
+# Ordem de visita dos grupos: um TSP entre os medoides
+def _ordenar_grupos(d, medoides):
+    k = len(medoides)
+    if k <= 2:
+        return list(range(k))
+    entre_medoides = np.asarray(d)[np.ix_(medoides, medoides)]
+    if k <= GRUPOS_HELD_KARP:
+        caminho = held_karp(entre_medoides)[0]
+    else:
+        caminho = heuristica(entre_medoides)[0]
+    return caminho[:-1]
+
+
+# Cidades de entrada e de saída de cada grupo, pela aresta mais curta entre grupos consecutivos.
+# Em grupos com mais de uma cidade, a saída nunca é a própria entrada.
+def _ligacoes(d, grupos):
+    k = len(grupos)
+    entradas, saidas = [None] * k, [None] * k
+
+    def ligar(a, b):
+        origens = [c for c in grupos[a] if c != entradas[a] or len(grupos[a]) == 1]
+        destinos = [c for c in grupos[b] if c != saidas[b] or len(grupos[b]) == 1]
+        i, j = np.unravel_index(d[np.ix_(origens, destinos)].argmin(), (len(origens), len(destinos)))
+        saidas[a], entradas[b] = origens[i], destinos[j]
+
+    for a in range(k - 1):
+        ligar(a, a + 1)
+    ligar(k - 1, 0)
+    return entradas, saidas
+
+
+# Executada em um processo do pool: caminho mais curto que visita todas as cidades
+# da submatriz, começando na cidade 0 e terminando na última
+def _resolver_grupo(submatriz, prazo, codificacao):
+    inicio = time.perf_counter()
+    d = np.array(submatriz)
+    m = len(d)
+    if m <= 3:
+        return {'caminho': list(range(m)), 'otimo': True, 'tempo': 0.0}
+    # Bônus na aresta saída -> entrada maior que o custo de qualquer ciclo: o ciclo ótimo sempre a usa
+    grande = np.abs(d).max(axis=1).sum() + 1
+    simetrica = np.array_equal(d, d.T)
+    d[m - 1, 0] = -grande
+    if simetrica:
+        d[0, m - 1] = -grande
+    d = como_lista(d)
+    caminho_inicial, _ = heuristica(d)
+    final = resolver_anytime(d, prazo, escolher_codificacao(d, codificacao), caminho_inicial)
+    ciclo = final['caminho']
+    if ciclo[1] == m - 1 and ciclo[-2] != m - 1:
+        caminho = [0] + ciclo[-2:0:-1]  # ciclo percorrido no outro sentido (matriz simétrica)
+    else:
+        caminho = ciclo[:-1]
+    return {'caminho': caminho, 'otimo': final['otimo'] and caminho[-1] == m - 1,
+            'tempo': time.perf_counter() - inicio}
+
+
+# Resolve cada trecho (entrada primeiro, saída por último) como caminho, um por processo do pool
+def _resolver_trechos(executor, d, trechos, prazo, codificacao):
+    futuros = [executor.submit(_resolver_grupo, d[np.ix_(trecho, trecho)].tolist(), prazo, codificacao)
+               for trecho in trechos]
+    resultados = [futuro.result() for futuro in futuros]
+    return ([[trecho[i] for i in resultado['caminho']] for trecho, resultado in zip(trechos, resultados)],
+            [resultado['otimo'] for resultado in resultados])
+
+
+def _fechar_ciclo(sequencia):
+    inicio = sequencia.index(0)
+    return sequencia[inicio:] + sequencia[:inicio] + [0]
+
+
+# Reotimiza pelo Z3 cada janela de tamanho cidades consecutivas, mantendo as pontas:
+# o ciclo continua válido e nenhuma janela fica mais cara
+def _refinar_janelas(executor, d, caminho, tamanho, deslocamento, prazo, codificacao):
+    ciclo = caminho[deslocamento:-1] + caminho[:deslocamento]
+    janelas = [ciclo[i:i + tamanho] for i in range(0, len(ciclo), tamanho)]
+    novas, _ = _resolver_trechos(executor, d, janelas, prazo, codificacao)
+    melhores = [nova if custo_caminho(d, nova) < custo_caminho(d, janela) else janela
+                for janela, nova in zip(janelas, novas)]
+    return _fechar_ciclo([cidade for janela in melhores for cidade in janela])
+
+
+def resolver_por_decomposicao(distance_matrix, tamanho_cluster=TAMANHO_CLUSTER, prazo=PRAZO_CLUSTER,
+                              codificacao='bitvector', processos=None, caminho_inicial=None, marcar=sem_marcacao):
+    """Resolve a instância por grupos e retorna um dicionário com o caminho e o custo final.
+
+    O resultado traz também custo_costura (antes do 2-opt/Or-opt), grupos
+    (tamanho de cada um), grupos_otimos, limite_inferior (limites.py) e gap.
+    prazo vale para cada grupo. Com caminho_inicial (por exemplo, o da
+    heurística), o resultado nunca é pior que ele. otimo só é True quando a
+    instância cabe em um único grupo e o Z3 prova a otimalidade ou quando o
+    caminho alcança o limite inferior; no segundo caso, caminho_inicial é
+    retornado sem resolver os grupos.
+    """
+    d = np.asarray(distance_matrix)
+    n = len(d)
+    limite = limite_inferior(d, None if caminho_inicial is None else custo_caminho(d, caminho_inicial))['custo']
+    marcar('limite')
+    if n <= max(3, tamanho_cluster):
+        final = resolver_anytime(como_lista(d), prazo, escolher_codificacao(d, codificacao), caminho_inicial,
+                                 limite_inferior=limite)
+        marcar('grupos')
+        caminho, custo = final['caminho'], final['custo']
+        limite = custo if final['otimo'] else limite
+        return {'caminho': caminho, 'custo': custo, 'custo_costura': custo, 'grupos': [n],
+                'grupos_otimos': int(final['otimo']), 'otimo': final['otimo'], 'limite_inferior': limite,
+                'gap': gap(custo, limite)}
+    if caminho_inicial is not None and custo_caminho(d, caminho_inicial) <= limite:
+        custo = custo_caminho(d, caminho_inicial)
+        return {'caminho': list(caminho_inicial), 'custo': custo, 'custo_costura': custo, 'grupos': [],
+                'grupos_otimos': 0, 'otimo': True, 'limite_inferior': custo, 'gap': 0.0}
+
+    grupos, medoides = agrupar(d, tamanho_cluster)
+    ordem = _ordenar_grupos(d, medoides)
+    grupos = [grupos[c] for c in ordem]
+    entradas, saidas = _ligacoes(d, grupos)
+    # Cada grupo em ordem local: entrada primeiro, saída por último
+    trechos = []
+    for grupo, entrada, saida in zip(grupos, entradas, saidas):
+        meio = [c for c in grupo if c != entrada and c != saida]
+        trechos.append([entrada] + meio + ([saida] if saida != entrada else []))
+    marcar('agrupamento')
+
+    with ProcessPoolExecutor(max_workers=processos or os.cpu_count() or 1) as executor:
+        trechos, otimos = _resolver_trechos(executor, d, trechos, prazo, codificacao)
+        caminho = _fechar_ciclo([cidade for trecho in trechos for cidade in trecho])
+        custo_costura = custo_caminho(d, caminho)
+        marcar('grupos')
+        caminho = busca_local(d, caminho)
+        marcar('busca_local')
+        # Janelas de cidades consecutivas do ciclo, deslocadas para cobrir as fronteiras da passada anterior
+        for deslocamento in (0, tamanho_cluster // 2):
+            caminho = _refinar_janelas(executor, d, caminho, tamanho_cluster, deslocamento, prazo, codificacao)
+        marcar('janelas')
+    caminho = busca_local(d, caminho)
+    custo = custo_caminho(d, caminho)
+    marcar('busca_local')
+    if caminho_inicial is not None and custo_caminho(d, caminho_inicial) < custo:
+        caminho, custo = list(caminho_inicial), custo_caminho(d, caminho_inicial)
+
+    otimo = custo <= limite
+    return {'caminho': caminho, 'custo': custo, 'custo_costura': custo_costura,
+            'grupos': [len(grupo) for grupo in grupos], 'grupos_otimos': sum(otimos), 'otimo': otimo,
+            'limite_inferior': custo if otimo else limite, 'gap': gap(custo, limite)}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolve uma instância grande por decomposição em grupos.")
+    parser.add_argument('instancia', help="arquivo .tsp/.atsp, .npy ou .json")
+    parser.add_argument('-k', '--tamanho-cluster', type=int, default=TAMANHO_CLUSTER,
+                        help="número máximo de cidades por grupo")
+    parser.add_argument('-t', '--prazo', type=float, default=PRAZO_CLUSTER, help="prazo por grupo, em segundos")
+    parser.add_argument('-p', '--processos', type=int, default=None, help="número de processos (padrão: núcleos)")
+    parser.add_argument('-c', '--codificacao', default='bitvector', help="codificação do modelo (ver codificacoes.py)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    resultado = resolver_por_decomposicao(carregar_instancia(args.instancia), args.tamanho_cluster, args.prazo,
+                                          args.codificacao, args.processos)
+    print(f"Grupos: {len(resultado['grupos'])} ({resultado['grupos_otimos']} com caminho ótimo)")
+    print(f"Custo após a costura: {resultado['custo_costura']}")
+    print(f"Custo final: {resultado['custo']} (limite inferior {resultado['limite_inferior']}, "
+          f"gap {resultado['gap']:.2%}) em {time.perf_counter() - inicio:.2f} segundos")
+    print(f"Caminho completo: {resultado['caminho']}")
@@ -0,0 +1,175 @@
+"""
+Enumerador paralelo de caminhos por branch-and-bound.
+
+Substitui a enumeração exaustiva de permutações: o espaço de busca é dividido
+pelos prefixos do caminho (0, a, b, ...) e cada prefixo é explorado em um
+processo separado. Caminhos parciais cujo custo, somado à menor saída de cada
+cidade ainda não visitada, já não pode entrar entre os K melhores são podados.
+Cada processo guarda no máximo K caminhos e os processos compartilham o pior
+custo entre os K melhores já conhecido, de modo que a memória permanece
+constante e o corte fica mais forte à medida que a busca avança.
+"""
+
+import argparse
+import heapq
+import math
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import permutations
+
+import numpy as np
+
+from avaliacao import custos_caminhos, parcelas_caminho
+from carregamento import carregar_instancia, como_lista
+
+# Estado de cada processo de trabalho, preenchido por _inicializar_processo
+_matriz = None
+_menor_saida = None
+_corte_global = None
+
+
+def _inicializar_processo(matriz, corte_global):
+    global _matriz, _menor_saida, _corte_global
+    n = len(matriz)
+    _matriz = matriz
+    _menor_saida = [min((matriz[i][j] for j in range(n) if j != i), default=0) for i in range(n)]
+    _corte_global = corte_global
+
+
+# Explora todos os caminhos que começam com o prefixo e retorna os K melhores
+def _explorar_prefixo(prefixo, k):
+    matriz, menor_saida, corte_global = _matriz, _menor_saida, _corte_global
+    n = len(matriz)
+    melhores = []  # heap de (-custo, caminho): o topo é o pior entre os K melhores
+    contagem = {'visitados': 0, 'podados': 0}
+
+    visitado = [False] * n
+    for cidade in prefixo:
+        visitado[cidade] = True
+    caminho = list(prefixo)
+    custo_prefixo = sum(matriz[a][b] for a, b in zip(prefixo, prefixo[1:]))
+    resto_prefixo = sum(menor_saida[c] for c in range(n) if not visitado[c])
+
+    def corte():
+        limite = corte_global.value
+        if len(melhores) == k:
+            limite = min(limite, -melhores[0][0])
+        return limite
+
+    def registrar(custo):
+        heapq.heappush(melhores, (-custo, caminho + [0]))
+        if len(melhores) > k:
+            heapq.heappop(melhores)
+        if len(melhores) == k and -melhores[0][0] < corte_global.value:
+            with corte_global.get_lock():
+                corte_global.value = min(corte_global.value, -melhores[0][0])
+
+    # resto: soma das menores saídas das cidades ainda não visitadas
+    def visitar(atual, custo, resto):
+        contagem['visitados'] += 1
+        if len(caminho) == n:
+            total = custo + matriz[atual][0]
+            if total < corte():
+                registrar(total)
+            return
+        limite = corte()
+        for proxima in range(1, n):
+            if visitado[proxima]:
+                continue
+            novo_custo = custo + matriz[atual][proxima]
+            novo_resto = resto - menor_saida[proxima]
+            if novo_custo + menor_saida[proxima] + novo_resto >= limite:
+                contagem['podados'] += 1
+                continue
+            visitado[proxima] = True
+            caminho.append(proxima)
+            visitar(proxima, novo_custo, novo_resto)
+            caminho.pop()
+            visitado[proxima] = False
+            limite = corte()
+
+    visitar(caminho[-1], custo_prefixo, resto_prefixo)
+    return [(-c, t) for c, t in melhores], contagem['visitados'], contagem['podados']
+
+
+# Gera os prefixos que definem as fatias do espaço de busca, dos mais baratos para os mais caros
+def _prefixos(matriz, processos):
+    n = len(matriz)
+    profundidade = 0
+    quantidade = 1
+    while profundidade < n - 1 and quantidade < 4 * processos:
+        quantidade *= n - 1 - profundidade
+        profundidade += 1
+    prefixos = [(0,) + p for p in permutations(range(1, n), profundidade)]
+    custos = custos_caminhos(matriz, prefixos)
+    return [prefixos[i] for i in np.argsort(custos, kind='stable')]
+
+
+def melhores_caminhos(matriz_distancias, k=10, processos=None, limite=None):
+    """Retorna (caminhos, estatisticas) com os K caminhos de menor custo.
+
+    caminhos é uma lista de (custo, caminho) em ordem crescente de custo. Se
+    limite for informado, só caminhos de custo menor ou igual a ele são considerados.
+    """
+    matriz = como_lista(matriz_distancias)
+    processos = processos or os.cpu_count() or 1
+    inicial = math.inf if limite is None else math.nextafter(limite, math.inf)
+    corte_global = multiprocessing.Value('d', inicial)
+
+    melhores = []  # heap global de (-custo, caminho) com no máximo K elementos
+    estatisticas = {'prefixos': 0, 'visitados': 0, 'podados': 0}
+    with ProcessPoolExecutor(max_workers=processos, initializer=_inicializar_processo,
+                             initargs=(matriz, corte_global)) as executor:
+        futuros = [executor.submit(_explorar_prefixo, p, k) for p in _prefixos(matriz, processos)]
+        for futuro in as_completed(futuros):
+            caminhos, visitados, podados = futuro.result()
+            estatisticas['prefixos'] += 1
+            estatisticas['visitados'] += visitados
+            estatisticas['podados'] += podados
+            for custo, caminho in caminhos:
+                heapq.heappush(melhores, (-custo, caminho))
+                if len(melhores) > k:
+                    heapq.heappop(melhores)
+    caminhos = sorted((-c, t) for c, t in melhores)
+    return caminhos, estatisticas
+
+
+def relatorio_melhores_caminhos(matriz_distancias, k=10, processos=None, limite=None):
+    """Retorna a lista de linhas do relatório dos K melhores caminhos e das contagens da busca.
+
+    A classificação só é conhecida depois que todos os prefixos foram
+    explorados, então as linhas são montadas de uma vez, ao fim da busca.
+    """
+    caminhos, estatisticas = melhores_caminhos(matriz_distancias, k, processos, limite)
+    linhas = []
+    for posicao, (custo, caminho) in enumerate(caminhos, start=1):
+        parcelas = ' + '.join(map(str, parcelas_caminho(matriz_distancias, caminho)))
+        linhas.append(f"{posicao}. {caminho}: {parcelas} = {custo}")
+    linhas.append(f"Prefixos explorados: {estatisticas['prefixos']}, nós visitados: {estatisticas['visitados']}, "
+                  f"nós podados: {estatisticas['podados']}")
+    return linhas
+
+
+def escrever_relatorio(matriz_distancias, k=10, arquivo=None, processos=None, limite=None):
+    arquivo = arquivo or sys.stdout
+    for linha in relatorio_melhores_caminhos(matriz_distancias, k, processos, limite):
+        print(linha, file=arquivo, flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lista os K melhores caminhos de uma matriz de distâncias.")
+    parser.add_argument('matriz', help="arquivo com a matriz de distâncias (.json, .npy ou TSPLIB .tsp/.atsp)")
+    parser.add_argument('-k', type=int, default=10, help="quantidade de caminhos no relatório")
+    parser.add_argument('-p', '--processos', type=int, default=None, help="número de processos")
+    parser.add_argument('-l', '--limite', type=float, default=None, help="custo máximo dos caminhos listados")
+    parser.add_argument('-o', '--saida', default=None, help="arquivo de saída (padrão: terminal)")
+    args = parser.parse_args()
+
+    matriz = carregar_instancia(args.matriz)
+    if args.saida:
+        with open(args.saida, 'w') as saida:
+            escrever_relatorio(matriz, args.k, saida, args.processos, args.limite)
+    else:
+        escrever_relatorio(matriz, args.k, None, args.processos, args.limite)
@@ -0,0 +1,229 @@
+"""
+Modelo esparso do TSP: variáveis só para as arestas candidatas.
+
+Os caminhos ótimos quase sempre usam arestas curtas, mas o modelo completo cria
+uma variável, restrições e um termo do objetivo para cada um dos n² pares de
+cidades. Aqui as arestas candidatas são as k mais curtas de cada cidade mais as
+do caminho da heurística (que garante um ciclo viável), de modo que o modelo
+tem O(n k) variáveis e restrições.
+
+O ótimo sobre as candidatas só é o ótimo global se nenhuma aresta de fora puder
+baratear o ciclo. Isso é conferido com custos reduzidos (limites.py): qualquer
+ciclo que usa a aresta (i, j) custa ao menos limite + reduzido[i][j], em que o
+limite vem da 1-árvore de Held-Karp (matrizes simétricas) ou do problema de
+atribuição. As arestas que não passam nesse teste são descartadas já de início;
+se, depois de resolvido o modelo, alguma aresta de fora ainda puder melhorar o
+melhor custo, ela entra no modelo e o mesmo solver é verificado de novo.
+O limite também é imposto ao objetivo, e a busca termina assim que um caminho
+o alcança.
+
+As restrições que dependem do conjunto de candidatas (graus e objetivo) ficam em
+um escopo push/pop e são refeitas a cada ampliação; as variáveis e as
+restrições de ordem de cada aresta permanecem no solver, com o que ele já aprendeu.
+"""
+
+import time
+
+import numpy as np
+from z3 import *
+
+from anytime import buscar_melhorias, consumir_melhorias
+from avaliacao import custo_caminho
+from carregamento import como_lista
+from codificacoes import escolher_codificacao, variavel_objetivo
+from eventos import estatisticas_z3, sem_marcacao
+from heuristicas import heuristica
+from limites import distancias_inteiras, limite_inferior as calcular_limite_inferior
+
+K_VIZINHOS = 8
+
+
+def vizinhos_mais_proximos(distance_matrix, k=K_VIZINHOS):
+    """Matriz booleana com True em (i, j) se j é uma das k cidades mais próximas de i."""
+    d = np.asarray(distance_matrix, dtype=float).copy()
+    n = len(d)
+    np.fill_diagonal(d, np.inf)
+    k = min(k, n - 1)
+    candidatas = np.zeros((n, n), dtype=bool)
+    if k > 0:
+        mais_proximas = np.argpartition(d, k - 1, axis=1)[:, :k]
+        candidatas[np.arange(n)[:, None], mais_proximas] = True
+    return candidatas
+
+
+def _matriz_do_caminho(n, caminho):
+    arestas = np.zeros((n, n), dtype=bool)
+    arestas[caminho[:-1], caminho[1:]] = True
+    return arestas
+
+
+def _criar_modelo(distancias, simetrica):
+    n = len(distancias)
+    largura = max(1, n.bit_length())
+    # Ordem de visita (MTZ) no modelo direcionado; posições distintas no ciclo no simétrico
+    ordem = [None] + [BitVec(f'p[{i}]' if simetrica else f'u[{i}]', largura) for i in range(1, n)]
+    solver = Solver()
+    for i in range(1, n):
+        solver.add(ULE(1, ordem[i]), ULE(ordem[i], n - 1))
+    if simetrica:
+        solver.add(Distinct(ordem[1:]))
+    return {'n': n, 'simetrica': simetrica, 'solver': solver, 'x': {}, 'ordem': ordem,
+            'objective': variavel_objetivo(distancias), 'variaveis': (n - 1) + 1}
+
+
+# Cria as variáveis das novas arestas e as restrições de ordem que dependem só de cada aresta.
+# No modelo simétrico, cada aresta é o par (i, j) com i < j.
+def _adicionar_arestas(modelo, arestas):
+    n, x, solver, ordem = modelo['n'], modelo['x'], modelo['solver'], modelo['ordem']
+    for i, j in arestas:
+        if modelo['simetrica']:
+            aresta = x[i, j] = Bool(f'y[{i}][{j}]')
+            if i == 0:
+                solver.add(Implies(aresta, Or(ordem[j] == 1, ordem[j] == n - 1)))
+                # Quebra de simetria, como em codificacoes: o menor vizinho da cidade 0 fica na posição 1
+                for (a, b), outra in list(x.items()):
+                    if a == 0 and b != j:
+                        menor = min(b, j)
+                        solver.add(Implies(And(aresta, outra), ordem[menor] == 1))
+            else:
+                solver.add(Implies(aresta, Or(ordem[j] == ordem[i] + 1, ordem[i] == ordem[j] + 1)))
+        else:
+            aresta = x[i, j] = Bool(f'x[{i}][{j}]')
+            if i != 0 and j != 0:
+                solver.add(Implies(aresta, ordem[j] == ordem[i] + 1))
+            if (j, i) in x and n > 2:
+                solver.add(AtMost(aresta, x[j, i], 1))
+        modelo['variaveis'] += 1
+
+
+# Graus e objetivo sobre as candidatas atuais, no escopo aberto por quem chama
+def _restricoes_do_conjunto(modelo, distancias):
+    n, x, solver = modelo['n'], modelo['x'], modelo['solver']
+    incidentes = [[] for _ in range(n)]
+    entrando = [[] for _ in range(n)]
+    for (i, j), aresta in x.items():
+        incidentes[i].append(aresta)
+        (incidentes if modelo['simetrica'] else entrando)[j].append(aresta)
+    for i in range(n):
+        if modelo['simetrica']:
+            solver.add(PbEq([(aresta, 1) for aresta in incidentes[i]], 2))
+        else:
+            solver.add(PbEq([(aresta, 1) for aresta in incidentes[i]], 1))
+            solver.add(PbEq([(aresta, 1) for aresta in entrando[i]], 1))
+    solver.add(modelo['objective'] == Sum([If(aresta, distancias[i][j], 0) for (i, j), aresta in x.items()]))
+
+
+def _extrair_caminho(modelo, model):
+    n = modelo['n']
+    vizinhos = [[] for _ in range(n)]
+    for (i, j), aresta in modelo['x'].items():
+        if is_true(model.evaluate(aresta, model_completion=True)):
+            vizinhos[i].append(j)
+            if modelo['simetrica']:
+                vizinhos[j].append(i)
+    caminho = [0]
+    for _ in range(n - 1):
+        caminho.append(next(j for j in vizinhos[caminho[-1]] if j not in caminho[-2:]))
+    caminho.append(0)
+    return caminho
+
+
+def _sugerir_caminho(modelo, caminho):
+    solver = modelo['solver']
+    if not hasattr(solver, 'set_initial_value'):  # disponível a partir do Z3 4.13
+        return
+    arestas = set(zip(caminho, caminho[1:]))
+    if modelo['simetrica']:
+        arestas = {(min(i, j), max(i, j)) for i, j in arestas}
+    for chave, aresta in modelo['x'].items():
+        solver.set_initial_value(aresta, BoolVal(chave in arestas))
+
+
+def resolver_esparso(distance_matrix, k=K_VIZINHOS, codificacao='bitvector', caminho_inicial=None, prazo=None,
+                     ao_melhorar=None, marcar=sem_marcacao):
+    """Resolve o TSP no modelo esparso, ampliando as candidatas até provar a otimalidade.
+
+    codificacao 'bitvector' ou 'booleana' usa o modelo direcionado, trocado
+    pelo não direcionado ('simetrica') quando a matriz é simétrica. Com prazo
+    (segundos), o melhor caminho encontrado até ele é retornado com otimo False.
+    ao_melhorar(melhoria) recebe cada caminho melhor que o anterior, como em
+    anytime.resolver_anytime. O resultado traz caminho, custo, tempo, otimo,
+    limite_inferior, rodadas (verificações do conjunto de candidatas), arestas
+    (variáveis de aresta criadas), arestas_possiveis, variaveis, assercoes e
+    estatisticas_z3.
+    """
+    inicio = time.perf_counter()
+    limite_prazo = None if prazo is None else inicio + prazo
+    d = np.asarray(distance_matrix)
+    distancias = como_lista(distance_matrix)
+    n = len(d)
+    if codificacao not in ('booleana', 'bitvector', 'simetrica'):
+        raise ValueError(f"O modo esparso usa as codificações booleana, bitvector ou simetrica, não {codificacao!r}")
+    simetrica = escolher_codificacao(d, 'bitvector') == 'simetrica'
+    if codificacao == 'simetrica' and not simetrica:
+        raise ValueError("A codificação simétrica exige uma matriz de distâncias simétrica")
+    if n < 3:
+        caminho = list(range(n)) + [0] if n else []
+        return {'caminho': caminho, 'custo': custo_caminho(d, caminho), 'tempo': time.perf_counter() - inicio,
+                'otimo': True, 'limite_inferior': custo_caminho(d, caminho), 'rodadas': 0, 'arestas': 0,
+                'arestas_possiveis': 0, 'variaveis': 0, 'assercoes': 0, 'estatisticas_z3': {}}
+
+    melhor = {'caminho': caminho_inicial, 'custo': None}
+    if melhor['caminho'] is None:
+        melhor['caminho'] = heuristica(d)[0]
+        marcar('heuristica')
+    melhor['custo'] = custo_caminho(d, melhor['caminho'])
+
+    limite = calcular_limite_inferior(d, melhor['custo'])
+    limite_inferior, reduzidos = limite['custo'], limite['reduzidos']
+    inteira = distancias_inteiras(d)
+    marcar('limite')
+
+    # Arestas que podem estar em um ciclo mais barato que custo: com distâncias inteiras, ele custa no máximo custo - 1
+    def podem_melhorar(custo):
+        return limite['relaxacao'] + reduzidos <= custo - (1 - 1e-6 if inteira else 1e-9)
+
+    do_caminho = _matriz_do_caminho(n, melhor['caminho'])
+    candidatas = (vizinhos_mais_proximos(d, k) & podem_melhorar(melhor['custo'])) | do_caminho
+    if simetrica:
+        candidatas = np.triu(candidatas | candidatas.T, 1)
+    modelo = _criar_modelo(distancias, simetrica)
+    _adicionar_arestas(modelo, np.argwhere(candidatas).tolist())
+    marcar('variaveis')
+
+    solver = modelo['solver']
+    solver.add(modelo['objective'] >= limite_inferior)
+    rodadas = 0
+    # Um caminho que já alcança o limite inferior é ótimo, sem verificar nada
+    otimo = melhor['custo'] <= limite_inferior
+    prazo_esgotado = False
+    while not (otimo or prazo_esgotado):
+        rodadas += 1
+        solver.push()
+        _restricoes_do_conjunto(modelo, distancias)
+        _sugerir_caminho(modelo, melhor['caminho'])
+        marcar('restricoes_grau')
+        fim, _ = consumir_melhorias(buscar_melhorias(solver, modelo['objective'],
+                                                     lambda model: _extrair_caminho(modelo, model), d, melhor,
+                                                     inicio, limite_prazo, limite_inferior, marcar), ao_melhorar)
+        solver.pop()
+        otimo, prazo_esgotado = fim == 'limite', fim == 'unknown'
+        if otimo or prazo_esgotado:
+            break
+        # Ótimo sobre as candidatas; falta conferir as arestas de fora pelos custos reduzidos
+        novas = podem_melhorar(melhor['custo']) & ~candidatas
+        np.fill_diagonal(novas, False)
+        if simetrica:
+            novas = np.triu(novas | novas.T, 1) & ~candidatas
+        if not novas.any():
+            otimo = True
+            break
+        candidatas |= novas
+        _adicionar_arestas(modelo, np.argwhere(novas).tolist())
+        marcar('ampliacao')
+
+    return {'caminho': melhor['caminho'], 'custo': melhor['custo'], 'tempo': time.perf_counter() - inicio,
+            'otimo': otimo, 'limite_inferior': melhor['custo'] if otimo else limite_inferior, 'rodadas': rodadas,
+            'arestas': len(modelo['x']), 'arestas_possiveis': n * (n - 1) // (2 if simetrica else 1),
+            'variaveis': modelo['variaveis'], 'assercoes': len(solver.assertions()),
+            'estatisticas_z3': estatisticas_z3(solver)}
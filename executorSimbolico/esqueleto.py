@@ -0,0 +1,96 @@
+"""
+Esqueletos de modelo reaproveitáveis para instâncias com o mesmo número de cidades.
+
+Das partes do modelo do TSP, só a função objetivo depende de distance_matrix:
+as variáveis x[i][j] e u[i], as restrições de grau e as restrições MTZ dependem
+apenas de n. O esqueleto (variáveis + restrições estruturais) é montado uma vez
+por (n, codificação) e guardado em um cache LRU; cada nova matriz apenas define
+o objetivo dentro de um escopo push/pop do mesmo solver, descartado ao final.
+"""
+
+import time
+from collections import OrderedDict
+
+from z3 import *
+
+from avaliacao import custo_caminho
+from carregamento import como_lista
+from codificacoes import (construir_estrutura, definir_objetivo, extrair_caminho, limitar_objetivo,
+                          limitar_objetivo_inferior, sugerir_caminho)
+from eventos import estatisticas_z3, sem_marcacao
+
+TAMANHO_CACHE_PADRAO = 8
+
+# (n, codificacao) -> modelo sem objetivo, do menos para o mais recentemente usado
+_esqueletos = OrderedDict()
+_tamanho_maximo = TAMANHO_CACHE_PADRAO
+
+
+def configurar_cache(tamanho_maximo):
+    global _tamanho_maximo
+    _tamanho_maximo = tamanho_maximo
+    while len(_esqueletos) > _tamanho_maximo:
+        _esqueletos.popitem(last=False)
+
+
+def limpar_cache():
+    _esqueletos.clear()
+
+
+def obter_esqueleto(n, codificacao='bitvector', marcar=sem_marcacao):
+    """Retorna (modelo, tempo_construcao); tempo_construcao é 0 quando o esqueleto vem do cache."""
+    chave = (n, codificacao)
+    if chave in _esqueletos:
+        _esqueletos.move_to_end(chave)
+        return _esqueletos[chave], 0.0
+    inicio = time.perf_counter()
+    modelo = construir_estrutura(n, codificacao, marcar=marcar)
+    tempo_construcao = time.perf_counter() - inicio
+    _esqueletos[chave] = modelo
+    while len(_esqueletos) > _tamanho_maximo:
+        _esqueletos.popitem(last=False)
+    return modelo, tempo_construcao
+
+
+def resolver_com_esqueleto(distance_matrix, codificacao='bitvector', caminho_inicial=None, marcar=sem_marcacao,
+                           limite_inferior=None):
+    """Resolve a instância usando o esqueleto em cache para len(distance_matrix) cidades.
+
+    Retorna um dicionário com caminho, custo e os tempos de construção do
+    esqueleto, de definição do objetivo e do check(), além das estatísticas do Z3.
+    limite_inferior, se informado, vale só para esta instância, como o objetivo.
+    """
+    distance_matrix = como_lista(distance_matrix)
+    modelo, tempo_estrutura = obter_esqueleto(len(distance_matrix), codificacao, marcar)
+    solver = modelo['solver']
+    variaveis = modelo['variaveis']
+    resultado = {'caminho': None, 'custo': None, 'reaproveitado': tempo_estrutura == 0.0,
+                 'tempo_estrutura': tempo_estrutura}
+
+    inicio = time.perf_counter()
+    solver.push()
+    try:
+        definir_objetivo(modelo, distance_matrix, marcar)
+        if caminho_inicial is not None:
+            limitar_objetivo(modelo, custo_caminho(distance_matrix, caminho_inicial))
+            sugerir_caminho(modelo, caminho_inicial)
+            marcar('aquecimento')
+        if limite_inferior is not None:
+            limitar_objetivo_inferior(modelo, limite_inferior)
+        resultado['tempo_objetivo'] = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        status = solver.check()
+        resultado['tempo_check'] = time.perf_counter() - inicio
+        marcar('check')
+        resultado['estatisticas_z3'] = estatisticas_z3(solver)
+        if status == sat:
+            caminho = extrair_caminho(modelo, solver.model())
+            marcar('extracao_caminho')
+            resultado['caminho'] = caminho
+            resultado['custo'] = custo_caminho(distance_matrix, caminho)
+    finally:
+        solver.pop()
+        modelo['objective'] = None
+        modelo['variaveis'] = variaveis
+    return resultado
@@ -0,0 +1,173 @@
+"""
+Instrumentação do solver: eventos estruturados e destinos plugáveis.
+
+Cada evento é um dicionário com o nome do evento ('evento'), o instante em que
+ocorreu ('instante', segundos desde a época) e campos próprios, por exemplo
+{'evento': 'fase', 'fase': 'mtz', 'duracao': 0.012}. Um destino é qualquer
+função que recebe o evento; os destinos prontos abaixo gravam em um logger, em
+JSON-lines, em uma lista, exibem as mensagens no terminal ou mostram a
+animação de progresso enquanto o solver verifica.
+
+Fases medidas na montagem e resolução do modelo: variaveis, restricoes_binarias,
+restricoes_grau, mtz, objetivo, check e extracao_caminho, além de limite (cálculo
+do limite inferior) e de fases próprias de cada modo, como cortes, esqueleto,
+ampliacao no modo esparso e, na decomposição, agrupamento, grupos, janelas e
+busca_local.
+"""
+
+import json
+import logging
+import threading
+import time
+
+
+def emitir(destinos, evento, **campos):
+    registro = {'evento': evento, 'instante': time.time()}
+    registro.update(campos)
+    for destino in destinos:
+        destino(registro)
+    return registro
+
+
+# Marcação não instrumentada, usada quando nenhum cronômetro é informado
+def sem_marcacao(fase=None, **campos):
+    pass
+
+
+def cronometro(destinos=()):
+    """Retorna marcar(fase), que registra o tempo decorrido desde a marcação anterior.
+
+    As durações acumuladas por fase ficam em marcar.fases. marcar(None)
+    apenas reinicia a contagem, sem registrar fase.
+    """
+    fases = {}
+    anterior = [time.perf_counter()]
+
+    def marcar(fase=None, **campos):
+        agora = time.perf_counter()
+        duracao = agora - anterior[0]
+        anterior[0] = agora
+        if fase is None:
+            return
+        fases[fase] = fases.get(fase, 0.0) + duracao
+        emitir(destinos, 'fase', fase=fase, duracao=duracao, **campos)
+
+    marcar.fases = fases
+    return marcar
+
+
+def estatisticas_z3(solver):
+    estatisticas = solver.statistics()
+    return {chave: estatisticas.get_key_value(chave) for chave in estatisticas.keys()}
+
+
+# Função para exibir uma animação de progresso
+def mostrar_progresso(flag):
+    progress = ['|', '/', '-', '\\']  # Animação simples de progresso
+    i = 0
+    while flag['running']:
+        print(f'\rProcessando... {progress[i % len(progress)]}', end='', flush=True)
+        time.sleep(0.1)
+        i += 1
+
+
+# Destino que mostra a animação de progresso entre 'verificacao_inicio' e 'verificacao_fim'
+def destino_progresso():
+    estado = {'flag': None, 'thread': None}
+
+    def destino(evento):
+        if evento['evento'] == 'verificacao_inicio' and estado['thread'] is None:
+            estado['flag'] = {'running': True}  # Flag para controlar a thread de animação
+            estado['thread'] = threading.Thread(target=mostrar_progresso, args=(estado['flag'],), daemon=True)
+            estado['thread'].start()
+        elif evento['evento'] == 'verificacao_fim' and estado['thread'] is not None:
+            estado['flag']['running'] = False  # Para a thread de progresso
+            estado['thread'].join()  # Espera a thread terminar
+            estado['thread'] = None
+
+    return destino
+
+
+# Destino que reproduz no terminal as mensagens do tsp_solver
+def destino_terminal(fases=False):
+    def destino(evento):
+        tipo = evento['evento']
+        if tipo == 'inicio':
+            print(f"Número de cidades: {evento['n']} \n")
+        elif tipo == 'provisorio':
+            print(f"Caminho provisório (heurística, {evento['duracao']:.3f} segundos): "
+                  f"{evento['caminho']} com custo {evento['custo']}")
+        elif tipo == 'limite':
+            distancia = (f"; caminho provisório a {evento['gap']:.2%} dele" if evento['gap'] else
+                         "; o caminho provisório o alcança e é ótimo" if evento['gap'] == 0 else "")
+            print(f"Limite inferior: {evento['limite_inferior']}{distancia}")
+        elif tipo == 'modelo':
+            print(f"Codificação {evento['codificacao']}: {evento['variaveis']} variáveis, {evento['assercoes']} asserções")
+        elif tipo == 'verificacao_inicio':
+            print("\nVerificando solução...")
+        elif tipo == 'melhoria':
+            origem = f" ({evento['configuracao']})" if 'configuracao' in evento else ""
+            print(f"\nMelhoria em {evento['tempo']:.2f} segundos: custo {evento['custo']}{origem}")
+        elif tipo == 'verificacao_fim':
+            if evento['caminho'] is None:
+                print(f"\nNenhuma solução encontrada em {evento['duracao']:.2f} segundos.")
+            elif evento['otimo']:
+                print(f"\nSolução encontrada em {evento['duracao']:.2f} segundos.")
+            elif evento.get('modo') == 'decomposicao':
+                print(f"\nSolução por decomposição encontrada em {evento['duracao']:.2f} segundos, "
+                      f"sem prova de otimalidade.")
+            else:
+                print(f"\nPrazo esgotado em {evento['duracao']:.2f} segundos; melhor solução encontrada, "
+                      f"sem prova de otimalidade.")
+        elif tipo == 'cortes':
+            print(f"Cortes de subciclo adicionados: {evento['cortes']} em {evento['iteracoes']} verificações")
+        elif tipo == 'decomposicao':
+            limite = (f"; limite inferior {evento['limite_inferior']}, gap {evento['gap']:.2%}"
+                      if evento['limite_inferior'] is not None else "")
+            print(f"Decomposição em {len(evento['grupos'])} grupos ({evento['grupos_otimos']} com caminho ótimo): "
+                  f"custo {evento['custo_costura']} após a costura, {evento['custo']} após o refinamento{limite}")
+        elif tipo == 'esparso':
+            print(f"Modelo esparso: {evento['arestas']} de {evento['arestas_possiveis']} arestas em {evento['rodadas']} "
+                  f"rodadas; limite inferior {evento['limite_inferior']}, gap {evento['gap']:.2%}")
+        elif tipo == 'portfolio':
+            print(f"Portfólio de {len(evento['configuracoes'])} configurações; resposta de {evento['vencedor']}")
+        elif tipo == 'esqueleto':
+            origem = ("reaproveitado do cache" if evento['reaproveitado']
+                      else f"construído em {evento['tempo_estrutura']:.3f} segundos")
+            print(f"Esqueleto para {evento['n']} cidades {origem}; objetivo em {evento['tempo_objetivo']:.3f} segundos, "
+                  f"check em {evento['tempo_check']:.3f} segundos")
+        elif tipo == 'cache':
+            print(f"Resultado encontrado no cache em {evento['duracao'] * 1e6:.0f} microssegundos.")
+        elif tipo == 'resultado' and evento['caminho'] is not None:
+            print(f"Caminho completo: {evento['caminho']}")
+        elif tipo == 'fase' and fases:
+            print(f"  fase {evento['fase']}: {evento['duracao']:.4f} segundos")
+
+    return destino
+
+
+def destino_logger(logger=None, nivel=logging.INFO):
+    logger = logger or logging.getLogger('tsp')
+
+    def destino(evento):
+        campos = {k: v for k, v in evento.items() if k not in ('evento', 'instante')}
+        logger.log(nivel, "%s %s", evento['evento'], json.dumps(campos, ensure_ascii=False, default=str))
+
+    return destino
+
+
+def destino_jsonl(arquivo):
+    def destino(evento):
+        arquivo.write(json.dumps(evento, ensure_ascii=False, default=str) + '\n')
+        arquivo.flush()
+
+    return destino
+
+
+def destino_lista(lista):
+    return lista.append
+
+
+def destinos_padrao():
+    # A animação vem primeiro para parar antes de a mensagem final ser exibida
+    return [destino_progresso(), destino_terminal()]
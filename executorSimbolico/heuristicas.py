@@ -0,0 +1,103 @@
+"""
+Heurísticas rápidas para o Problema do Caixeiro Viajante.
+
+Geram, em milissegundos, um caminho incumbente que serve de resposta
+provisória e de limite superior (objective <= custo) para o otimizador do Z3.
+O vizinho mais próximo constrói o caminho inicial e as buscas locais 2-opt e
+Or-opt o melhoram; em cada passada, o ganho de todos os movimentos possíveis é
+calculado de uma vez com NumPy e o melhor movimento é aplicado. O 2-opt leva em
+conta o custo de inverter o trecho, portanto também vale para matrizes assimétricas.
+"""
+
+import numpy as np
+
+from avaliacao import custo_caminho
+
+
+def vizinho_mais_proximo(d, inicio=0):
+    d = np.asarray(d)
+    n = len(d)
+    visitado = np.zeros(n, dtype=bool)
+    visitado[inicio] = True
+    caminho = [inicio]
+    for _ in range(n - 1):
+        linha = np.where(visitado, np.inf, d[caminho[-1]])
+        proxima = int(linha.argmin())
+        visitado[proxima] = True
+        caminho.append(proxima)
+    caminho.append(inicio)
+    return caminho
+
+
+# Uma passada de 2-opt: inverte o trecho t[i+1..j] que mais reduz o custo
+def _melhor_2opt(d, t):
+    n = len(t) - 1
+    frente = d[t[:-1], t[1:]]
+    tras = d[t[1:], t[:-1]]
+    acum_frente = np.concatenate(([0], np.cumsum(frente)))
+    acum_tras = np.concatenate(([0], np.cumsum(tras)))
+
+    i = np.arange(n)[:, None]
+    j = np.arange(n)[None, :]
+    delta = (d[t[i], t[j]] + d[t[i + 1], t[j + 1]] - frente[i] - frente[j]
+             + (acum_tras[j] - acum_tras[np.minimum(i + 1, j)])
+             - (acum_frente[j] - acum_frente[np.minimum(i + 1, j)]))
+    delta = np.where(j > i + 1, delta, 0)
+    delta[0, n - 1] = 0  # inverter tudo menos a cidade inicial não muda o ciclo
+    i, j = np.unravel_index(delta.argmin(), delta.shape)
+    return delta[i, j], i, j
+
+
+# Uma passada de Or-opt: move um trecho de 1 a 3 cidades para outra aresta do caminho
+def _melhor_oropt(d, t):
+    n = len(t) - 1
+    melhor = (0, None, None, None)
+    arestas = d[t[:-1], t[1:]]
+    for tamanho in (1, 2, 3):
+        if n - tamanho < 2:
+            break
+        s = np.arange(1, n - tamanho + 1)[:, None]  # início do trecho
+        primeiro, ultimo = t[s], t[s + tamanho - 1]
+        anterior, seguinte = t[s - 1], t[s + tamanho]
+        remocao = d[anterior, seguinte] - d[anterior, primeiro] - d[ultimo, seguinte]
+        k = np.arange(n)[None, :]  # aresta (t[k], t[k+1]) que recebe o trecho
+        insercao = d[t[k], primeiro] + d[ultimo, t[k + 1]] - arestas[k]
+        delta = remocao + insercao
+        delta = np.where((k >= s - 1) & (k <= s + tamanho - 1), 0, delta)
+        a, b = np.unravel_index(delta.argmin(), delta.shape)
+        if delta[a, b] < melhor[0]:
+            melhor = (delta[a, b], int(s[a, 0]), int(k[0, b]), tamanho)
+    return melhor
+
+
+def busca_local(d, caminho):
+    """Aplica 2-opt e Or-opt até nenhum movimento reduzir o custo."""
+    d = np.asarray(d)
+    t = np.asarray(caminho)
+    if len(t) < 5:
+        return list(caminho)
+    tolerancia = 1e-9 if np.issubdtype(d.dtype, np.floating) else 0
+    while True:
+        ganho, i, j = _melhor_2opt(d, t)
+        if ganho < -tolerancia:
+            t = np.concatenate((t[:i + 1], t[i + 1:j + 1][::-1], t[j + 1:]))
+            continue
+        ganho, s, k, tamanho = _melhor_oropt(d, t)
+        if ganho < -tolerancia:
+            trecho = t[s:s + tamanho]
+            if k < s:
+                t = np.concatenate((t[:k + 1], trecho, t[k + 1:s], t[s + tamanho:]))
+            else:
+                t = np.concatenate((t[:s], t[s + tamanho:k + 1], trecho, t[k + 1:]))
+            continue
+        return t.tolist()
+
+
+def heuristica(d):
+    """Retorna (caminho, custo) do vizinho mais próximo refinado por 2-opt e Or-opt."""
+    d = np.asarray(d)
+    if len(d) <= 1:
+        caminho = [0, 0] if len(d) else []  # uma única cidade: o ciclo sai dela e volta
+        return caminho, custo_caminho(d, caminho)
+    caminho = busca_local(d, vizinho_mais_proximo(d))
+    return caminho, custo_caminho(d, caminho)
@@ -0,0 +1,236 @@
+"""
+Limites inferiores para o custo do TSP.
+
+Todo ciclo que passa por todas as cidades é, em particular, uma atribuição:
+cada cidade tem exatamente um sucessor. O custo mínimo de atribuição
+(problema de atribuição, resolvido pelo método húngaro) é portanto um limite
+inferior do custo ótimo. O método húngaro também produz os potenciais duais u
+e v, com u[i] + v[j] <= d[i][j] e soma igual ao custo da atribuição; o custo
+reduzido d[i][j] - u[i] - v[j] >= 0 mede quanto qualquer ciclo que usa a
+aresta (i, j) custa, no mínimo, acima desse limite.
+
+Em matrizes simétricas, o limite de Held-Karp (1-árvore com penalidades
+ajustadas por subgradiente) costuma ficar a poucos por cento do ótimo e é bem
+mais forte que o da atribuição, que aceita ciclos de duas cidades.
+limite_inferior escolhe o limite adequado à matriz, e gap mede a distância de
+um caminho até ele: um caminho com gap zero é ótimo, sem precisar do solver.
+
+Uso pela linha de comando (limite e gap do caminho da heurística):
+    python limites.py instancia.tsp
+"""
+
+import argparse
+
+import numpy as np
+
+from carregamento import carregar_instancia
+from codificacoes import distancias_inteiras, matriz_simetrica
+from heuristicas import heuristica
+
+# Folga relativa descontada do limite de matrizes fracionárias (arredondamento do ponto flutuante)
+FOLGA_FRACIONARIA = 1e-9
+
+
+def atribuicao(distance_matrix):
+    """Resolve o problema de atribuição sem laços (i -> i) pelo método húngaro.
+
+    Retorna um dicionário com custo (o limite inferior), sucessor (sucessor[i]
+    é a cidade atribuída a i) e os potenciais duais u (cidades de origem) e v
+    (cidades de destino). Cada fase busca um caminho aumentante mais curto com
+    potenciais, em O(n^2), e as operações sobre as colunas são vetorizadas.
+    """
+    d = np.asarray(distance_matrix, dtype=float)
+    n = len(d)
+    if n < 2:
+        return {'custo': 0, 'sucessor': list(range(n)), 'u': np.zeros(n), 'v': np.zeros(n)}
+    # Laços proibidos por um custo maior que qualquer atribuição
+    a = d.copy()
+    np.fill_diagonal(a, (np.abs(d).max() + 1) * n)
+
+    # Índices a partir de 1, com a coluna 0 fictícia, como na formulação clássica do algoritmo
+    u = np.zeros(n + 1)
+    v = np.zeros(n + 1)
+    linha_da_coluna = np.zeros(n + 1, dtype=np.intp)
+    anterior = np.zeros(n + 1, dtype=np.intp)
+    for i in range(1, n + 1):
+        linha_da_coluna[0] = i
+        coluna = 0
+        menor = np.full(n + 1, np.inf)
+        usada = np.zeros(n + 1, dtype=bool)
+        while linha_da_coluna[coluna] != 0:
+            usada[coluna] = True
+            linha = linha_da_coluna[coluna]
+            reduzido = a[linha - 1] - u[linha] - v[1:]
+            livre = ~usada[1:]
+            melhora = livre & (reduzido < menor[1:])
+            menor[1:][melhora] = reduzido[melhora]
+            anterior[1:][melhora] = coluna
+            candidatos = np.where(livre, menor[1:], np.inf)
+            proxima = int(candidatos.argmin()) + 1
+            delta = candidatos[proxima - 1]
+            u[linha_da_coluna[usada]] += delta
+            v[usada] -= delta
+            menor[1:][livre] -= delta
+            coluna = proxima
+        # Inverte o caminho aumentante
+        while coluna != 0:
+            origem = anterior[coluna]
+            linha_da_coluna[coluna] = linha_da_coluna[origem]
+            coluna = origem
+
+    sucessor = [0] * n
+    for coluna in range(1, n + 1):
+        sucessor[linha_da_coluna[coluna] - 1] = coluna - 1
+    custo = d[np.arange(n), sucessor].sum()
+    if np.issubdtype(np.asarray(distance_matrix).dtype, np.integer) or np.all(d == np.round(d)):
+        custo = int(round(custo))
+    return {'custo': custo, 'sucessor': sucessor, 'u': u[1:], 'v': v[1:]}
+
+
+def custos_reduzidos(distance_matrix, resultado):
+    """Matriz d[i][j] - u[i] - v[j] (não negativa) a partir do resultado de atribuicao."""
+    d = np.asarray(distance_matrix, dtype=float)
+    reduzidos = d - resultado['u'][:, None] - resultado['v'][None, :]
+    np.fill_diagonal(reduzidos, np.inf)
+    return np.maximum(reduzidos, 0)
+
+
+# Árvore geradora mínima (Prim) das cidades 1..n-1 mais as duas arestas mais leves da cidade 0.
+# Retorna o peso, o grau de cada cidade, o pai de cada cidade na árvore, a ordem de inclusão e
+# os dois vizinhos da cidade 0.
+def _arvore_1(pesos):
+    n = len(pesos)
+    na_arvore = np.zeros(n, dtype=bool)
+    na_arvore[0] = na_arvore[1] = True
+    chave = pesos[1].copy()
+    pai = np.ones(n, dtype=np.intp)
+    graus = np.zeros(n, dtype=np.int64)
+    ordem = [1]
+    peso = 0.0
+    for _ in range(n - 2):
+        v = int(np.where(na_arvore, np.inf, chave).argmin())
+        peso += chave[v]
+        graus[v] += 1
+        graus[pai[v]] += 1
+        na_arvore[v] = True
+        ordem.append(v)
+        melhora = ~na_arvore & (pesos[v] < chave)
+        chave[melhora] = pesos[v][melhora]
+        pai[melhora] = v
+    vizinhos_0 = np.argpartition(pesos[0, 1:], 1)[:2] + 1
+    peso += pesos[0, vizinhos_0].sum()
+    graus[0] = 2
+    graus[vizinhos_0] += 1
+    return peso, graus, pai, ordem, vizinhos_0
+
+
+def arvore_1(distance_matrix, limite_superior, iteracoes=300):
+    """Limite de Held-Karp para matrizes simétricas: 1-árvore com penalidades por subgradiente.
+
+    Uma 1-árvore é uma árvore geradora das cidades 1..n-1 mais duas arestas da
+    cidade 0; todo ciclo é uma 1-árvore em que cada cidade tem grau 2. Com
+    penalidades pi nas cidades (pesos d[i][j] + pi[i] + pi[j]), o peso da
+    1-árvore mínima menos 2 * soma(pi) continua sendo um limite inferior, e o
+    subgradiente (grau - 2) ajusta pi para aproximá-lo do ótimo.
+    limite_superior é o custo de um ciclo conhecido, usado no tamanho do passo.
+
+    Retorna um dicionário com custo (o melhor limite) e reduzidos: reduzidos[i][j]
+    é quanto qualquer ciclo que usa a aresta {i, j} custa, no mínimo, acima do
+    limite (o peso extra da 1-árvore mínima forçada a conter a aresta).
+    """
+    d = np.asarray(distance_matrix, dtype=float)
+    n = len(d)
+    if n < 3:
+        custo = d[0, 1] + d[1, 0] if n == 2 else 0
+        return {'custo': custo, 'reduzidos': np.zeros((n, n))}
+    pi = np.zeros(n)
+    melhor = {'custo': -np.inf, 'pi': pi}
+    passo_relativo = 2.0
+    sem_melhora = 0
+    for _ in range(iteracoes):
+        pesos = d + pi[:, None] + pi[None, :]
+        np.fill_diagonal(pesos, np.inf)
+        peso, graus, _, _, _ = _arvore_1(pesos)
+        custo = peso - 2 * pi.sum()
+        if custo > melhor['custo'] + 1e-9:
+            melhor = {'custo': custo, 'pi': pi.copy()}
+            sem_melhora = 0
+        else:
+            sem_melhora += 1
+            if sem_melhora >= 10:
+                passo_relativo /= 2
+                sem_melhora = 0
+        subgradiente = graus - 2
+        norma = (subgradiente ** 2).sum()
+        if norma == 0 or passo_relativo < 1e-4 or custo >= limite_superior - 1e-9:
+            break  # 1-árvore que é um ciclo (ótimo) ou passo pequeno demais para melhorar
+        pi = pi + passo_relativo * (limite_superior - custo) / norma * subgradiente
+
+    pi = melhor['pi']
+    pesos = d + pi[:, None] + pi[None, :]
+    np.fill_diagonal(pesos, np.inf)
+    peso, _, pai, ordem, vizinhos_0 = _arvore_1(pesos)
+    # Maior aresta no caminho da árvore entre cada par de cidades: trocar essa aresta por {i, j}
+    # dá a 1-árvore mínima que contém {i, j}
+    maior = np.zeros((n, n))
+    for k in range(1, len(ordem)):
+        v, anteriores = ordem[k], ordem[:k]
+        maior[v, anteriores] = np.maximum(maior[pai[v], anteriores], pesos[pai[v], v])
+        maior[anteriores, v] = maior[v, anteriores]
+    reduzidos = pesos - maior
+    # Arestas da cidade 0 substituem a mais pesada das duas escolhidas
+    reduzidos[0, 1:] = pesos[0, 1:] - pesos[0, vizinhos_0].max()
+    reduzidos[1:, 0] = reduzidos[0, 1:]
+    np.fill_diagonal(reduzidos, np.inf)
+    return {'custo': melhor['custo'], 'reduzidos': np.maximum(reduzidos, 0)}
+
+
+def limite_inferior(distance_matrix, limite_superior=None, iteracoes=300):
+    """Limite inferior do custo de qualquer ciclo: 1-árvore (simétricas) ou atribuição (assimétricas).
+
+    limite_superior é o custo de um ciclo conhecido, usado no passo do
+    subgradiente; se não for informado, vem da heurística. Retorna um
+    dicionário com custo (o limite, arredondado para cima quando as distâncias
+    são inteiras e reduzido de FOLGA_FRACIONARIA, relativa, quando não são), relaxacao (o valor sem arredondamento), metodo ('arvore_1'
+    ou 'atribuicao') e reduzidos, a matriz de custos reduzidos do método.
+    """
+    d = np.asarray(distance_matrix)
+    n = len(d)
+    if n < 2:
+        return {'custo': 0, 'relaxacao': 0, 'metodo': 'atribuicao', 'reduzidos': np.zeros((n, n))}
+    if matriz_simetrica(d):
+        if limite_superior is None:
+            limite_superior = heuristica(d)[1]
+        resultado = arvore_1(d, limite_superior, iteracoes)
+        metodo, reduzidos = 'arvore_1', resultado['reduzidos']
+    else:
+        resultado = atribuicao(d)
+        metodo, reduzidos = 'atribuicao', custos_reduzidos(d, resultado)
+    relaxacao = resultado['custo']
+    if distancias_inteiras(d):
+        custo = int(np.ceil(relaxacao - 1e-6))
+    else:
+        # Com distâncias fracionárias, a folga cobre o arredondamento das somas em ponto flutuante,
+        # para que o limite imposto ao objetivo nunca exclua o ciclo ótimo
+        custo = float(relaxacao) - FOLGA_FRACIONARIA * max(1.0, abs(float(relaxacao)))
+    return {'custo': custo, 'relaxacao': relaxacao, 'metodo': metodo, 'reduzidos': reduzidos}
+
+
+def gap(custo, limite):
+    """Quanto custo está acima do limite inferior, como fração dele (0.0 quando o caminho é ótimo)."""
+    if custo <= limite:
+        return 0.0
+    return custo / limite - 1 if limite > 0 else float('inf')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calcula um limite inferior e o gap do caminho da heurística.")
+    parser.add_argument('instancia', help="arquivo .tsp/.atsp, .npy ou .json")
+    parser.add_argument('--iteracoes', type=int, default=300, help="iterações do subgradiente da 1-árvore")
+    args = parser.parse_args()
+
+    matriz = np.asarray(carregar_instancia(args.instancia))
+    caminho, custo = heuristica(matriz)
+    limite = limite_inferior(matriz, custo, args.iteracoes)
+    print(f"Limite inferior: {limite['custo']} ({limite['metodo']})")
+    print(f"Heurística: custo {custo}, gap {gap(custo, limite['custo']):.2%}")
@@ -0,0 +1,223 @@
+"""
+Resolução em lote de muitas matrizes de distâncias em processos de trabalho.
+
+O Z3 segura o GIL durante check(), então threads não trazem paralelismo: cada
+instância é resolvida por app_saidaComum.tsp_solver em um dos processos de
+trabalho, que importam o Z3 uma única vez. Cada tarefa tem seu próprio prazo
+(resolução anytime, ver anytime.py; o do lote ou o da própria instância) e
+para assim que o caminho alcança o limite inferior; os resultados são entregues
+assim que ficam prontos, sem esperar o lote inteiro. Cada processo resolve uma
+instância por vez, de modo que entradas grandes são lidas aos poucos. Como o
+Z3 não pode ser interrompido por fora (ver portfolio.py), um processo que
+passa de MARGEM_PRAZO segundos além do prazo é terminado e substituído, e
+fechar o gerador termina todos os processos, inclusive os que estão no meio de
+uma resolução.
+
+Uso pela linha de comando:
+    python lote.py instancias/ --processos 4 --prazo 30 > resultados.jsonl
+    python lote.py instancias.jsonl --saida resultados.jsonl
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from multiprocessing.connection import wait
+
+from app_saidaComum import tsp_solver
+from cache import abrir_cache
+from carregamento import carregar_instancia, como_lista
+from codificacoes import escolher_codificacao
+
+
+# Tempo, em segundos, que um processo pode passar do prazo da instância antes de ser terminado
+MARGEM_PRAZO = 5.0
+
+
+# Executada dentro de um processo de trabalho. tsp_solver consulta e alimenta o cache, parte da heurística e
+# para assim que um caminho alcança o limite inferior (limites.py); com prazo, a resolução é anytime
+def _resolver_tarefa(identificador, matriz, prazo, codificacao, aquecimento, cache=None):
+    inicio = time.perf_counter()
+    resultado = {'id': identificador, 'n': len(matriz), 'status': None, 'caminho': None, 'custo': None}
+    try:
+        resultado['codificacao'] = escolher_codificacao(matriz, codificacao)
+        final = tsp_solver(matriz, codificacao=codificacao, aquecimento=aquecimento, prazo=prazo, cache=cache,
+                           destinos=[])
+        resultado['tempo_heuristica'] = final['fases'].get('heuristica', 0.0)
+        resultado['tempo_solver'] = final['tempo']
+        resultado.update(caminho=final['caminho'], custo=final['custo'], limite_inferior=final['limite_inferior'],
+                         gap=final['gap'])
+        if final['cache']:
+            resultado['cache'] = True
+        if final['otimo']:
+            resultado['status'] = 'otimo'
+        elif final['caminho'] is not None:
+            resultado['status'] = 'prazo_esgotado'
+        else:
+            resultado['status'] = 'sem_solucao'
+    except Exception:
+        resultado['status'] = 'erro'
+        resultado['erro'] = traceback.format_exc()
+    resultado['tempo_total'] = time.perf_counter() - inicio
+    return resultado
+
+
+# Laço de cada processo de trabalho: recebe os argumentos de _resolver_tarefa e responde com o resultado
+def _trabalhador(conexao, arquivo_cache):
+    cache = abrir_cache(arquivo_cache) if arquivo_cache is not None else None
+    while True:
+        try:
+            tarefa = conexao.recv()
+        except (EOFError, OSError):
+            return
+        conexao.send(_resolver_tarefa(*tarefa, cache=cache))
+
+
+def _iniciar_trabalhador(arquivo_cache):
+    conexao, conexao_filho = multiprocessing.Pipe()
+    processo = multiprocessing.Process(target=_trabalhador, args=(conexao_filho, arquivo_cache), daemon=True)
+    processo.start()
+    conexao_filho.close()
+    return {'processo': processo, 'conexao': conexao, 'tarefa': None}
+
+
+def _terminar_trabalhador(trabalhador):
+    trabalhador['processo'].kill()
+    trabalhador['processo'].join()
+    trabalhador['conexao'].close()
+
+
+def resolver_lote(instancias, processos=None, prazo=None, codificacao='bitvector', aquecimento=True,
+                  arquivo_cache=None):
+    """Resolve as instâncias em paralelo e gera cada resultado ao terminar.
+
+    instancias são pares (id, matriz) ou trios (id, matriz, prazo); o prazo
+    da instância (segundos), quando não é None, vale no lugar do prazo do lote.
+    Cada resultado é um dicionário com id, n, status ('otimo', 'prazo_esgotado',
+    'sem_solucao' ou 'erro'), caminho, custo, limite_inferior, gap e os tempos da heurística, do solver e total.
+    Matrizes simétricas usam a codificação simétrica (ver codificacoes.escolher_codificacao).
+    Com arquivo_cache, os processos compartilham o cache de resultados ótimos (cache.py).
+    Fechar o gerador termina os processos, também os que ainda estão resolvendo.
+    """
+    processos = processos or os.cpu_count() or 1
+    instancias = iter(instancias)
+    trabalhadores = [_iniciar_trabalhador(arquivo_cache) for _ in range(processos)]
+    esgotadas = False
+    try:
+        while True:
+            for trabalhador in trabalhadores:
+                if trabalhador['tarefa'] is not None or esgotadas:
+                    continue
+                try:
+                    identificador, matriz, *resto = next(instancias)
+                except StopIteration:
+                    esgotadas = True
+                    break
+                prazo_instancia = resto[0] if resto and resto[0] is not None else prazo
+                matriz = como_lista(matriz)
+                # Depois do prazo e da margem, o processo é terminado mesmo que o Z3 ainda não tenha respondido
+                limite = None if prazo_instancia is None else time.monotonic() + prazo_instancia + MARGEM_PRAZO
+                trabalhador['tarefa'] = {'id': identificador, 'n': len(matriz), 'limite': limite}
+                trabalhador['conexao'].send((identificador, matriz, prazo_instancia, codificacao, aquecimento))
+
+            ocupados = [trabalhador for trabalhador in trabalhadores if trabalhador['tarefa'] is not None]
+            if not ocupados:
+                break
+            limites = [t['tarefa']['limite'] for t in ocupados if t['tarefa']['limite'] is not None]
+            espera = None if not limites else max(0.0, min(limites) - time.monotonic())
+            prontas = wait([trabalhador['conexao'] for trabalhador in ocupados], timeout=espera)
+            agora = time.monotonic()
+            for indice, trabalhador in enumerate(trabalhadores):
+                tarefa = trabalhador['tarefa']
+                if tarefa is None:
+                    continue
+                if trabalhador['conexao'] in prontas:
+                    try:
+                        resultado = trabalhador['conexao'].recv()
+                    except (EOFError, OSError):
+                        resultado = None
+                    if resultado is not None:
+                        trabalhador['tarefa'] = None
+                        yield resultado
+                        continue
+                    status, erro = 'erro', "processo de trabalho terminou sem responder"
+                elif tarefa['limite'] is not None and agora >= tarefa['limite']:
+                    status, erro = 'prazo_esgotado', f"processo terminado {MARGEM_PRAZO} segundos depois do prazo"
+                else:
+                    continue
+                # Processo que morreu ou que passou do prazo: é substituído por um novo
+                _terminar_trabalhador(trabalhador)
+                trabalhadores[indice] = _iniciar_trabalhador(arquivo_cache)
+                yield {'id': tarefa['id'], 'n': tarefa['n'], 'status': status, 'caminho': None, 'custo': None,
+                       'erro': erro}
+    finally:
+        # Se o consumidor parar antes do fim, os processos são terminados no meio do que estiverem resolvendo
+        for trabalhador in trabalhadores:
+            _terminar_trabalhador(trabalhador)
+
+
+# Cada arquivo do diretório contém uma matriz: .json (lista de listas ou {"matriz": ..., "prazo": ...}),
+# .npy ou TSPLIB (.tsp/.atsp)
+def ler_diretorio(diretorio):
+    for nome in sorted(os.listdir(diretorio)):
+        extensao = os.path.splitext(nome)[1].lower()
+        if extensao == '.json':
+            with open(os.path.join(diretorio, nome)) as f:
+                dado = json.load(f)
+            if isinstance(dado, dict):
+                yield nome, dado['matriz'], dado.get('prazo')
+            else:
+                yield nome, dado, None
+        elif extensao in ('.npy', '.tsp', '.atsp'):
+            yield nome, carregar_instancia(os.path.join(diretorio, nome)), None
+
+
+# Cada linha contém uma matriz ou um objeto {"id": ..., "matriz": ..., "prazo": ...}
+def ler_jsonl(arquivo):
+    for numero, linha in enumerate(arquivo, start=1):
+        linha = linha.strip()
+        if not linha:
+            continue
+        dado = json.loads(linha)
+        if isinstance(dado, dict):
+            yield dado.get('id', numero), dado['matriz'], dado.get('prazo')
+        else:
+            yield numero, dado, None
+
+
+def _instancias_da_entrada(entrada):
+    if entrada == '-':
+        yield from ler_jsonl(sys.stdin)
+    elif os.path.isdir(entrada):
+        yield from ler_diretorio(entrada)
+    elif os.path.splitext(entrada)[1].lower() in ('.npy', '.tsp', '.atsp'):
+        yield os.path.basename(entrada), carregar_instancia(entrada)
+    else:
+        with open(entrada) as f:
+            yield from ler_jsonl(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolve muitas matrizes de distâncias em paralelo.")
+    parser.add_argument('entrada', help="diretório com arquivos .json/.npy/.tsp, arquivo JSON-lines ou '-' para a entrada padrão")
+    parser.add_argument('-p', '--processos', type=int, default=None, help="número de processos (padrão: núcleos)")
+    parser.add_argument('-t', '--prazo', type=float, default=None,
+                        help="prazo por instância, em segundos, para as que não trazem o próprio")
+    parser.add_argument('-c', '--codificacao', default='bitvector', help="codificação do modelo (ver codificacoes.py)")
+    parser.add_argument('--sem-aquecimento', action='store_true', help="não usa a heurística como ponto de partida")
+    parser.add_argument('--cache', default=None, metavar='ARQUIVO',
+                        help="cache SQLite de resultados ótimos compartilhado entre os processos")
+    parser.add_argument('-o', '--saida', default=None, help="arquivo JSON-lines de saída (padrão: terminal)")
+    args = parser.parse_args()
+
+    saida = open(args.saida, 'w') if args.saida else sys.stdout
+    try:
+        for resultado in resolver_lote(_instancias_da_entrada(args.entrada), args.processos, args.prazo,
+                                       args.codificacao, not args.sem_aquecimento, args.cache):
+            print(json.dumps(resultado, ensure_ascii=False), file=saida, flush=True)
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
@@ -0,0 +1,281 @@
+"""
+Portfólio de configurações do solver resolvidas ao mesmo tempo.
+
+O tempo de resolução varia muito com a semente aleatória, o motor de
+otimização e a codificação, e não dá para saber de antemão qual configuração
+será a mais rápida para uma instância. Aqui várias configurações rodam ao
+mesmo tempo, cada uma em um processo próprio (o Z3 segura o GIL, então threads
+não ajudam): o Optimize com o modelo MTZ nas codificações simétrica, bitvector
+e inteira, com sementes e motores de otimização diferentes, o objetivo como
+MaxSAT ponderado (motores maxres e wmax), a resolução anytime e os cortes
+preguiçosos.
+
+Cada processo envia por uma fila os caminhos que encontra (o Optimize os
+entrega pelo callback on_model) e o resultado final. A primeira resposta com
+otimalidade provada encerra a corrida; quando o prazo acaba, vale o melhor
+caminho recebido. Um caminho que alcança o limite inferior (limites.py)
+também encerra a corrida, já provado ótimo. Os processos restantes são
+terminados. Assim o tempo de parede acompanha a configuração mais rápida de
+cada instância.
+
+Uso pela linha de comando:
+    python portfolio.py instancia.tsp --prazo 60 --configuracoes simetrica bitvector maxres
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import time
+import traceback
+
+from z3 import *
+
+from anytime import melhorias_anytime
+from avaliacao import custo_caminho
+from carregamento import carregar_instancia, como_lista
+from codificacoes import (construir_modelo, escolher_codificacao, extrair_caminho, limitar_objetivo,
+                          limitar_objetivo_inferior, sugerir_caminho)
+from cortes import resolver_com_cortes
+from heuristicas import heuristica
+from limites import limite_inferior as calcular_limite_inferior
+
+# Configurações na ordem de preferência: com menos processos, as primeiras são as usadas.
+# metodo: 'optimize' (Optimize minimizando objective), 'maxsat' (restrições leves), 'anytime' ou 'cortes';
+# codificacao 'simetrica' vira bitvector em matrizes assimétricas (ver codificacoes.escolher_codificacao)
+CONFIGURACOES = {
+    'simetrica': {'metodo': 'optimize', 'codificacao': 'simetrica'},
+    'bitvector': {'metodo': 'optimize', 'codificacao': 'bitvector'},
+    'maxres': {'metodo': 'maxsat', 'codificacao': 'simetrica', 'opcoes': {'maxsat_engine': 'maxres'}},
+    'anytime': {'metodo': 'anytime', 'codificacao': 'simetrica'},
+    'cortes': {'metodo': 'cortes'},
+    'wmax': {'metodo': 'maxsat', 'codificacao': 'simetrica', 'opcoes': {'maxsat_engine': 'wmax'}},
+    'simetrica_semente_1': {'metodo': 'optimize', 'codificacao': 'simetrica', 'semente': 1},
+    'bitvector_semente_1': {'metodo': 'optimize', 'codificacao': 'bitvector', 'semente': 1},
+    'symba': {'metodo': 'optimize', 'codificacao': 'bitvector', 'opcoes': {'optsmt_engine': 'symba'}},
+    'simetrica_semente_2': {'metodo': 'optimize', 'codificacao': 'simetrica', 'semente': 2},
+    'inteira': {'metodo': 'optimize', 'codificacao': 'inteira'},
+}
+
+# Intervalo, em segundos, entre as conferências de processos que terminaram sem responder
+INTERVALO_VERIFICACAO = 0.5
+
+
+# Configurações que ficam idênticas depois da escolha da codificação (por exemplo, simetrica
+# e bitvector em uma matriz assimétrica) rodam uma única vez
+def _configuracoes_efetivas(distance_matrix, nomes):
+    efetivas, vistas = {}, set()
+    for nome in nomes:
+        if nome not in CONFIGURACOES:
+            raise ValueError(f"Configuração desconhecida: {nome!r}. Opções: {', '.join(CONFIGURACOES)}")
+        parametros = dict(CONFIGURACOES[nome])
+        if parametros.get('codificacao') == 'simetrica':
+            parametros['codificacao'] = escolher_codificacao(distance_matrix, 'bitvector')
+        assinatura = repr(sorted(parametros.items()))
+        if assinatura not in vistas:
+            vistas.add(assinatura)
+            efetivas[nome] = parametros
+    return efetivas
+
+
+# Executada em um processo próprio; envia à fila {'configuracao', 'tipo', ...}
+def _executar_configuracao(nome, parametros, distance_matrix, caminho_inicial, limite_inferior, fila):
+    inicio = time.perf_counter()
+
+    def enviar(tipo, **campos):
+        fila.put(dict(campos, configuracao=nome, tipo=tipo, tempo=time.perf_counter() - inicio))
+
+    try:
+        semente = parametros.get('semente', 0)
+        set_param('smt.random_seed', semente)
+        set_param('sat.random_seed', semente)
+        metodo = parametros['metodo']
+        if metodo == 'cortes':
+            resultado = resolver_com_cortes(distance_matrix, caminho_inicial=caminho_inicial,
+                                            limite_inferior=limite_inferior)
+            enviar('fim', caminho=resultado['caminho'], custo=resultado['custo'], otimo=resultado['caminho'] is not None)
+            return
+        if metodo == 'anytime':
+            gerador = melhorias_anytime(distance_matrix, None, parametros['codificacao'], caminho_inicial,
+                                        limite_inferior=limite_inferior)
+            while True:
+                try:
+                    melhoria = next(gerador)
+                except StopIteration as fim:
+                    final = fim.value
+                    break
+                enviar('melhoria', caminho=melhoria['caminho'], custo=melhoria['custo'])
+            enviar('fim', caminho=final['caminho'], custo=final['custo'], otimo=final['otimo'])
+            return
+
+        modelo = construir_modelo(distance_matrix, parametros['codificacao'], maxsat=metodo == 'maxsat')
+        solver = modelo['solver']
+        solver.set('random_seed', semente)
+        for opcao, valor in parametros.get('opcoes', {}).items():
+            solver.set(opcao, valor)
+        if caminho_inicial is not None:
+            limitar_objetivo(modelo, custo_caminho(distance_matrix, caminho_inicial))
+            sugerir_caminho(modelo, caminho_inicial)
+        if limite_inferior is not None:
+            limitar_objetivo_inferior(modelo, limite_inferior)
+
+        def ao_encontrar(model):
+            caminho = extrair_caminho(modelo, model)
+            enviar('melhoria', caminho=caminho, custo=custo_caminho(distance_matrix, caminho))
+
+        solver.set_on_model(ao_encontrar)
+        status = solver.check()
+        if status == sat:
+            caminho = extrair_caminho(modelo, solver.model())
+            enviar('fim', caminho=caminho, custo=custo_caminho(distance_matrix, caminho), otimo=True)
+        elif status == unsat:
+            # unsat com caminho_inicial: nenhum caminho é mais barato que ele, que então é ótimo
+            enviar('fim', caminho=caminho_inicial, otimo=caminho_inicial is not None,
+                   custo=None if caminho_inicial is None else custo_caminho(distance_matrix, caminho_inicial))
+        else:
+            # unknown (timeout, cancelamento ou motor que desistiu): nada foi provado
+            enviar('fim', caminho=None, custo=None, otimo=False)
+    except Exception:
+        enviar('erro', erro=traceback.format_exc())
+
+
+def resolver_portfolio(distance_matrix, prazo=None, configuracoes=None, processos=None, caminho_inicial=None,
+                       ao_melhorar=None, limite_inferior=None):
+    """Resolve a instância com várias configurações ao mesmo tempo e retorna a primeira resposta ótima.
+
+    configuracoes são nomes de CONFIGURACOES; por padrão, as primeiras
+    processos delas (processos: núcleos disponíveis, no mínimo 2). Com prazo
+    (segundos), o melhor caminho recebido até ele é retornado, sem prova de
+    otimalidade. ao_melhorar(melhoria) recebe cada caminho melhor que os
+    anteriores e que caminho_inicial, com a configuração que o encontrou. O
+    resultado traz caminho, custo, tempo, otimo, vencedor (configuração que deu
+    a resposta) e o estado final de cada configuração ('otimo', 'interrompida',
+    'sem_solucao' ou 'erro'). limite_inferior (limites.py), se informado, vai
+    para o objetivo de cada configuração, e o primeiro caminho que o alcança
+    encerra a corrida como ótimo (vencedor é então quem o encontrou).
+    """
+    inicio = time.perf_counter()
+    limite = None if prazo is None else inicio + prazo
+    distance_matrix = como_lista(distance_matrix)
+    efetivas = _configuracoes_efetivas(distance_matrix, list(CONFIGURACOES) if configuracoes is None else configuracoes)
+    if configuracoes is None:
+        processos = max(2, processos or os.cpu_count() or 1)
+        efetivas = dict(list(efetivas.items())[:processos])
+
+    melhor = {'caminho': None, 'custo': None, 'otimo': False, 'vencedor': None}
+    estados = {nome: 'interrompida' for nome in efetivas}
+    erros = {}
+
+    def registrar(mensagem):
+        if mensagem['caminho'] is None or (melhor['custo'] is not None and mensagem['custo'] >= melhor['custo']):
+            return
+        melhor.update(caminho=mensagem['caminho'], custo=mensagem['custo'], vencedor=mensagem['configuracao'])
+        if ao_melhorar is not None:
+            ao_melhorar({'caminho': mensagem['caminho'], 'custo': mensagem['custo'],
+                         'configuracao': mensagem['configuracao'], 'tempo': time.perf_counter() - inicio})
+
+    def alcancou_limite():
+        return limite_inferior is not None and melhor['custo'] is not None and melhor['custo'] <= limite_inferior
+
+    if caminho_inicial is not None:
+        melhor.update(caminho=caminho_inicial, custo=custo_caminho(distance_matrix, caminho_inicial),
+                      vencedor='heuristica')
+    if alcancou_limite():
+        melhor.update(otimo=True, tempo=time.perf_counter() - inicio, configuracoes={}, erros={})
+        return melhor
+
+    fila = multiprocessing.Queue()
+    trabalhadores = {nome: multiprocessing.Process(target=_executar_configuracao, daemon=True,
+                                                   args=(nome, parametros, distance_matrix, caminho_inicial,
+                                                         limite_inferior, fila))
+                     for nome, parametros in efetivas.items()}
+    for processo in trabalhadores.values():
+        processo.start()
+    try:
+        pendentes = set(trabalhadores)
+
+        # Trata uma mensagem de um processo; retorna True quando a corrida termina
+        def processar(mensagem):
+            nome = mensagem['configuracao']
+            if mensagem['tipo'] == 'erro':
+                estados[nome], erros[nome] = 'erro', mensagem['erro']
+                pendentes.discard(nome)
+                return False
+            registrar(mensagem)
+            if alcancou_limite():
+                estados[nome] = 'otimo'
+                melhor['otimo'] = True
+                return True
+            if mensagem['tipo'] == 'fim':
+                pendentes.discard(nome)
+                estados[nome] = 'otimo' if mensagem['otimo'] else 'sem_solucao'
+                if mensagem['otimo']:
+                    melhor.update(otimo=True, vencedor=nome)
+                    return True
+            return False
+
+        while pendentes:
+            restante = None if limite is None else limite - time.perf_counter()
+            if restante is not None and restante <= 0:
+                break
+            try:
+                mensagem = fila.get(timeout=INTERVALO_VERIFICACAO if restante is None else min(restante, INTERVALO_VERIFICACAO))
+            except queue.Empty:
+                terminados = [nome for nome in pendentes if trabalhadores[nome].exitcode is not None]
+                if not terminados:
+                    continue
+                # Um processo pode enviar o resultado e terminar logo antes do tempo de espera acabar: o que ele
+                # deixou na fila é lido antes de decidir que ele terminou sem responder
+                encerrar = False
+                while not encerrar:
+                    try:
+                        encerrar = processar(fila.get_nowait())
+                    except queue.Empty:
+                        break
+                if encerrar:
+                    break
+                # Um processo que terminou sem mandar o resultado (por exemplo, sem memória) não é mais esperado
+                for nome in [nome for nome in terminados if nome in pendentes]:
+                    codigo = trabalhadores[nome].exitcode
+                    estados[nome], erros[nome] = 'erro', (f"processo terminou com código {codigo}" if codigo else
+                                                          "processo terminou sem enviar o resultado")
+                    pendentes.discard(nome)
+                continue
+            if processar(mensagem):
+                break
+    finally:
+        # O Z3 não tem como ser interrompido por fora: os processos que ainda rodam são terminados
+        for processo in trabalhadores.values():
+            if processo.is_alive():
+                processo.terminate()
+        for processo in trabalhadores.values():
+            processo.join()
+        fila.close()
+
+    melhor.update(tempo=time.perf_counter() - inicio, configuracoes=estados, erros=erros)
+    return melhor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolve uma instância com várias configurações do solver ao mesmo tempo.")
+    parser.add_argument('instancia', help="arquivo .tsp/.atsp, .npy ou .json")
+    parser.add_argument('-t', '--prazo', type=float, default=None, help="prazo total, em segundos")
+    parser.add_argument('-p', '--processos', type=int, default=None, help="número de configurações (padrão: núcleos)")
+    parser.add_argument('--configuracoes', nargs='+', default=None, choices=list(CONFIGURACOES))
+    parser.add_argument('--sem-aquecimento', action='store_true', help="não usa a heurística como ponto de partida")
+    args = parser.parse_args()
+
+    matriz = como_lista(carregar_instancia(args.instancia))
+    caminho_inicial = None if args.sem_aquecimento or not matriz else heuristica(matriz)[0]
+    limite = calcular_limite_inferior(matriz)['custo'] if matriz else None
+
+    def mostrar_melhoria(melhoria):
+        print(f"{melhoria['tempo']:8.2f} s  custo {melhoria['custo']}  ({melhoria['configuracao']})", flush=True)
+
+    resultado = resolver_portfolio(matriz, args.prazo, args.configuracoes, args.processos, caminho_inicial,
+                                   mostrar_melhoria, limite)
+    situacao = "ótimo" if resultado['otimo'] else "sem prova de otimalidade"
+    print(f"Custo {resultado['custo']} ({situacao}) por {resultado['vencedor']} em {resultado['tempo']:.2f} segundos")
+    for nome, estado in resultado['configuracoes'].items():
+        print(f"  {nome:<22} {estado}")
+    print(f"Caminho completo: {resultado['caminho']}")
@@ -0,0 +1,491 @@
+"""
+Serviço local de resolução: tsp_solver residente atrás de uma API HTTP.
+
+Cada execução de app_saidaComum.py paga a partida do interpretador, a
+importação do Z3 e a montagem do modelo antes de um único check(). Aqui um
+processo servidor fica no ar com um pool de processos de trabalho que já
+importaram o Z3 e resolveram uma instância mínima (o que inicializa o
+contexto do Z3), de modo que cada pedido paga só a resolução. Os esqueletos
+(reutilizar=True, ver esqueleto.py) e o cache de resultados também ficam
+quentes de um pedido para o outro.
+
+A frente é assíncrona (asyncio, HTTP/1.1 com conexões persistentes, em TCP ou
+em um socket Unix) e só enfileira: os pedidos entram em uma fila limitada e,
+quando ela está cheia, são recusados na hora com 503 e Retry-After
+(contrapressão) em vez de se acumularem na memória. Cada processo de trabalho
+atende um pedido por vez. Como o Z3 não pode ser interrompido por fora (ver
+portfolio.py), um pedido cancelado ou com o prazo total esgotado durante a
+resolução tem seu processo terminado, com os filhos que ele tenha criado, e
+substituído por um novo.
+
+Rotas (corpo e respostas em JSON):
+    POST   /resolver        resolve e responde com o resultado de tsp_solver
+    POST   /tarefas         enfileira e responde 202 com o id da tarefa
+    GET    /tarefas/<id>    estado da tarefa e, quando concluída, o resultado
+    DELETE /tarefas/<id>    cancela a tarefa, na fila ou em execução
+    GET    /saude           processos, ocupação e tamanho da fila
+
+O corpo dos POST traz a matriz e os parâmetros de tsp_solver aceitos em
+PARAMETROS, por exemplo {"matriz": [[0, 2], [2, 0]], "modo": "mtz", "prazo": 5}.
+prazo_total (segundos, contados desde a chegada do pedido, fila incluída)
+limita a espera: esgotado, a resposta é 504. Em /resolver, fechar a conexão
+antes da resposta também cancela o pedido.
+
+Uso pela linha de comando:
+    python servico.py --porta 8765 --processos 4
+    python servico.py --socket /tmp/tsp.sock --cache resultados.sqlite
+    curl -X POST localhost:8765/resolver -d '{"matriz": [[0, 2, 9], [1, 0, 6], [15, 7, 0]]}'
+"""
+
+import argparse
+import asyncio
+import http.client
+import itertools
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import time
+import traceback
+from collections import OrderedDict
+
+from app_saidaComum import tsp_solver
+from cache import abrir_cache
+
+HOST_PADRAO = '127.0.0.1'
+PORTA_PADRAO = 8765
+TAMANHO_FILA = 64
+# Tarefas concluídas de /tarefas guardadas para consulta; as mais antigas são descartadas
+RETENCAO = 1000
+TAMANHO_MAXIMO_CORPO = 64 * 2**20
+# Parâmetros de tsp_solver aceitos nos pedidos; destinos e cache são do serviço
+PARAMETROS = ('codificacao', 'modo', 'aquecimento', 'prazo', 'reutilizar', 'simetria', 'tamanho_cluster',
+              'processos', 'configuracoes', 'vizinhos', 'limites')
+
+# Código HTTP de cada estado final de uma tarefa
+_CODIGOS = {'concluida': 200, 'invalida': 400, 'cancelada': 409, 'erro': 500, 'prazo_esgotado': 504}
+_FRASES = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           409: 'Conflict', 413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable',
+           504: 'Gateway Timeout'}
+
+
+# Executada em cada processo de trabalho: recebe (matriz, parametros) e responde com o resultado
+def _trabalhador(conexao, arquivo_cache):
+    # Grupo de processos próprio, para que o cancelamento termine também os processos filhos
+    # (modos portfolio e decomposicao)
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+    cache = abrir_cache(arquivo_cache) if arquivo_cache else None
+    tsp_solver([[0, 1, 1], [1, 0, 1], [1, 1, 0]], destinos=[], aquecimento=False, limites=False)
+    while True:
+        try:
+            matriz, parametros = conexao.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            resposta = {'estado': 'concluida', 'resultado': tsp_solver(matriz, destinos=[], cache=cache, **parametros)}
+        except (ValueError, TypeError) as erro:
+            resposta = {'estado': 'invalida', 'erro': str(erro)}
+        except Exception:
+            resposta = {'estado': 'erro', 'erro': traceback.format_exc()}
+        conexao.send(resposta)
+
+
+def _iniciar_trabalhador(servico):
+    conexao, conexao_filho = servico['contexto'].Pipe()
+    processo = servico['contexto'].Process(target=_trabalhador, args=(conexao_filho, servico['arquivo_cache']))
+    processo.start()
+    conexao_filho.close()
+    return {'processo': processo, 'conexao': conexao, 'tarefa': None}
+
+
+def _terminar_trabalhador(trabalhador):
+    processo = trabalhador['processo']
+    if hasattr(os, 'killpg'):
+        try:
+            os.killpg(processo.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass  # processo recém-iniciado, que ainda não criou o próprio grupo
+    processo.kill()
+    processo.join()
+    trabalhador['conexao'].close()
+
+
+def _concluir(servico, tarefa, estado, resultado=None, erro=None):
+    if tarefa['expiracao'] is not None:
+        tarefa['expiracao'].cancel()
+    tarefa.update(estado=estado, resultado=resultado, erro=erro, concluida=time.time())
+    if not tarefa['futuro'].done():
+        tarefa['futuro'].set_result(tarefa)
+    servico['estatisticas'][estado] = servico['estatisticas'].get(estado, 0) + 1
+    concluidas = servico['concluidas']
+    if tarefa['id'] in servico['tarefas']:
+        concluidas[tarefa['id']] = tarefa
+        while len(concluidas) > RETENCAO:
+            antiga, _ = concluidas.popitem(last=False)
+            servico['tarefas'].pop(antiga, None)
+
+
+# Tira da fila as tarefas que deixaram de esperar (canceladas ou com o prazo esgotado), liberando os lugares
+def _retirar_da_fila(servico):
+    fila = servico['fila']
+    tarefas = [fila.get_nowait() for _ in range(fila.qsize())]
+    for tarefa in tarefas:
+        if tarefa['estado'] == 'na_fila':
+            fila.put_nowait(tarefa)
+
+
+# Chamada pelo laço de eventos quando o prazo total de uma tarefa acaba; só age se ela ainda está na fila
+def _expirar_na_fila(servico, tarefa):
+    if tarefa['estado'] == 'na_fila':
+        _concluir(servico, tarefa, 'prazo_esgotado', erro="prazo total esgotado na fila")
+        _retirar_da_fila(servico)
+
+
+def _receber(conexao, resposta):
+    if resposta.done():
+        return
+    try:
+        resposta.set_result(conexao.recv())
+    except (EOFError, OSError) as erro:
+        resposta.set_exception(erro)
+
+
+# Laço de um processo de trabalho: tira tarefas da fila e as executa até o fim, o cancelamento ou o prazo
+async def _atender(servico, indice):
+    loop = asyncio.get_running_loop()
+    while True:
+        tarefa = await servico['fila'].get()
+        if tarefa['estado'] != 'na_fila':  # cancelada enquanto esperava
+            continue
+        restante = None if tarefa['limite'] is None else tarefa['limite'] - loop.time()
+        if restante is not None and restante <= 0:
+            _concluir(servico, tarefa, 'prazo_esgotado', erro="prazo total esgotado na fila")
+            continue
+
+        trabalhador = servico['trabalhadores'][indice]
+        trabalhador['tarefa'] = tarefa
+        if tarefa['expiracao'] is not None:
+            tarefa['expiracao'].cancel()  # daqui em diante o prazo é controlado pela espera abaixo
+        tarefa.update(estado='executando', iniciada=time.time())
+        resposta = loop.create_future()
+        descritor = trabalhador['conexao'].fileno()
+        loop.add_reader(descritor, _receber, trabalhador['conexao'], resposta)
+        try:
+            trabalhador['conexao'].send((tarefa['matriz'], tarefa['parametros']))
+            feitas, _ = await asyncio.wait({resposta, tarefa['interromper']}, timeout=restante,
+                                           return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            loop.remove_reader(descritor)
+            trabalhador['tarefa'] = None
+
+        if resposta in feitas and resposta.exception() is None:
+            mensagem = resposta.result()
+            _concluir(servico, tarefa, mensagem['estado'], mensagem.get('resultado'), mensagem.get('erro'))
+            continue
+        # Cancelada, prazo esgotado ou processo que morreu: o processo é substituído por um novo
+        if tarefa['interromper'] in feitas:
+            estado, erro = 'cancelada', None
+        elif not feitas:
+            estado, erro = 'prazo_esgotado', "prazo total esgotado durante a resolução"
+        else:
+            estado, erro = 'erro', f"processo de trabalho terminou: {resposta.exception()!r}"
+        _terminar_trabalhador(trabalhador)
+        servico['trabalhadores'][indice] = _iniciar_trabalhador(servico)
+        _concluir(servico, tarefa, estado, erro=erro)
+
+
+async def iniciar_servico(processos=None, tamanho_fila=TAMANHO_FILA, arquivo_cache=None, prazo_maximo=None):
+    """Inicia os processos de trabalho e retorna o serviço (um dicionário) usado pelas demais funções.
+
+    processos: número de processos de trabalho (padrão: núcleos). Com
+    arquivo_cache, eles compartilham o cache de resultados ótimos (cache.py).
+    prazo_maximo (segundos) limita o prazo total de qualquer pedido.
+    """
+    processos = processos or os.cpu_count() or 1
+    # spawn: os processos não herdam o laço de eventos nem os sockets do servidor
+    servico = {'contexto': multiprocessing.get_context('spawn'), 'arquivo_cache': arquivo_cache,
+               'fila': asyncio.Queue(maxsize=tamanho_fila), 'tamanho_fila': tamanho_fila,
+               'prazo_maximo': prazo_maximo, 'tarefas': {}, 'concluidas': OrderedDict(),
+               'ids': itertools.count(1), 'estatisticas': {}, 'inicio': time.time()}
+    servico['trabalhadores'] = [_iniciar_trabalhador(servico) for _ in range(processos)]
+    servico['lacos'] = [asyncio.create_task(_atender(servico, indice)) for indice in range(processos)]
+    return servico
+
+
+async def encerrar_servico(servico):
+    """Cancela as tarefas pendentes e termina os processos de trabalho."""
+    for laco in servico['lacos']:
+        laco.cancel()
+    await asyncio.gather(*servico['lacos'], return_exceptions=True)
+    for tarefa in list(servico['tarefas'].values()):
+        if tarefa['estado'] in ('na_fila', 'executando'):
+            _concluir(servico, tarefa, 'cancelada')
+    for trabalhador in servico['trabalhadores']:
+        _terminar_trabalhador(trabalhador)
+
+
+def enviar_tarefa(servico, pedido, guardar=True):
+    """Valida o pedido e o coloca na fila; retorna a tarefa.
+
+    Levanta ValueError se o pedido for inválido e asyncio.QueueFull se a fila
+    estiver cheia. Com guardar, a tarefa fica disponível para consulta por
+    id, também depois de concluída.
+    """
+    if not isinstance(pedido, dict) or 'matriz' not in pedido:
+        raise ValueError("O pedido deve ser um objeto JSON com a chave 'matriz'")
+    matriz = pedido['matriz']
+    if not isinstance(matriz, list) or any(not isinstance(linha, list) or len(linha) != len(matriz)
+                                           for linha in matriz):
+        raise ValueError("'matriz' deve ser uma lista de linhas com o mesmo número de colunas que de linhas")
+    desconhecidos = set(pedido) - set(PARAMETROS) - {'matriz', 'prazo_total'}
+    if desconhecidos:
+        raise ValueError(f"Parâmetros desconhecidos: {', '.join(sorted(desconhecidos))}. "
+                         f"Aceitos: {', '.join(PARAMETROS)}, prazo_total")
+    if not isinstance(pedido.get('prazo_total', 0), (int, float)):
+        raise ValueError("'prazo_total' deve ser um número de segundos")
+    prazos = [p for p in (pedido.get('prazo_total'), servico['prazo_maximo']) if p is not None]
+    loop = asyncio.get_running_loop()
+    tarefa = {'id': str(next(servico['ids'])), 'estado': 'na_fila', 'n': len(matriz), 'matriz': matriz,
+              'parametros': {chave: pedido[chave] for chave in PARAMETROS if chave in pedido},
+              'limite': loop.time() + min(prazos) if prazos else None, 'futuro': loop.create_future(),
+              'interromper': loop.create_future(), 'expiracao': None, 'resultado': None, 'erro': None,
+              'criada': time.time()}
+    servico['fila'].put_nowait(tarefa)
+    if tarefa['limite'] is not None:
+        # Responde 504 no prazo mesmo que nenhum processo fique livre para tirar a tarefa da fila
+        tarefa['expiracao'] = loop.call_at(tarefa['limite'], _expirar_na_fila, servico, tarefa)
+    if guardar:
+        servico['tarefas'][tarefa['id']] = tarefa
+    return tarefa
+
+
+def cancelar_tarefa(servico, tarefa):
+    """Cancela a tarefa: na fila, ela é descartada; em execução, o processo que a resolve é terminado."""
+    if tarefa['estado'] == 'na_fila':
+        _concluir(servico, tarefa, 'cancelada')
+        _retirar_da_fila(servico)
+    elif tarefa['estado'] == 'executando' and not tarefa['interromper'].done():
+        tarefa['interromper'].set_result(True)
+
+
+def descrever_tarefa(tarefa):
+    descricao = {chave: tarefa[chave] for chave in ('id', 'estado', 'n', 'criada')}
+    if tarefa['resultado'] is not None:
+        descricao['resultado'] = tarefa['resultado']
+    if tarefa['erro'] is not None:
+        descricao['erro'] = tarefa['erro']
+    return descricao
+
+
+def saude(servico):
+    return {'processos': len(servico['trabalhadores']),
+            'ocupados': sum(t['tarefa'] is not None for t in servico['trabalhadores']),
+            'na_fila': servico['fila'].qsize(), 'capacidade_fila': servico['tamanho_fila'],
+            'tarefas_guardadas': len(servico['tarefas']), 'estatisticas': dict(servico['estatisticas']),
+            'no_ar': time.time() - servico['inicio']}
+
+
+# --- HTTP ---
+
+def _json_padrao(valor):
+    if hasattr(valor, 'tolist'):  # números e vetores do NumPy
+        return valor.tolist()
+    raise TypeError(f"{type(valor).__name__} não é serializável em JSON")
+
+
+async def _responder(escritor, codigo, corpo, cabecalhos=()):
+    dados = json.dumps(corpo, ensure_ascii=False, default=_json_padrao).encode()
+    linhas = [f"HTTP/1.1 {codigo} {_FRASES[codigo]}", "Content-Type: application/json; charset=utf-8",
+              f"Content-Length: {len(dados)}", *cabecalhos]
+    escritor.write(("\r\n".join(linhas) + "\r\n\r\n").encode() + dados)
+    await escritor.drain()
+
+
+# Lê um pedido HTTP; retorna None quando o cliente fecha a conexão
+async def _ler_pedido(leitor, sobra):
+    linha = await leitor.readline()
+    if sobra:
+        linha = sobra + linha
+    if not linha.strip():
+        return None
+    metodo, alvo, _ = linha.decode('latin-1').split(' ', 2)
+    cabecalhos = {}
+    while True:
+        linha = await leitor.readline()
+        if linha in (b'\r\n', b'\n', b''):
+            break
+        nome, _, valor = linha.decode('latin-1').partition(':')
+        cabecalhos[nome.strip().lower()] = valor.strip()
+    tamanho = int(cabecalhos.get('content-length', 0))
+    if tamanho > TAMANHO_MAXIMO_CORPO:
+        return {'metodo': metodo, 'caminho': alvo.split('?')[0], 'cabecalhos': cabecalhos, 'corpo': None,
+                'grande_demais': True}
+    corpo = await leitor.readexactly(tamanho) if tamanho else b''
+    return {'metodo': metodo, 'caminho': alvo.split('?')[0], 'cabecalhos': cabecalhos, 'corpo': corpo,
+            'grande_demais': False}
+
+
+# Espera a tarefa de /resolver; se o cliente fechar a conexão antes, a tarefa é cancelada.
+# Retorna o byte lido de um pedido seguinte enviado antes da resposta (ou b'')
+async def _esperar_com_cliente(servico, tarefa, leitor):
+    leitura = asyncio.ensure_future(leitor.read(1))
+    try:
+        await asyncio.wait({tarefa['futuro'], leitura}, return_when=asyncio.FIRST_COMPLETED)
+        if leitura.done() and not tarefa['futuro'].done():
+            if leitura.result() == b'':
+                cancelar_tarefa(servico, tarefa)
+                await tarefa['futuro']
+                return None
+            await tarefa['futuro']
+    finally:
+        if not leitura.done():
+            # O leitor só aceita uma espera por vez: o próximo pedido só é lido depois do cancelamento
+            leitura.cancel()
+            await asyncio.gather(leitura, return_exceptions=True)
+    return b'' if leitura.cancelled() else leitura.result()
+
+
+async def _rotear(servico, pedido, leitor):
+    metodo, caminho = pedido['metodo'], pedido['caminho'].rstrip('/')
+    partes = caminho.strip('/').split('/')
+    if caminho == '/saude':
+        if metodo != 'GET':
+            return 405, {'erro': "use GET"}, (), b''
+        return 200, saude(servico), (), b''
+    if caminho in ('/resolver', '/tarefas'):
+        if metodo != 'POST':
+            return 405, {'erro': "use POST"}, (), b''
+        if pedido['grande_demais']:
+            return 413, {'erro': f"corpo maior que {TAMANHO_MAXIMO_CORPO} bytes"}, ('Connection: close',), None
+        try:
+            tarefa = enviar_tarefa(servico, json.loads(pedido['corpo'] or b'null'), guardar=caminho == '/tarefas')
+        except (ValueError, UnicodeDecodeError) as erro:
+            return 400, {'erro': str(erro)}, (), b''
+        except asyncio.QueueFull:
+            return 503, {'erro': "fila cheia", 'capacidade_fila': servico['tamanho_fila']}, ('Retry-After: 1',), b''
+        if caminho == '/tarefas':
+            return 202, descrever_tarefa(tarefa), (f"Location: /tarefas/{tarefa['id']}",), b''
+        sobra = await _esperar_com_cliente(servico, tarefa, leitor)
+        return _CODIGOS[tarefa['estado']], descrever_tarefa(tarefa), (), sobra
+    if len(partes) == 2 and partes[0] == 'tarefas':
+        tarefa = servico['tarefas'].get(partes[1])
+        if tarefa is None:
+            return 404, {'erro': f"tarefa {partes[1]} não encontrada"}, (), b''
+        if metodo == 'GET':
+            return 200, descrever_tarefa(tarefa), (), b''
+        if metodo == 'DELETE':
+            cancelar_tarefa(servico, tarefa)
+            if tarefa['estado'] == 'executando':
+                await tarefa['futuro']
+            return 200, descrever_tarefa(tarefa), (), b''
+        return 405, {'erro': "use GET ou DELETE"}, (), b''
+    return 404, {'erro': f"rota {caminho} não encontrada"}, (), b''
+
+
+def _atender_conexao(servico):
+    async def atender(leitor, escritor):
+        sobra = b''
+        try:
+            while True:
+                try:
+                    pedido = await _ler_pedido(leitor, sobra)
+                except (asyncio.IncompleteReadError, ValueError):
+                    await _responder(escritor, 400, {'erro': "pedido HTTP malformado"}, ('Connection: close',))
+                    break
+                if pedido is None:
+                    break
+                codigo, corpo, cabecalhos, sobra = await _rotear(servico, pedido, leitor)
+                if sobra is None:  # cliente foi embora ou a conexão não pode ser reaproveitada
+                    if codigo == 413:
+                        await _responder(escritor, codigo, corpo, cabecalhos)
+                    break
+                fechar = pedido['cabecalhos'].get('connection', '').lower() == 'close'
+                await _responder(escritor, codigo, corpo, cabecalhos + (('Connection: close',) if fechar else ()))
+                if fechar:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            escritor.close()
+    return atender
+
+
+async def servir(servico, host=HOST_PADRAO, porta=PORTA_PADRAO, caminho_socket=None):
+    """Abre o servidor HTTP (TCP em host:porta ou, com caminho_socket, em um socket Unix) e o retorna."""
+    if caminho_socket is not None:
+        if os.path.exists(caminho_socket):
+            os.unlink(caminho_socket)
+        return await asyncio.start_unix_server(_atender_conexao(servico), path=caminho_socket)
+    return await asyncio.start_server(_atender_conexao(servico), host, porta)
+
+
+# --- Cliente ---
+
+class _ConexaoUnix(http.client.HTTPConnection):
+    def __init__(self, caminho_socket, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self.caminho_socket = caminho_socket
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.caminho_socket)
+
+
+def conectar(host=HOST_PADRAO, porta=PORTA_PADRAO, caminho_socket=None, timeout=None):
+    """Conexão HTTP (http.client) com o serviço, reaproveitável entre pedidos."""
+    if caminho_socket is not None:
+        return _ConexaoUnix(caminho_socket, timeout)
+    return http.client.HTTPConnection(host, porta, timeout=timeout)
+
+
+def consultar(conexao, metodo, rota, corpo=None):
+    """Envia um pedido pela conexão e retorna (código HTTP, resposta decodificada)."""
+    dados = None if corpo is None else json.dumps(corpo, default=_json_padrao).encode()
+    conexao.request(metodo, rota, body=dados, headers={'Content-Type': 'application/json'})
+    resposta = conexao.getresponse()
+    return resposta.status, json.loads(resposta.read() or b'null')
+
+
+def resolver_remoto(matriz, conexao=None, **parametros):
+    """Resolve a matriz no serviço e retorna o resultado de tsp_solver; levanta RuntimeError se falhar."""
+    conexao = conectar() if conexao is None else conexao
+    codigo, resposta = consultar(conexao, 'POST', '/resolver', dict(parametros, matriz=matriz))
+    if codigo != 200:
+        raise RuntimeError(f"serviço respondeu {codigo}: {resposta.get('erro', resposta.get('estado'))}")
+    return resposta['resultado']
+
+
+async def _principal(args):
+    servico = await iniciar_servico(args.processos, args.fila, args.cache, args.prazo_maximo)
+    servidor = await servir(servico, args.host, args.porta, args.socket)
+    parar = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sinal in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sinal, parar.set)
+    endereco = args.socket or f"http://{args.host}:{args.porta}"
+    print(f"Servindo em {endereco} com {len(servico['trabalhadores'])} processos e fila de {args.fila}", flush=True)
+    try:
+        await parar.wait()
+    finally:
+        servidor.close()
+        await servidor.wait_closed()
+        await encerrar_servico(servico)
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serviço local que resolve instâncias do TSP por HTTP.")
+    parser.add_argument('--host', default=HOST_PADRAO)
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    parser.add_argument('--socket', default=None, help="caminho de um socket Unix, no lugar de host e porta")
+    parser.add_argument('-p', '--processos', type=int, default=None, help="processos de trabalho (padrão: núcleos)")
+    parser.add_argument('--fila', type=int, default=TAMANHO_FILA, help="pedidos em espera antes de recusar com 503")
+    parser.add_argument('--prazo-maximo', type=float, default=None,
+                        help="prazo total máximo de um pedido, em segundos, fila incluída")
+    parser.add_argument('--cache', default=None, metavar='ARQUIVO',
+                        help="cache SQLite de resultados ótimos compartilhado entre os processos")
+    asyncio.run(_principal(parser.parse_args()))
@@ -0,0 +1,200 @@
+"""
+Sessão de reotimização: o mesmo modelo do Z3 resolvido de novo quando distâncias mudam.
+
+Em uso, os custos de viagem mudam (trânsito, interdições) enquanto as cidades
+continuam as mesmas. Em vez de montar o modelo do zero a cada mudança, a
+sessão guarda o solver, com as restrições estruturais e o objetivo sobre as
+distâncias da última montagem (a base), e o último caminho. Cada reotimização
+abre um escopo push/pop em que o objetivo é a base mais um termo
+If(x[i][j], d[i][j] - base[i][j], 0) para cada aresta cuja distância mudou;
+só esses termos são refeitos, e os coeficientes continuam constantes, como o
+Z3 resolve melhor.
+
+A reotimização parte do caminho anterior, sugerido ao solver e com o custo
+recalculado como limite superior, e segue com o laço da resolução anytime
+(anytime.buscar_melhorias) até provar que nenhum caminho é mais barato. Antes de verificar
+qualquer coisa, dois atalhos:
+
+- se o caminho anterior era ótimo e as mudanças só encarecem arestas fora dele
+  ou barateiam arestas dele, ele continua ótimo (todo outro caminho varia ao
+  menos tanto quanto ele);
+- um caminho que alcança o limite inferior (limites.py) é ótimo.
+
+Quando mais de FRACAO_RECONSTRUCAO das arestas difere da base, o modelo é
+remontado com as distâncias atuais.
+"""
+
+import time
+
+from z3 import *
+
+from anytime import buscar_melhorias, consumir_melhorias
+from avaliacao import custo_caminho
+from carregamento import como_lista
+from codificacoes import (construir_estrutura, definir_objetivo, escolher_codificacao, extrair_caminho,
+                          matriz_simetrica, sugerir_caminho)
+from eventos import estatisticas_z3, sem_marcacao
+from heuristicas import heuristica
+from limites import gap, limite_inferior
+
+# Fração das arestas com distância diferente da base a partir da qual o modelo é remontado
+FRACAO_RECONSTRUCAO = 0.25
+
+
+# Termos do objetivo: um por par i < j na codificação simétrica, um por par ordenado nas demais
+def _numero_de_arestas(sessao):
+    n = len(sessao['distancias'])
+    return n * (n - 1) // (2 if sessao['simetrica'] else 1)
+
+
+def _chave(sessao, i, j):
+    return (min(i, j), max(i, j)) if sessao['simetrica'] else (i, j)
+
+
+def _montar(sessao, marcar=sem_marcacao):
+    base = [list(linha) for linha in sessao['distancias']]
+    modelo = construir_estrutura(len(base), sessao['codificacao'], solver=Solver(), marcar=marcar)
+    definir_objetivo(modelo, base, marcar)
+    sessao.update(modelo=modelo, base=base, diferentes=set())
+
+
+# Objetivo com as distâncias atuais: a base mais os termos das arestas que mudaram desde a montagem
+def _objetivo(sessao):
+    x, d, base = sessao['modelo']['x'], sessao['distancias'], sessao['base']
+    termos = [If(x[i][j], d[i][j] - base[i][j], 0) for i, j in sorted(sessao['diferentes'])]
+    return sessao['modelo']['objective'] + Sum(termos) if termos else sessao['modelo']['objective']
+
+
+def abrir_sessao(distance_matrix, codificacao='bitvector', simetria=True, prazo=None, ao_melhorar=None,
+                 limites=True, marcar=sem_marcacao):
+    """Monta o modelo, resolve a instância e retorna a sessão (um dicionário).
+
+    codificacao 'booleana' ou 'bitvector' (com simetria, trocada pela
+    'simetrica' quando a matriz é simétrica; então as atualizações também
+    precisam manter a matriz simétrica). limites: usa o limite inferior de
+    limites.py para encerrar cada reotimização mais cedo. O resultado da
+    primeira resolução fica em sessao['resultado'] (ver reotimizar).
+    """
+    distancias = [list(linha) for linha in como_lista(distance_matrix)]
+    if simetria:
+        codificacao = escolher_codificacao(distancias, codificacao)
+    if codificacao not in ('booleana', 'bitvector', 'simetrica'):
+        raise ValueError(f"A sessão usa as codificações booleana, bitvector ou simetrica, não {codificacao!r}")
+    sessao = {'distancias': distancias, 'codificacao': codificacao, 'simetrica': codificacao == 'simetrica',
+              'limites': limites, 'caminho': None, 'otimo': False, 'alteradas': {}, 'reconstrucoes': 0}
+    _montar(sessao, marcar)
+    if distancias:
+        sessao['caminho'] = heuristica(distancias)[0]
+        marcar('heuristica')
+    sessao['resultado'] = reotimizar(sessao, prazo, ao_melhorar, marcar)
+    return sessao
+
+
+def atualizar_distancias(sessao, alteracoes):
+    """Troca distâncias da sessão; alteracoes é um dicionário {(i, j): valor} ou uma sequência de (i, j, valor).
+
+    Nada é resolvido até reotimizar, que refaz só os termos do objetivo das
+    arestas alteradas. Levanta ValueError (sem alterar nada) para índices inválidos
+    ou, na codificação simétrica, se a matriz deixar de ser simétrica.
+    Retorna o número de distâncias que de fato mudaram.
+    """
+    if isinstance(alteracoes, dict):
+        alteracoes = [(i, j, valor) for (i, j), valor in alteracoes.items()]
+    n = len(sessao['distancias'])
+    novas = [list(linha) for linha in sessao['distancias']]
+    for i, j, valor in alteracoes:
+        if not (0 <= i < n and 0 <= j < n) or i == j:
+            raise ValueError(f"Aresta inválida ({i}, {j}) para {n} cidades")
+        novas[i][j] = valor
+    if sessao['simetrica'] and not matriz_simetrica(novas):
+        raise ValueError("A sessão usa a codificação simétrica: altere d[i][j] e d[j][i] juntos "
+                         "ou abra a sessão com simetria=False")
+
+    anteriores = sessao['distancias']
+    sessao['distancias'] = novas
+    mudaram = 0
+    for aresta in dict.fromkeys(_chave(sessao, i, j) for i, j, _ in alteracoes):
+        i, j = aresta
+        if novas[i][j] == anteriores[i][j]:
+            continue
+        # A variação é medida desde a última reotimização, para o atalho de _continua_otimo
+        sessao['alteradas'].setdefault(aresta, anteriores[i][j])
+        if novas[i][j] == sessao['base'][i][j]:
+            sessao['diferentes'].discard(aresta)
+        else:
+            sessao['diferentes'].add(aresta)
+        mudaram += 1
+    return mudaram
+
+
+# O caminho ótimo continua ótimo se as mudanças só encarecem arestas fora dele e barateiam arestas dele
+def _continua_otimo(sessao):
+    if not sessao['otimo']:
+        return False
+    caminho = sessao['caminho']
+    arestas = {_chave(sessao, i, j) for i, j in zip(caminho, caminho[1:])}
+    for aresta, anterior in sessao['alteradas'].items():
+        atual = sessao['distancias'][aresta[0]][aresta[1]]
+        if (atual > anterior) == (aresta in arestas) and atual != anterior:
+            return False
+    return True
+
+
+def reotimizar(sessao, prazo=None, ao_melhorar=None, marcar=sem_marcacao):
+    """Resolve de novo com as distâncias atuais, partindo do último caminho, e retorna o resultado.
+
+    Com prazo (segundos), o melhor caminho encontrado até ele é retornado com
+    otimo False. ao_melhorar(melhoria) recebe cada caminho melhor que o
+    anterior. O resultado traz caminho, custo, otimo, tempo, alteradas (arestas
+    mudadas desde a reotimização anterior), atalho ('caminho_anterior',
+    'limite_inferior' ou None, quando o solver foi usado), verificacoes,
+    limite_inferior, gap e estatisticas_z3; também fica em sessao['resultado'].
+    """
+    inicio = time.perf_counter()
+    limite_prazo = None if prazo is None else inicio + prazo
+    d = sessao['distancias']
+    alteradas = len(sessao['alteradas'])
+    if len(sessao['diferentes']) > FRACAO_RECONSTRUCAO * _numero_de_arestas(sessao):
+        _montar(sessao, marcar)
+        sessao['reconstrucoes'] += 1
+
+    modelo = sessao['modelo']
+    solver = modelo['solver']
+    melhor = {'caminho': sessao['caminho'], 'custo': None if sessao['caminho'] is None else custo_caminho(d, sessao['caminho'])}
+    limite = None
+    atalho = None
+    verificacoes = 0
+    otimo = False
+    if _continua_otimo(sessao):
+        atalho, otimo = 'caminho_anterior', True
+    elif sessao['limites'] and melhor['custo'] is not None and len(d) > 1:
+        limite = limite_inferior(d, melhor['custo'])['custo']
+        marcar('limite')
+        if melhor['custo'] <= limite:
+            atalho, otimo = 'limite_inferior', True
+
+    if not otimo:
+        solver.push()
+        objective = _objetivo(sessao)
+        if limite is not None:
+            solver.add(objective >= limite)
+        if melhor['caminho'] is not None:
+            sugerir_caminho(modelo, melhor['caminho'])
+        fim, verificacoes = consumir_melhorias(
+            buscar_melhorias(solver, objective, lambda model: extrair_caminho(modelo, model), d, melhor, inicio,
+                             limite_prazo, limite, marcar), ao_melhorar)
+        otimo = fim == 'limite' or (fim == 'unsat' and melhor['caminho'] is not None)
+        solver.pop()
+        if limite_prazo is not None:
+            solver.set('timeout', 4294967295)  # sem prazo nas próximas reotimizações
+
+    sessao.update(caminho=melhor['caminho'], otimo=otimo, alteradas={})
+    if otimo:
+        limite = melhor['custo']
+    resultado = {'caminho': melhor['caminho'], 'custo': melhor['custo'], 'otimo': otimo,
+                 'tempo': time.perf_counter() - inicio, 'alteradas': alteradas, 'atalho': atalho,
+                 'verificacoes': verificacoes, 'limite_inferior': limite,
+                 'gap': None if limite is None or melhor['custo'] is None else gap(melhor['custo'], limite),
+                 'estatisticas_z3': estatisticas_z3(solver) if verificacoes else {}}
+    sessao['resultado'] = resultado
+    return resultado
@@ -0,0 +1,40 @@
+"""
+Regressões de app_saidaComum.tsp_solver: instâncias com nenhuma ou uma cidade
+e parâmetros inválidos.
+
+Cada modo tratava n <= 1 de um jeito: o padrão devolvia [0, 0] ótimo, sem
+aquecimento nem limites não havia caminho, o modo esparso o dava como não
+ótimo e a matriz vazia fazia o aquecimento levantar IndexError. Um modo
+inválido só era recusado depois da consulta ao cache, que podia responder antes.
+"""
+
+import numpy as np
+import pytest
+
+from app_saidaComum import tsp_solver
+from cache import abrir_cache
+
+MODOS = [{}, {'aquecimento': False, 'limites': False}, {'modo': 'cortes'}, {'modo': 'esparso'},
+         {'modo': 'portfolio'}, {'modo': 'decomposicao'}, {'prazo': 1}, {'reutilizar': True}]
+
+
+@pytest.mark.parametrize('parametros', MODOS)
+@pytest.mark.parametrize('matriz, caminho, custo', [([], [], 0), ([[0]], [0, 0], 0), (np.array([[5]]), [0, 0], 5)])
+def test_nenhuma_ou_uma_cidade(parametros, matriz, caminho, custo):
+    resultado = tsp_solver(matriz, destinos=[], **parametros)
+    assert resultado['caminho'] == caminho
+    assert resultado['custo'] == custo
+    assert resultado['otimo']
+    assert resultado['gap'] == 0.0
+
+
+@pytest.mark.parametrize('parametros', [{'modo': 'desconhecido'}, {'codificacao': 'desconhecida'},
+                                        {'modo': 'esparso', 'codificacao': 'desconhecida'},
+                                        {'modo': 'cortes', 'prazo': 5}, {'modo': 'esparso', 'reutilizar': True},
+                                        {'prazo': 5, 'reutilizar': True}])
+def test_parametros_invalidos_sao_recusados_antes_do_cache(tmp_path, parametros):
+    matriz = [[0, 2, 9, 10], [1, 0, 6, 4], [15, 7, 0, 8], [6, 3, 12, 0]]
+    cache = abrir_cache(str(tmp_path / 'cache.sqlite'))
+    assert tsp_solver(matriz, destinos=[], cache=cache)['otimo']
+    with pytest.raises(ValueError):
+        tsp_solver(matriz, destinos=[], cache=cache, **parametros)
@@ -0,0 +1,33 @@
+"""
+Regressões de avaliacao.py e da heurística em matrizes vazias ou de uma cidade.
+
+np.asarray([]) tem uma única dimensão, e custos_caminhos levantava
+IndexError ao ler d.shape[1]; tsp_solver([]) caía nesse erro.
+"""
+
+import numpy as np
+import pytest
+
+from avaliacao import custo_caminho, custos_caminhos, parcelas_caminho
+from heuristicas import heuristica
+
+
+@pytest.mark.parametrize('matriz', [[], np.zeros((0, 0)), np.array([])])
+def test_matriz_vazia(matriz):
+    assert custo_caminho(matriz, []) == 0
+    assert custos_caminhos(matriz, np.zeros((3, 0), dtype=int)).tolist() == [0, 0, 0]
+    assert heuristica(matriz) == ([], 0)
+
+
+def test_uma_cidade():
+    assert heuristica([[0]]) == ([0, 0], 0)
+    assert custo_caminho([[7]], [0, 0]) == 7
+
+
+def test_custos_vetorizados_iguais_aos_da_soma_em_python():
+    rng = np.random.default_rng(0)
+    d = rng.integers(0, 1000, (30, 30))
+    caminhos = [[0, *rng.permutation(np.arange(1, 30)).tolist(), 0] for _ in range(50)]
+    esperados = [sum(int(d[a, b]) for a, b in zip(c, c[1:])) for c in caminhos]
+    assert custos_caminhos(d, caminhos).tolist() == esperados
+    assert parcelas_caminho(d, caminhos[0]) == [int(d[a, b]) for a, b in zip(caminhos[0], caminhos[0][1:])]
@@ -0,0 +1,60 @@
+"""
+Testes de cache.py: acertos com a mesma matriz e com as cidades renumeradas.
+"""
+
+import numpy as np
+
+from app_saidaComum import tsp_solver
+from avaliacao import custo_caminho
+from cache import abrir_cache, buscar_resultado, guardar_resultado, tamanho_cache
+from verificador import held_karp
+
+
+def _matriz(n, semente):
+    d = np.random.default_rng(semente).integers(1, 100, (n, n))
+    np.fill_diagonal(d, 0)
+    return d
+
+
+def test_acerto_com_matriz_renumerada(tmp_path):
+    cache = abrir_cache(str(tmp_path / 'cache.sqlite'))
+    d = _matriz(8, 0)
+    caminho, custo = held_karp(d)
+    guardar_resultado(cache, d.tolist(), caminho, custo)
+    permutacao = np.random.default_rng(1).permutation(8)
+    renumerada = d[np.ix_(permutacao, permutacao)]
+    guardado = buscar_resultado(cache, renumerada.tolist())
+    assert guardado is not None
+    assert guardado['custo'] == custo
+    assert guardado['caminho'][0] == guardado['caminho'][-1] == 0
+    assert sorted(guardado['caminho'][:-1]) == list(range(8))
+    assert custo_caminho(renumerada, guardado['caminho']) == custo
+
+
+def test_sem_canonizacao_so_a_mesma_matriz_acerta(tmp_path):
+    cache = abrir_cache(str(tmp_path / 'cache.sqlite'), canonizar=False)
+    d = _matriz(6, 2)
+    guardar_resultado(cache, d, *held_karp(d))
+    assert buscar_resultado(cache, d.tolist()) is not None  # lista e ndarray têm a mesma chave
+    permutacao = [0, 2, 1, 3, 4, 5]
+    assert buscar_resultado(cache, d[np.ix_(permutacao, permutacao)]) is None
+    assert buscar_resultado(cache, _matriz(6, 3)) is None
+
+
+def test_limite_de_entradas(tmp_path):
+    cache = abrir_cache(str(tmp_path / 'cache.sqlite'), tamanho_maximo=3)
+    for semente in range(5):
+        d = _matriz(5, semente)
+        guardar_resultado(cache, d, *held_karp(d))
+    assert tamanho_cache(cache) == 3
+    assert buscar_resultado(cache, _matriz(5, 4)) is not None
+    assert buscar_resultado(cache, _matriz(5, 0)) is None
+
+
+def test_tsp_solver_consulta_o_cache(tmp_path):
+    cache = abrir_cache(str(tmp_path / 'cache.sqlite'))
+    d = _matriz(7, 5).tolist()
+    primeiro = tsp_solver(d, destinos=[], cache=cache)
+    segundo = tsp_solver(d, destinos=[], cache=cache)
+    assert not primeiro['cache'] and segundo['cache']
+    assert segundo['custo'] == primeiro['custo'] == held_karp(d)[1]
@@ -0,0 +1,116 @@
+"""
+Testes de codificacoes.py: cada codificação contra Held-Karp.
+
+Regressão: o objetivo era sempre um Int, e objective == soma de distâncias
+fracionárias ficava insatisfatível: tsp_solver devolvia caminho None em
+matrizes float (por exemplo, lidas de um .npy).
+"""
+
+import numpy as np
+import pytest
+from z3 import Optimize, sat
+
+from app_saidaComum import tsp_solver
+from avaliacao import custo_caminho
+from carregamento import ler_npy
+from codificacoes import (CODIFICACOES, comparar_codificacoes, construir_modelo, escolher_codificacao, extrair_caminho,
+                          matriz_simetrica, sugerir_caminho)
+from verificador import held_karp
+
+
+def _matriz_inteira(n, semente):
+    m = np.random.default_rng(semente).integers(1, 100, (n, n))
+    np.fill_diagonal(m, 0)
+    return m.tolist()
+
+
+def _matriz_fracionaria(n, simetrica, semente):
+    m = np.random.default_rng(semente).random((n, n)) * 100
+    np.fill_diagonal(m, 0)
+    return (m + m.T) / 2 if simetrica else m
+
+
+@pytest.mark.parametrize('simetrica', [True, False])
+def test_tsp_solver_com_matriz_fracionaria_de_npy(tmp_path, simetrica):
+    arquivo = tmp_path / 'matriz.npy'
+    np.save(arquivo, _matriz_fracionaria(7, simetrica, 1))
+    matriz = ler_npy(arquivo)
+    otimo = held_karp(matriz)[1]
+    for parametros in ({}, {'aquecimento': False}, {'limites': False}, {'prazo': 30}, {'modo': 'esparso'}):
+        resultado = tsp_solver(matriz, destinos=[], **parametros)
+        assert resultado['caminho'] is not None, parametros
+        assert resultado['otimo'], parametros
+        assert resultado['custo'] == pytest.approx(otimo), parametros
+
+
+def test_optimize_com_objetivo_real():
+    matriz = _matriz_fracionaria(6, False, 2).tolist()
+    modelo = construir_modelo(matriz, 'bitvector', solver=Optimize())
+    assert modelo['solver'].check() == sat
+    caminho = extrair_caminho(modelo, modelo['solver'].model())
+    assert custo_caminho(matriz, caminho) == pytest.approx(held_karp(matriz)[1])
+
+
+@pytest.mark.parametrize('codificacao', CODIFICACOES)
+@pytest.mark.parametrize('n', [2, 3, 5, 7])
+def test_cada_codificacao_encontra_o_otimo(codificacao, n):
+    matriz = _matriz_inteira(n, n)
+    modelo = construir_modelo(matriz, codificacao)
+    assert modelo['solver'].check() == sat
+    caminho = extrair_caminho(modelo, modelo['solver'].model())
+    assert sorted(caminho[:-1]) == list(range(n)) and caminho[0] == caminho[-1] == 0
+    assert custo_caminho(matriz, caminho) == held_karp(matriz)[1]
+
+
+@pytest.mark.parametrize('codificacao', CODIFICACOES)
+def test_maxsat_e_sugestao_de_caminho(codificacao):
+    matriz = _matriz_inteira(6, 11)
+    caminho_otimo, custo_otimo = held_karp(matriz)
+    modelo = construir_modelo(matriz, codificacao, maxsat=True)
+    sugerir_caminho(modelo, caminho_otimo)
+    assert modelo['solver'].check() == sat
+    assert custo_caminho(matriz, extrair_caminho(modelo, modelo['solver'].model())) == custo_otimo
+
+
+def test_comparar_codificacoes():
+    medicoes = comparar_codificacoes(_matriz_inteira(5, 3))
+    assert [m['codificacao'] for m in medicoes] == list(CODIFICACOES)
+    assert len({m['custo'] for m in medicoes}) == 1
+
+
+def _matriz_simetrica(n, semente):
+    m = np.triu(np.random.default_rng(semente).integers(1, 100, (n, n)), 1)
+    return (m + m.T).tolist()
+
+
+def test_deteccao_de_simetria():
+    simetrica, assimetrica = _matriz_simetrica(6, 0), _matriz_inteira(6, 0)
+    assert matriz_simetrica(simetrica) and not matriz_simetrica(assimetrica)
+    assert escolher_codificacao(simetrica, 'bitvector') == 'simetrica'
+    assert escolher_codificacao(simetrica, 'booleana') == 'simetrica'
+    assert escolher_codificacao(simetrica, 'inteira') == 'inteira'
+    assert escolher_codificacao(assimetrica, 'bitvector') == 'bitvector'
+    assert escolher_codificacao([[0, 1], [1, 0]], 'bitvector') == 'bitvector'  # menos de 3 cidades
+
+
+@pytest.mark.parametrize('n', [3, 4, 6, 8])
+def test_codificacao_simetrica_encontra_o_otimo(n):
+    matriz = _matriz_simetrica(n, n)
+    modelo = construir_modelo(matriz, 'simetrica')
+    assert modelo['solver'].check() == sat
+    caminho = extrair_caminho(modelo, modelo['solver'].model())
+    assert sorted(caminho[:-1]) == list(range(n)) and caminho[0] == caminho[-1] == 0
+    assert custo_caminho(matriz, caminho) == held_karp(matriz)[1]
+
+
+def test_codificacao_simetrica_recusa_matriz_assimetrica():
+    with pytest.raises(ValueError):
+        construir_modelo(_matriz_inteira(5, 0), 'simetrica')
+
+
+def test_tsp_solver_com_e_sem_simetria():
+    matriz = _matriz_simetrica(8, 5)
+    otimo = held_karp(matriz)[1]
+    for simetria in (True, False):
+        resultado = tsp_solver(matriz, destinos=[], simetria=simetria, aquecimento=False, limites=False)
+        assert resultado['otimo'] and resultado['custo'] == otimo
@@ -0,0 +1,30 @@
+"""
+Regressões de cortes.py: instâncias triviais e conferência contra Held-Karp.
+
+Com a matriz vazia, a relaxação de atribuição era satisfatível sem subciclos
+e sem um ciclo único, e resolver_com_cortes nunca saía do laço.
+"""
+
+import random
+
+import pytest
+
+from cortes import resolver_com_cortes
+from verificador import held_karp
+
+
+@pytest.mark.parametrize('matriz, caminho', [([], []), ([[0]], [0, 0])])
+def test_instancias_triviais_terminam_sem_modelo(matriz, caminho):
+    resultado = resolver_com_cortes(matriz)
+    assert resultado['caminho'] == caminho
+    assert resultado['custo'] == 0
+    assert resultado['iteracoes'] == 0
+    assert resultado['modelo'] is None
+
+
+@pytest.mark.parametrize('semente', range(3))
+def test_cortes_encontram_o_otimo(semente):
+    aleatorio = random.Random(semente)
+    n = 7
+    matriz = [[0 if i == j else aleatorio.randint(1, 50) for j in range(n)] for i in range(n)]
+    assert resolver_com_cortes(matriz)['custo'] == held_karp(matriz)[1]
@@ -0,0 +1,44 @@
+"""
+Testes de enumerador.py: os K melhores caminhos contra a enumeração de todas as permutações.
+"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from avaliacao import custo_caminho
+from enumerador import melhores_caminhos, relatorio_melhores_caminhos
+
+
+def _matriz(n, semente):
+    d = np.random.default_rng(semente).integers(1, 60, (n, n))
+    np.fill_diagonal(d, 0)
+    return d.tolist()
+
+
+def _todos_os_custos(d):
+    return sorted(custo_caminho(d, [0, *perm, 0]) for perm in itertools.permutations(range(1, len(d))))
+
+
+@pytest.mark.parametrize('k', [1, 5, 20])
+def test_k_melhores_iguais_aos_da_forca_bruta(k):
+    d = _matriz(7, k)
+    caminhos, estatisticas = melhores_caminhos(d, k, processos=2)
+    assert [custo for custo, _ in caminhos] == _todos_os_custos(d)[:k]
+    assert all(custo_caminho(d, caminho) == custo for custo, caminho in caminhos)
+    assert estatisticas['prefixos'] > 0
+
+
+def test_limite_descarta_caminhos_mais_caros():
+    d = _matriz(6, 0)
+    custos = _todos_os_custos(d)
+    caminhos, _ = melhores_caminhos(d, 50, processos=2, limite=custos[3])
+    assert [custo for custo, _ in caminhos] == [c for c in custos if c <= custos[3]]
+
+
+def test_relatorio_e_uma_lista_com_uma_linha_por_caminho_e_as_contagens():
+    linhas = relatorio_melhores_caminhos(_matriz(6, 1), 3, processos=2)
+    assert isinstance(linhas, list)
+    assert len(linhas) == 4
+    assert linhas[0].startswith("1. [0, ") and linhas[-1].startswith("Prefixos explorados")
@@ -0,0 +1,56 @@
+"""
+Testes de esparso.py: o modelo esparso contra o modelo completo e Held-Karp.
+"""
+
+import numpy as np
+import pytest
+
+from avaliacao import custo_caminho
+from codificacoes import construir_modelo, escolher_codificacao, extrair_caminho
+from esparso import resolver_esparso, vizinhos_mais_proximos
+from verificador import held_karp
+
+
+def _matriz(n, semente, simetrica):
+    d = np.random.default_rng((semente, n)).integers(1, 100, (n, n))
+    if simetrica:
+        d = np.triu(d, 1) + np.triu(d, 1).T
+    np.fill_diagonal(d, 0)
+    return d.tolist()
+
+
+def _otimo_do_modelo_completo(matriz):
+    modelo = construir_modelo(matriz, escolher_codificacao(matriz))
+    modelo['solver'].check()
+    return custo_caminho(matriz, extrair_caminho(modelo, modelo['solver'].model()))
+
+
+@pytest.mark.parametrize('simetrica', [False, True])
+@pytest.mark.parametrize('semente', range(3))
+def test_esparso_igual_ao_modelo_completo(simetrica, semente):
+    matriz = _matriz(9, semente, simetrica)
+    resultado = resolver_esparso(matriz)
+    assert resultado['otimo']
+    assert resultado['custo'] == _otimo_do_modelo_completo(matriz) == held_karp(matriz)[1]
+    assert custo_caminho(matriz, resultado['caminho']) == resultado['custo']
+    assert resultado['limite_inferior'] <= resultado['custo']
+
+
+@pytest.mark.parametrize('simetrica', [False, True])
+def test_poucas_candidatas_e_caminho_inicial_ruim_ampliam_o_modelo(simetrica):
+    matriz = _matriz(10, 7, simetrica)
+    resultado = resolver_esparso(matriz, k=1, caminho_inicial=list(range(10)) + [0])
+    assert resultado['otimo']
+    assert resultado['custo'] == held_karp(matriz)[1]
+    assert resultado['arestas'] <= resultado['arestas_possiveis']
+
+
+def test_vizinhos_mais_proximos():
+    matriz = _matriz(7, 0, False)
+    candidatas = vizinhos_mais_proximos(matriz, 3)
+    assert candidatas.sum(axis=1).tolist() == [3] * 7
+    assert not candidatas.diagonal().any()
+    d = np.asarray(matriz, dtype=float)
+    np.fill_diagonal(d, np.inf)
+    for i in range(7):
+        assert d[i, candidatas[i]].max() <= d[i, ~candidatas[i]].min()
@@ -0,0 +1,55 @@
+"""
+Testes de limites.py: os limites inferiores nunca passam do ótimo.
+"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from app_saidaComum import distance_matrix_test_20, tsp_solver
+from limites import atribuicao, gap, limite_inferior
+from verificador import held_karp
+
+
+def _matriz(n, semente, simetrica=False, fracionaria=False):
+    rng = np.random.default_rng((semente, n))
+    d = rng.random((n, n)) * 100 if fracionaria else rng.integers(1, 100, (n, n))
+    if simetrica:
+        d = np.triu(d, 1) + np.triu(d, 1).T
+    np.fill_diagonal(d, 0)
+    return d
+
+
+@pytest.mark.parametrize('simetrica, fracionaria, metodo', [(False, False, 'atribuicao'), (True, False, 'arvore_1'),
+                                                            (False, True, 'atribuicao'), (True, True, 'arvore_1')])
+def test_limite_nao_passa_do_otimo(simetrica, fracionaria, metodo):
+    for n in range(2, 11):
+        for semente in range(5):
+            d = _matriz(n, semente, simetrica, fracionaria)
+            limite = limite_inferior(d)
+            assert limite['custo'] <= held_karp(d)[1]
+            if n > 2:
+                assert limite['metodo'] == metodo
+            assert limite['reduzidos'].min() >= 0
+
+
+def test_atribuicao_igual_a_forca_bruta():
+    d = _matriz(6, 3)
+    esperado = min(sum(d[i, p[i]] for i in range(6)) for p in itertools.permutations(range(6))
+                   if all(p[i] != i for i in range(6)))
+    assert atribuicao(d)['custo'] == pytest.approx(esperado)
+
+
+def test_gap():
+    assert gap(110, 100) == pytest.approx(0.1)
+    assert gap(100, 100) == 0.0
+    assert gap(90, 100) == 0.0
+    assert gap(5, 0) == float('inf')
+
+
+def test_caminho_da_heuristica_que_alcanca_o_limite_dispensa_o_modelo():
+    resultado = tsp_solver(distance_matrix_test_20, destinos=[])
+    assert resultado['otimo'] and resultado['custo'] == 244
+    assert resultado['limite_inferior'] == 244 and resultado['gap'] == 0.0
+    assert resultado['variaveis'] is None  # nenhum modelo do Z3 foi montado
@@ -0,0 +1,58 @@
+"""
+Regressões de portfolio.py.
+
+Um processo que enviava o resultado e terminava logo antes de a espera na
+fila acabar era dado como 'erro' ("processo terminou com código 0"), e a
+resposta ótima que ele deixou na fila era descartada.
+"""
+
+import multiprocessing
+import multiprocessing.queues
+import queue
+import random
+import time
+
+import pytest
+
+import portfolio
+from verificador import held_karp
+
+
+class _FilaQueAtrasa(multiprocessing.queues.Queue):
+    # A primeira espera bloqueante esgota o tempo depois que o processo já respondeu e terminou
+    def __init__(self):
+        super().__init__(ctx=multiprocessing.get_context())
+        self.atrasou = False
+
+    def get(self, block=True, timeout=None):
+        if block and not self.atrasou:
+            self.atrasou = True
+            time.sleep(1)
+            raise queue.Empty
+        return super().get(block, timeout)
+
+
+def _responder_e_terminar(nome, parametros, distance_matrix, caminho_inicial, limite_inferior, fila):
+    caminho, custo = held_karp(distance_matrix)
+    fila.put({'configuracao': nome, 'tipo': 'fim', 'caminho': caminho, 'custo': custo, 'otimo': True, 'tempo': 0.0})
+
+
+def test_resultado_na_fila_de_processo_que_terminou_nao_e_descartado(monkeypatch):
+    if multiprocessing.get_start_method() != 'fork':
+        pytest.skip("a substituição da função executada depende de os processos serem criados por fork")
+    monkeypatch.setattr(multiprocessing, 'Queue', _FilaQueAtrasa)
+    monkeypatch.setattr(portfolio, '_executar_configuracao', _responder_e_terminar)
+    matriz = [[0, 2, 9, 10], [1, 0, 6, 4], [15, 7, 0, 8], [6, 3, 12, 0]]
+    resultado = portfolio.resolver_portfolio(matriz, configuracoes=['cortes'])
+    assert resultado['configuracoes'] == {'cortes': 'otimo'}
+    assert resultado['otimo']
+    assert resultado['custo'] == held_karp(matriz)[1]
+
+
+def test_portfolio_encontra_o_otimo():
+    aleatorio = random.Random(4)
+    n = 8
+    matriz = [[0 if i == j else aleatorio.randint(1, 60) for j in range(n)] for i in range(n)]
+    resultado = portfolio.resolver_portfolio(matriz, configuracoes=['bitvector', 'cortes'])
+    assert resultado['otimo']
+    assert resultado['custo'] == held_karp(matriz)[1]
@@ -0,0 +1,54 @@
+"""
+Regressões de servico.py: prazo total de pedidos que ainda estão na fila.
+
+O prazo total só era conferido quando um processo tirava a tarefa da fila:
+com todos os processos ocupados, um /resolver com prazo_total=1 esperava
+tanto quanto a tarefa à sua frente, sem resposta 504.
+"""
+
+import asyncio
+import random
+import time
+
+from servico import conectar, consultar, encerrar_servico, enviar_tarefa, iniciar_servico, saude, servir
+
+
+# Instância que o modelo MTZ, sem aquecimento nem limite inferior, leva bem mais que alguns segundos para provar
+def _matriz_demorada(n=60, semente=7):
+    aleatorio = random.Random(semente)
+    return [[0 if i == j else aleatorio.randint(1, 1000) for j in range(n)] for i in range(n)]
+
+
+def test_resolver_responde_504_quando_o_prazo_acaba_na_fila(tmp_path):
+    async def cenario():
+        servico = await iniciar_servico(processos=1)
+        caminho_socket = str(tmp_path / 'tsp.sock')
+        servidor = await servir(servico, caminho_socket=caminho_socket)
+        try:
+            # Ocupa o único processo de trabalho
+            ocupante = enviar_tarefa(servico, {'matriz': _matriz_demorada(), 'aquecimento': False, 'limites': False,
+                                               'prazo_total': 60})
+
+            def pedir():
+                conexao = conectar(caminho_socket=caminho_socket, timeout=30)
+                try:
+                    inicio = time.perf_counter()
+                    codigo, resposta = consultar(conexao, 'POST', '/resolver',
+                                                 {'matriz': [[0, 2, 9], [1, 0, 6], [15, 7, 0]], 'prazo_total': 1})
+                    return codigo, resposta, time.perf_counter() - inicio
+                finally:
+                    conexao.close()
+
+            codigo, resposta, duracao = await asyncio.to_thread(pedir)
+            assert ocupante['estado'] in ('na_fila', 'executando')
+            assert codigo == 504
+            assert resposta['estado'] == 'prazo_esgotado'
+            assert duracao < 5
+            # O lugar na fila foi liberado sem esperar que um processo tirasse a tarefa de lá
+            assert saude(servico)['na_fila'] == 0
+        finally:
+            servidor.close()
+            await servidor.wait_closed()
+            await encerrar_servico(servico)
+
+    asyncio.run(cenario())
@@ -0,0 +1,67 @@
+"""
+Testes de sessao.py: cada reotimização contra uma resolução do zero.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from sessao import abrir_sessao, atualizar_distancias, reotimizar
+from verificador import held_karp
+
+
+def _matriz(n, semente, simetrica):
+    d = np.random.default_rng((semente, n)).integers(1, 100, (n, n))
+    if simetrica:
+        d = np.triu(d, 1) + np.triu(d, 1).T
+    np.fill_diagonal(d, 0)
+    return d.tolist()
+
+
+def _alteracoes(aleatorio, n, quantidade, simetrica):
+    alteracoes = {}
+    for _ in range(quantidade):
+        i, j = aleatorio.sample(range(n), 2)
+        valor = aleatorio.randint(1, 150)
+        alteracoes[i, j] = valor
+        if simetrica:
+            alteracoes[j, i] = valor
+    return alteracoes
+
+
+@pytest.mark.parametrize('simetrica', [False, True])
+@pytest.mark.parametrize('limites', [True, False])
+def test_reotimizar_igual_a_resolver_do_zero(simetrica, limites):
+    n = 8
+    aleatorio = random.Random(n)
+    sessao = abrir_sessao(_matriz(n, 0, simetrica), limites=limites)
+    assert sessao['resultado']['otimo']
+    assert sessao['resultado']['custo'] == held_karp(sessao['distancias'])[1]
+    for rodada in range(6):
+        # Poucas mudanças reaproveitam o modelo; a última rodada passa de FRACAO_RECONSTRUCAO e o remonta
+        quantidade = n * n if rodada == 5 else aleatorio.randint(1, 4)
+        atualizar_distancias(sessao, _alteracoes(aleatorio, n, quantidade, simetrica))
+        resultado = reotimizar(sessao)
+        assert resultado['otimo']
+        assert resultado['custo'] == held_karp(sessao['distancias'])[1]
+    assert sessao['reconstrucoes'] >= 1
+
+
+def test_caminho_anterior_continua_otimo_quando_so_arestas_de_fora_encarecem():
+    sessao = abrir_sessao(_matriz(7, 3, False))
+    caminho = sessao['caminho']
+    dentro = set(zip(caminho, caminho[1:]))
+    fora = next((i, j) for i in range(7) for j in range(7) if i != j and (i, j) not in dentro)
+    atualizar_distancias(sessao, {fora: sessao['distancias'][fora[0]][fora[1]] + 50})
+    resultado = reotimizar(sessao)
+    assert resultado['atalho'] == 'caminho_anterior' and resultado['verificacoes'] == 0
+    assert resultado['custo'] == held_karp(sessao['distancias'])[1]
+
+
+def test_alteracoes_invalidas():
+    sessao = abrir_sessao(_matriz(5, 1, True))
+    with pytest.raises(ValueError):
+        atualizar_distancias(sessao, {(0, 0): 3})
+    with pytest.raises(ValueError):
+        atualizar_distancias(sessao, {(0, 1): 3})  # quebraria a simetria
@@ -0,0 +1,56 @@
+"""
+Testes de verificador.py: Held-Karp contra a enumeração de todas as permutações.
+"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from avaliacao import custo_caminho
+from verificador import held_karp, memoria_held_karp, verificar_otimalidade
+
+
+def _forca_bruta(d):
+    n = len(d)
+    return min(custo_caminho(d, [0, *perm, 0]) for perm in itertools.permutations(range(1, n)))
+
+
+def _matriz(n, semente, simetrica=False, fracionaria=False):
+    rng = np.random.default_rng((semente, n))
+    d = rng.random((n, n)) * 100 if fracionaria else rng.integers(1, 100, (n, n))
+    if simetrica:
+        d = np.triu(d, 1) + np.triu(d, 1).T
+    np.fill_diagonal(d, 0)
+    return d
+
+
+@pytest.mark.parametrize('n', range(1, 9))
+@pytest.mark.parametrize('simetrica', [False, True])
+def test_held_karp_igual_a_forca_bruta(n, simetrica):
+    for semente in range(3):
+        d = _matriz(n, semente, simetrica)
+        caminho, custo = held_karp(d)
+        assert sorted(caminho[:-1]) == list(range(n))
+        assert caminho[0] == caminho[-1] == 0
+        assert custo_caminho(d, caminho) == custo
+        assert custo == _forca_bruta(d)
+
+
+def test_held_karp_com_distancias_fracionarias():
+    d = _matriz(7, 0, fracionaria=True)
+    assert held_karp(d)[1] == pytest.approx(_forca_bruta(d))
+
+
+def test_verificar_otimalidade():
+    d = _matriz(6, 1)
+    caminho, custo = held_karp(d)
+    assert verificar_otimalidade(d, caminho)[0]
+    pior = max(([0, *perm, 0] for perm in itertools.permutations(range(1, 6))), key=lambda c: custo_caminho(d, c))
+    otimo, _, custo_otimo = verificar_otimalidade(d, pior)
+    assert not otimo and custo_otimo == custo
+
+
+def test_limite_de_memoria():
+    with pytest.raises(ValueError):
+        held_karp(_matriz(12, 0), limite_memoria=memoria_held_karp(12) - 1)
@@ -0,0 +1,112 @@
+"""
+Verificador exato de otimalidade para o Problema do Caixeiro Viajante.
+
+Implementa a programação dinâmica de Held-Karp sobre subconjuntos representados
+por máscaras de bits. Cada camada de subconjuntos (mesmo número de cidades
+visitadas) é processada de uma vez com NumPy, e as tabelas são guardadas em
+arrays compactos: custos em int32 quando cabem e predecessores em int8.
+
+Referência:
+Held, M.; Karp, R. M. "A dynamic programming approach to sequencing problems."
+Journal of the SIAM 10.1 (1962): 196-210.
+"""
+
+import numpy as np
+
+from avaliacao import custo_caminho, custos_caminhos
+
+# Limite de memória padrão para as tabelas da programação dinâmica (1 GiB).
+# Com esse limite o verificador aceita até 23 cidades com distâncias inteiras.
+LIMITE_MEMORIA_PADRAO = 1 << 30
+
+
+# Escolhe o tipo numérico mais compacto que representa todas as somas parciais
+def _tipo_custos(d):
+    n = len(d)
+    if np.issubdtype(d.dtype, np.integer):
+        maior_soma = int(np.abs(d).max()) * n if d.size else 0
+        if maior_soma < (1 << 30):
+            return np.int32, np.iinfo(np.int32).max // 2
+        return np.int64, np.iinfo(np.int64).max // 2
+    return np.float64, np.inf
+
+
+# Memória (em bytes) ocupada pelas tabelas de custo e de predecessores
+def memoria_held_karp(n, tipo=np.int32):
+    m = max(n - 1, 0)
+    return (1 << m) * m * (np.dtype(tipo).itemsize + np.dtype(np.int8).itemsize)
+
+
+def held_karp(matriz_distancias, limite_memoria=LIMITE_MEMORIA_PADRAO):
+    """Retorna (caminho, custo) do ciclo ótimo partindo e chegando na cidade 0."""
+    d = np.asarray(matriz_distancias)
+    n = len(d)
+    if n == 0:
+        return [], 0
+    if n <= 3:
+        # Com até 3 cidades só existem no máximo dois ciclos possíveis
+        candidatos = [[0] + list(range(1, n)) + [0], [0] + list(range(n - 1, 0, -1)) + [0]]
+        custos = custos_caminhos(d, candidatos)
+        melhor = int(np.argmin(custos))
+        return candidatos[melhor], custos[melhor].item()
+
+    tipo, infinito = _tipo_custos(d)
+    memoria = memoria_held_karp(n, tipo)
+    if memoria > limite_memoria:
+        raise ValueError(
+            f"Held-Karp para {n} cidades exigiria {memoria / 2**20:.0f} MiB "
+            f"(limite de {limite_memoria / 2**20:.0f} MiB)."
+        )
+
+    # As cidades 1..n-1 são renumeradas para 0..m-1 dentro das máscaras
+    m = n - 1
+    total = 1 << m
+    d = d.astype(tipo)
+    internas = d[1:, 1:]
+
+    # custo[mascara, j]: menor custo saindo de 0, visitando exatamente "mascara" e terminando em j
+    custo = np.full((total, m), infinito, dtype=tipo)
+    anterior = np.full((total, m), -1, dtype=np.int8)
+    for j in range(m):
+        custo[1 << j, j] = d[0, j + 1]
+
+    mascaras = np.arange(total, dtype=np.int64)
+    quantidade = np.zeros(total, dtype=np.int8)
+    for b in range(m):
+        quantidade += ((mascaras >> b) & 1).astype(np.int8)
+    del mascaras
+
+    for k in range(2, m + 1):
+        camada = np.flatnonzero(quantidade == k)
+        for j in range(m):
+            com_j = camada[(camada >> j) & 1 == 1]
+            sem_j = com_j ^ (1 << j)
+            # Para cada subconjunto, testa todas as cidades i como penúltima parada;
+            # cidades fora do subconjunto têm custo infinito e nunca são escolhidas
+            candidatos = custo[sem_j] + internas[:, j]
+            melhores = candidatos.argmin(axis=1)
+            custo[com_j, j] = candidatos[np.arange(len(com_j)), melhores]
+            anterior[com_j, j] = melhores
+
+    cheia = total - 1
+    fechamento = custo[cheia] + d[1:, 0]
+    ultima = int(fechamento.argmin())
+    custo_otimo = fechamento[ultima].item()
+
+    # Reconstrói o caminho de trás para frente a partir da tabela de predecessores
+    caminho = []
+    mascara, j = cheia, ultima
+    while j >= 0:
+        caminho.append(j + 1)
+        proxima = int(anterior[mascara, j])
+        mascara ^= 1 << j
+        j = proxima
+    caminho.reverse()
+    return [0] + caminho + [0], custo_otimo
+
+
+def verificar_otimalidade(matriz_distancias, caminho, limite_memoria=LIMITE_MEMORIA_PADRAO):
+    """Retorna (é_ótimo, caminho_ótimo, custo_ótimo) para o caminho informado."""
+    custo = custo_caminho(matriz_distancias, caminho)
+    caminho_otimo, custo_otimo = held_karp(matriz_distancias, limite_memoria)
+    return custo <= custo_otimo, caminho_otimo, custo_otimo